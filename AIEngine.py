@@ -1,22 +1,24 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+import os
+import re
+
+from GraphRendering import draw_graph, prepare_graph
+from ParseCache import ParseCache, refresh_function_graph
 
 class ExtendedAI(AdvancedAI):
     def analyze_repository(self, repo_path):
         """
         Analyzes the code in the repository to build a function call graph and other code metrics.
         """
-        function_graph = nx.DiGraph()
+        # Files unchanged since the last analyzed commit come from the parse cache
+        if not hasattr(self, "parse_caches"):
+            self.parse_caches, self.function_graphs = {}, {}
+        cache = self.parse_caches.get(repo_path)
+        if cache is None:
+            cache = self.parse_caches[repo_path] = ParseCache(repo_path)  # .py, .js, .cpp, .java
+
+        function_graph = refresh_function_graph(repo_path, cache, self.function_graphs.get(repo_path))
+        self.function_graphs[repo_path] = function_graph
 
-        # Walk through the repository files and parse code
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                if file.endswith(('.py', '.js', '.cpp', '.java')):  # Add more extensions as needed
-                    file_path = os.path.join(root, file)
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                        self.parse_code_for_functions(file, content, function_graph)
-        
         # Visualize the function call graph
         self.visualize_function_graph(function_graph)
 
@@ -35,11 +37,13 @@ class ExtendedAI(AdvancedAI):
     def visualize_function_graph(self, function_graph):
         """
         Visualizes the function call graph using NetworkX and Matplotlib.
+        Only the highest-priority functions are drawn individually; the rest are
+        collapsed into one node per module so large repositories stay readable.
         """
+        import matplotlib.pyplot as plt
+        graph, positions = prepare_graph(function_graph)
         plt.figure(figsize=(10, 8))
-        pos = nx.spring_layout(function_graph)
-        nx.draw(function_graph, pos, with_labels=True, node_color='skyblue', node_size=3000, font_size=10, font_weight='bold')
-        plt.title("Function Call Graph")
+        draw_graph(plt.gca(), graph, positions, "Function Call Graph")
         plt.show()
 
     def analyze_and_visualize(self, repo_url):
@@ -50,6 +54,7 @@ class ExtendedAI(AdvancedAI):
         if not os.path.exists(base_dir):
             os.makedirs(base_dir)
 
+        import git
         try:
             repo_name = repo_url.split("/")[-1].replace(".git", "")
             repo_path = os.path.join(base_dir, repo_name)
@@ -1,10 +1,11 @@
 import os
-import subprocess
-import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from tkinter.filedialog import askopenfilename
 
+from ConsolePipeline import ConsolePipeline, ConsoleView
+from LogViewer import LogViewer
+
 # --- VACU Theme Colors ---
 BACKGROUND_COLOR = "#2C1E4D"  # Deep Violet
 FOREGROUND_COLOR = "#FFD700"  # Brass Gold
@@ -20,7 +21,10 @@ class AICompilerGUI(tk.Tk):
         self.geometry("800x600")
         self.configure(bg=BACKGROUND_COLOR)
 
+        self.console = ConsolePipeline()
         self.create_widgets()
+        self.console_view = ConsoleView(self.console_output, self.console)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_widgets(self):
         # Title Label
@@ -65,42 +69,39 @@ class AICompilerGUI(tk.Tk):
 
     def build_system(self):
         self.log_to_console("Starting build process...")
-        self.run_command("msbuild AI_Compiler_Plus.msbuild /t:BuildAll")
+        self.run_command("msbuild AI_Compiler_Plus.msbuild /t:BuildAll", "build")
 
     def clean_system(self):
         self.log_to_console("Cleaning build artifacts...")
-        self.run_command("msbuild AI_Compiler_Plus.msbuild /t:Clean")
+        self.run_command("msbuild AI_Compiler_Plus.msbuild /t:Clean", "clean")
 
     def view_logs(self):
         log_file_path = os.path.join(os.getcwd(), "logs", "build_log.log")
         if os.path.exists(log_file_path):
-            with open(log_file_path, "r") as log_file:
-                logs = log_file.read()
-            self.display_text_in_window("Build Logs", logs)
+            # Memory-mapped and rendered a window at a time, following new output
+            LogViewer(self, log_file_path, background="#1A0B29", foreground=TEXT_COLOR, highlight=HIGHLIGHT_COLOR)
         else:
             messagebox.showerror("Error", "No log file found.")
 
     def run_ai_analysis(self):
         self.log_to_console("Running AI-driven analysis on repository content...")
-        self.run_command("python ai_analysis.py")
+        self.run_command("python ai_analysis.py", "analysis")
 
     def launch_task_scheduler(self):
         self.log_to_console("Launching C++ Task Scheduler...")
-        self.run_command("AI_Compiler_Plus\\src\\build\\task_scheduler.exe")
-
-    def run_command(self, command):
-        def threaded_run():
-            process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            for line in iter(process.stdout.readline, ""):
-                self.log_to_console(line)
-            process.stdout.close()
-            process.wait()
+        self.run_command("AI_Compiler_Plus\\src\\build\\task_scheduler.exe", "scheduler")
 
-        threading.Thread(target=threaded_run).start()
+    def run_command(self, command, label=None):
+        # Output is queued by reader threads and flushed to the console in batches
+        return self.console.start(command, label)
 
     def log_to_console(self, message):
-        self.console_output.insert(tk.END, f"{message}\n")
-        self.console_output.see(tk.END)
+        self.console.message(message)
+
+    def on_close(self):
+        self.console.stop_all()
+        self.console_view.close()
+        self.destroy()
 
     def display_text_in_window(self, title, text_content):
         text_window = tk.Toplevel(self)
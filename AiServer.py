@@ -1,173 +1,149 @@
-A few thoughts that might refine your implementation:
-1. **Function Dependency Analysis**: Right now, your function graph captures individual function definitions, but you could enhance it by tracking function calls. This would allow a more accurate representation of dependency chains and prioritize tasks more intelligently.
-2. **Static Code Analysis Integration**: Leveraging tools like `pyan` or `radon` could help generate more nuanced function call graphs and complexity metrics.
-3. **Error Handling for Git Operations**: A `try-except` block around the Git cloning and pulling process would prevent execution issues if the repository isn't accessible.
-4. **Task Scheduler Load Balancing**: If you're sending task priorities over a socket to a C++ scheduler, it might be useful to introduce a heuristic that balances workload distribution dynamically.
-
-import socket
-import json
-import networkx as nx
-import matplotlib.pyplot as plt
+# A few thoughts that might refine your implementation:
+# 1. **Function Dependency Analysis**: Right now, your function graph captures individual function definitions, but you could enhance it by tracking function calls. This would allow a more accurate representation of dependency chains and prioritize tasks more intelligently.
+# 2. **Static Code Analysis Integration**: Leveraging tools like `pyan` or `radon` could help generate more nuanced function call graphs and complexity metrics.
+# 3. **Error Handling for Git Operations**: A `try-except` block around the Git cloning and pulling process would prevent execution issues if the repository isn't accessible.
+# 4. **Task Scheduler Load Balancing**: If you're sending task priorities over a socket to a C++ scheduler, it might be useful to introduce a heuristic that balances workload distribution dynamically.
+
+# Heavy libraries (matplotlib, GitPython, radon) are imported inside the methods
+# that need them, so importing this module to send priorities stays cheap
 import os
-import re
-import git
 from queue import Queue
-
-# Socket settings
-HOST = '127.0.0.1'
-PORT = 65432
+import numpy as np
+
+from FileAnalysis import add_file_result, analyze_source, extract_function_block
+from GraphRendering import draw_graph, prepare_graph, render_graph
+from ParallelParser import DEFAULT_CHUNKSIZE, default_workers
+from ParseCache import ParseCache, refresh_function_graph
+from PipelineMetrics import metrics
+from PriorityEngine import CSRGraph, PriorityEngine, linear_weights, rank_scores
+from PrioritySync import DeltaPublisher
+from PriorityTransport import HOST, PORT, PriorityClient
+from RepositoryFetcher import RepositoryFetcher
+from SharedPriorityRing import CHANNEL_NAME, DEFAULT_CAPACITY, RECORD_SIZE, SharedPriorityPublisher, SharedPriorityRing
 
 class ExtendedAI:
     def __init__(self):
         self.task_priority_queue = Queue()
+        self.source_extensions = ('.py',)  # What analyze_repository scans, and all a checkout needs
+        self.fetcher = RepositoryFetcher(extensions=self.source_extensions)  # Shallow, sparse clones; fetch updates
+        self.fetch_results = {}  # repo_path -> FetchResult of the last clone or update
+        self.parse_caches = {}  # repo_path -> ParseCache
+        self.function_graphs = {}  # repo_path -> graph kept between pulls
+        self.parse_workers = default_workers()  # 1 parses serially in-process
+        self.parse_chunksize = DEFAULT_CHUNKSIZE
+        self.parse_pool = None  # Process pool shared by concurrent analyses; None starts one per analysis
+        self.priority_engine = PriorityEngine()  # Vectorized scoring and ranking over CSR arrays
+        self.priority_client = PriorityClient(HOST, PORT)  # One connection reused for every update
+        self.priority_publisher = DeltaPublisher(self.priority_client)  # Sends only what changed since the last ack
+        self.priority_ring = None  # Shared-memory channel, when use_shared_memory() replaced the socket
+        self.metrics = metrics  # Per-stage timings, shared with the parsing code
 
     def analyze_repository(self, repo_path):
-        # Analyze the repository and extract function call graphs
-        function_graph = nx.DiGraph()
-
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                        self.parse_code_for_functions(file, content, function_graph)
-
+        # Analyze the repository and extract function call graphs. Only files
+        # changed since the last analyzed commit are parsed again.
+        cache = self.parse_caches.get(repo_path)
+        if cache is None:
+            cache = self.parse_caches[repo_path] = ParseCache(repo_path, extensions=self.source_extensions)
+
+        with self.metrics.stage("analyze"):
+            function_graph = refresh_function_graph(repo_path, cache, self.function_graphs.get(repo_path),
+                                                    self.parse_workers, self.parse_chunksize, self.parse_pool)
+        self.function_graphs[repo_path] = function_graph
+        self.metrics.gauge("graph_nodes", function_graph.number_of_nodes())
+        self.metrics.gauge("graph_edges", function_graph.number_of_edges())
         return function_graph
 
     def parse_code_for_functions(self, file_name, content, function_graph):
-        function_pattern = re.compile(r"def (\w+)\(")
-        function_matches = function_pattern.findall(content)
-
-        for function in function_matches:
-            function_graph.add_node(function)
-
-    def prioritize_tasks_based_on_analysis(self, function_graph):
-        # Here we can use function call data to assign task priorities
-        # For simplicity, prioritize tasks based on number of function calls
-        priorities = {}
-        for function in function_graph.nodes:
-            priorities[function] = len(function_graph.neighbors(function))
-
-        # Send tasks to the task scheduler (C++) over socket
-        return priorities
+        with self.metrics.stage("parse", items=1, size=len(content)):
+            result = analyze_source(file_name, content)
+            if hasattr(function_graph, "add_file_result"):
+                function_graph.add_file_result(file_name, result)  # CompactGraph from analyze_repository
+            else:
+                add_file_result(function_graph, file_name, result)
+
+    def extract_function_block(self, func_name, content):
+        return extract_function_block(func_name, content)
+
+    def compute_complexity_score(self, code):
+        from radon.complexity import cc_visit
+        with self.metrics.stage("complexity", items=1, size=len(code)):
+            results = cc_visit(code)
+        return {r.name: r.complexity for r in results}
+
+    def prioritize_tasks_based_on_analysis(self, function_graph, complexity_scores):
+        graph = CSRGraph.from_graph(function_graph, complexity_scores)
+        return dict(zip(graph.names, self.priority_engine.scores(graph).tolist()))
 
     def send_task_priority(self, priorities):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect((HOST, PORT))
-            data = json.dumps(priorities)
-            s.sendall(data.encode())
-            s.close()
-
-    def analyze_and_send(self, repo_url):
+        before = self.bytes_published()
+        with self.metrics.stage("send", items=len(priorities)) as timer:
+            self.priority_publisher.publish(priorities)
+            socket_bytes, ring_bytes = (after - start for after, start in zip(self.bytes_published(), before))
+            timer.bytes = socket_bytes + ring_bytes
+        self.metrics.count("socket_bytes", socket_bytes)
+        self.metrics.count("shared_memory_bytes", ring_bytes)
+
+    def bytes_published(self):
+        ring_records = self.priority_publisher.records_sent if self.priority_ring is not None else 0
+        return self.priority_client.bytes_sent, ring_records * RECORD_SIZE
+
+    def use_shared_memory(self, name=CHANNEL_NAME, capacity=DEFAULT_CAPACITY):
+        # Publish to a shared-memory ring read by `SocketServer --shm NAME` on the
+        # same host instead of the socket; updates are still deltas. Experimental and
+        # x86 only (raises ChannelError elsewhere); see SharedPriorityRing
+        self.priority_ring = SharedPriorityRing.create(name, capacity)
+        self.priority_publisher = SharedPriorityPublisher(self.priority_ring)
+
+    def safe_clone_or_pull(self, repo_url, repo_path):
+        # Errors are printed and reported as False; the changed paths are kept in
+        # fetch_results for callers that want them
+        with self.metrics.stage("git"):
+            result = self.fetcher.acquire(repo_url, repo_path)
+        self.fetch_results[repo_path] = result
+        return result.ok
+
+    def distribute_priority_load(self, priorities):
+        with self.metrics.stage("distribute", items=len(priorities)):
+            names = list(priorities)
+            order = rank_scores(np.fromiter(priorities.values(), dtype=np.float64, count=len(names)))
+            return dict(zip([names[i] for i in order.tolist()], linear_weights(len(order)).tolist()))
+
+    def visualize_graph(self, function_graph, output_path=None, cache_key=None):
+        # Large graphs are reduced to their top-priority functions plus one node per
+        # module. With output_path the PNG/SVG/DOT/JSON file is written headlessly.
+        if output_path:
+            with self.metrics.stage("render"):
+                render_graph(function_graph, output_path, cache_key=cache_key, title="Function Call Graph")
+            return
+        import matplotlib.pyplot as plt
+        graph, positions = prepare_graph(function_graph, cache_key=cache_key)
+        plt.figure(figsize=(12, 8))
+        draw_graph(plt.gca(), graph, positions, "Function Call Graph")
+        plt.show()
+
+    def repo_path_for(self, repo_url):
         base_dir = "./cloned_repos"
-        if not os.path.exists(base_dir):
-            os.makedirs(base_dir)
-
+        os.makedirs(base_dir, exist_ok=True)
         repo_name = repo_url.split("/")[-1].replace(".git", "")
-        repo_path = os.path.join(base_dir, repo_name)
+        return os.path.join(base_dir, repo_name)
+
+    def compute_task_priorities(self, function_graph):
+        # Radon scores are computed per file in the same pass that builds the graph
+        # and read from the node attributes when the graph is exported to CSR
+        with self.metrics.stage("prioritize", items=function_graph.number_of_nodes()):
+            return self.priority_engine.prioritize(function_graph)
+
+    def analyze_and_send(self, repo_url):
+        repo_path = self.repo_path_for(repo_url)
 
-        if not os.path.exists(repo_path):
-            print(f"Cloning {repo_url}...")
-            git.Repo.clone_from(repo_url, repo_path)
-        else:
-            print(f"Repository {repo_name} already cloned. Pulling latest changes...")
-            repo = git.Repo(repo_path)
-            repo.remotes.origin.pull()
+        with self.metrics.run(os.path.basename(repo_path)):
+            if not self.safe_clone_or_pull(repo_url, repo_path):
+                return
 
-        function_graph = self.analyze_repository(repo_path)
-        task_priorities = self.prioritize_tasks_based_on_analysis(function_graph)
-        self.send_task_priority(task_priorities)
+            function_graph = self.analyze_repository(repo_path)
+            self.send_task_priority(self.compute_task_priorities(function_graph))
 
-# Main method
+# Main method: runs the asyncio analysis service (see AnalysisService.py)
 if __name__ == "__main__":
-    ai_system = ExtendedAI()
-    ai_system.analyze_and_send("https://github.com/JoeySoprano420/AICompilerPlus/tree/main")
-
-def parse_code_for_functions(self, file_name, content, function_graph):
-    function_defs = re.findall(r"def (\w+)\(", content)
-    for func in function_defs:
-        function_graph.add_node(func)
-
-    # Function call tracking
-    for caller in function_defs:
-        caller_block = self.extract_function_block(caller, content)
-        called_functions = re.findall(r"(\w+)\(", caller_block)
-        for callee in called_functions:
-            if callee != caller and callee in function_defs:
-                function_graph.add_edge(caller, callee)
-
-def extract_function_block(self, func_name, content):
-    pattern = re.compile(rf"def {func_name}\(.*?\):((\n    .*)+)")
-    match = pattern.search(content)
-    return match.group(1) if match else ""
-
-from radon.complexity import cc_visit
-
-def compute_complexity_score(self, code):
-    results = cc_visit(code)
-    return {r.name: r.complexity for r in results}
-
-def prioritize_tasks_based_on_analysis(self, function_graph, complexity_scores):
-    priorities = {}
-    for func in function_graph.nodes:
-        call_weight = len(list(function_graph.successors(func)))
-        complexity_weight = complexity_scores.get(func, 1)
-        priorities[func] = call_weight + complexity_weight
-    return priorities
-
-def safe_clone_or_pull(self, repo_url, repo_path):
-    try:
-        if not os.path.exists(repo_path):
-            print(f"Cloning {repo_url}...")
-            git.Repo.clone_from(repo_url, repo_path)
-        else:
-            print(f"Pulling updates for {repo_url}...")
-            repo = git.Repo(repo_path)
-            repo.remotes.origin.pull()
-        return True
-    except Exception as e:
-        print(f"[GIT ERROR] {e}")
-        return False
-
-if not self.safe_clone_or_pull(repo_url, repo_path):
-    return
-
-def distribute_priority_load(self, priorities):
-    sorted_items = sorted(priorities.items(), key=lambda x: x[1], reverse=True)
-    load_balanced = {}
-    weight = 100  # highest priority
-    step = int(100 / len(sorted_items)) if sorted_items else 1
-
-    for func, _ in sorted_items:
-        load_balanced[func] = weight
-        weight = max(weight - step, 1)
-
-    return load_balanced
-
-def visualize_graph(self, function_graph):
-    plt.figure(figsize=(12, 8))
-    pos = nx.spring_layout(function_graph)
-    nx.draw(function_graph, pos, with_labels=True, node_size=1000, font_size=10, node_color="skyblue", edge_color="gray")
-    plt.title("Function Call Graph")
-    plt.show()
-
-def analyze_and_send(self, repo_url):
-    base_dir = "./cloned_repos"
-    os.makedirs(base_dir, exist_ok=True)
-    repo_name = repo_url.split("/")[-1].replace(".git", "")
-    repo_path = os.path.join(base_dir, repo_name)
-
-    if not self.safe_clone_or_pull(repo_url, repo_path):
-        return
-
-    function_graph = self.analyze_repository(repo_path)
-
-    # Reanalyze with radon
-    full_code = "\n".join(open(os.path.join(root, file)).read() for root, _, files in os.walk(repo_path) for file in files if file.endswith('.py'))
-    complexity_scores = self.compute_complexity_score(full_code)
-
-    task_priorities = self.prioritize_tasks_based_on_analysis(function_graph, complexity_scores)
-    balanced_priorities = self.distribute_priority_load(task_priorities)
-
-    self.send_task_priority(balanced_priorities)
+    from AnalysisService import main
+    main()
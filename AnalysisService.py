@@ -0,0 +1,259 @@
+"""
+Long-running asyncio front end for ExtendedAI. Analysis jobs for many repositories
+run at once: git clone/pull and the priority socket run on worker threads, parsing
+runs on the analysis executor, and each stage has its own concurrency limit, so one
+slow `git pull` no longer holds up priority updates for every other repository.
+Concurrent parses share one ParallelParser process pool of ai.parse_workers
+processes, started with the service, so the CPUs are not oversubscribed.
+
+Stage timings (see PipelineMetrics.py) are printed on exit and can be exported
+after every publish as JSON lines or Prometheus text.
+
+Usage: python AnalysisService.py [repo_url ...] [--interval SECONDS] [--render-dir DIR]
+                                 [--metrics-jsonl PATH] [--metrics-prom PATH] [--profile-dir DIR]
+"""
+import argparse
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from queue import Empty
+
+from AiServer import ExtendedAI
+from GraphRendering import FORMATS
+from ParallelParser import make_parse_pool
+
+DEFAULT_REPOSITORY = "https://github.com/JoeySoprano420/AICompilerPlus/tree/main"
+# Seconds to wait before retrying a publish the scheduler did not accept
+SEND_RETRY_DELAY = 5.0
+
+
+class AnalysisService:
+    """
+    Runs analysis jobs and streams their priorities to the scheduler. Finished
+    jobs put (repo_name, priorities) on ai.task_priority_queue; a single sender
+    task merges the latest result of every repository into one map, with task
+    ids prefixed by the repository name, and publishes it as a delta. Sends are
+    serialized because each delta is built on the previous acknowledged one.
+    """
+    def __init__(self, ai=None, git_concurrency=4, parse_concurrency=2, render_dir=None, render_format="png",
+                 metrics_jsonl=None, metrics_prom=None):
+        self.ai = ai or ExtendedAI()
+        self.metrics_jsonl = metrics_jsonl  # Append a metrics snapshot here after every publish
+        self.metrics_prom = metrics_prom  # Rewrite Prometheus text here after every publish
+        self.render_dir = render_dir  # Write each repository's graph here after analysis
+        self.render_format = render_format
+        self.git_concurrency = git_concurrency
+        self.parse_concurrency = parse_concurrency
+        self.repo_priorities = {}  # repo_name -> latest balanced priorities
+        self.jobs = {}  # repo_url -> running job task
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self.executor = None
+        self.sender = None
+
+    async def start(self):
+        # Synchronization primitives are created here so they bind to the running loop
+        self.git_slots = asyncio.Semaphore(self.git_concurrency)
+        self.parse_slots = asyncio.Semaphore(self.parse_concurrency)
+        self.send_lock = asyncio.Lock()
+        self.results_ready = asyncio.Event()
+        self.repo_locks = {}
+        self.executor = ThreadPoolExecutor(max_workers=self.git_concurrency + self.parse_concurrency + 1,
+                                           thread_name_prefix="analysis")
+        self.start_parse_pool()
+        self.sender = asyncio.create_task(self.send_loop())
+
+    async def stop(self):
+        for job in list(self.jobs.values()):
+            job.cancel()
+        await asyncio.gather(*self.jobs.values(), return_exceptions=True)
+        if self.sender is not None:
+            self.sender.cancel()
+            await asyncio.gather(self.sender, return_exceptions=True)
+            await self.publish_pending()  # Last results that arrived before shutdown
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        if self.ai.parse_pool is not None:
+            self.ai.parse_pool.shutdown(wait=True)
+            self.ai.parse_pool = None
+        self.export_metrics()
+        self.ai.priority_client.close()
+        if self.ai.priority_ring is not None:
+            self.ai.priority_publisher.wait_consumed(timeout=1.0)  # Give the reader the last update
+            self.ai.priority_ring.close()
+
+    def start_parse_pool(self):
+        # One pool of ai.parse_workers processes for every concurrent job, started from
+        # the loop's thread instead of being forked per job from the executor threads
+        if self.ai.parse_workers > 1:
+            self.ai.parse_pool = make_parse_pool(self.ai.parse_workers)
+
+    def in_thread(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def submit(self, repo_url):
+        """
+        Schedules an analysis job. A repository that already has a job running is
+        not queued twice; the running job's task is returned instead.
+        """
+        job = self.jobs.get(repo_url)
+        if job is None or job.done():
+            job = self.jobs[repo_url] = asyncio.create_task(self.run_job(repo_url))
+        return job
+
+    async def run_job(self, repo_url):
+        lock = self.repo_locks.setdefault(repo_url, asyncio.Lock())
+        async with lock:
+            try:
+                repo_path = self.ai.repo_path_for(repo_url)
+                async with self.git_slots:
+                    updated = await self.in_thread(self.ai.safe_clone_or_pull, repo_url, repo_path)
+                if not updated:
+                    self.jobs_failed += 1
+                    return False
+                async with self.parse_slots:
+                    priorities = await self.in_thread(self.analyze, repo_path)
+            except asyncio.CancelledError:
+                raise
+            except BrokenProcessPool as e:
+                print(f"[JOB ERROR] {repo_url}: parse workers died ({e}); restarting them")
+                self.restart_parse_pool()
+                self.jobs_failed += 1
+                return False
+            except Exception as e:
+                print(f"[JOB ERROR] {repo_url}: {e}")
+                self.jobs_failed += 1
+                return False
+
+        self.ai.task_priority_queue.put((os.path.basename(repo_path), priorities))
+        self.results_ready.set()
+        self.jobs_done += 1
+        return True
+
+    def restart_parse_pool(self):
+        broken, self.ai.parse_pool = self.ai.parse_pool, None
+        if broken is not None:
+            broken.shutdown(wait=False)
+        self.start_parse_pool()
+
+    def analyze(self, repo_path):
+        # Runs on one executor thread, so a profiled run covers the whole analysis
+        with self.ai.metrics.run(os.path.basename(repo_path)):
+            function_graph = self.ai.analyze_repository(repo_path)
+            if self.render_dir:
+                output_path = os.path.join(self.render_dir, f"{os.path.basename(repo_path)}.{self.render_format}")
+                try:
+                    self.ai.visualize_graph(function_graph, output_path, cache_key=os.path.abspath(repo_path))
+                except Exception as e:
+                    print(f"[RENDER ERROR] {repo_path}: {e}")
+            return self.ai.compute_task_priorities(function_graph)
+
+    async def send_loop(self):
+        while True:
+            await self.results_ready.wait()
+            self.results_ready.clear()
+            if not await self.publish_pending():
+                await asyncio.sleep(SEND_RETRY_DELAY)
+                self.results_ready.set()
+
+    def drain_results(self):
+        changed = False
+        while True:
+            try:
+                repo_name, priorities = self.ai.task_priority_queue.get_nowait()
+            except Empty:
+                return changed
+            self.repo_priorities[repo_name] = priorities
+            changed = True
+
+    def combined_priorities(self):
+        return {f"{repo_name}/{task_id}": priority
+                for repo_name, priorities in self.repo_priorities.items()
+                for task_id, priority in priorities.items()}
+
+    async def publish_pending(self):
+        """
+        Publishes everything queued so far. Returns False when the scheduler
+        could not be reached; the results stay merged and go out on the next try.
+        """
+        async with self.send_lock:
+            self.drain_results()
+            if not self.repo_priorities:
+                return True
+            try:
+                await self.in_thread(self.ai.send_task_priority, self.combined_priorities())
+            except ConnectionError as e:
+                print(f"[SEND ERROR] {e}")
+                return False
+            finally:
+                self.export_metrics()
+            return True
+
+    def export_metrics(self):
+        if self.metrics_jsonl:
+            self.ai.metrics.export_jsonl(self.metrics_jsonl)
+        if self.metrics_prom:
+            self.ai.metrics.write_prometheus(self.metrics_prom)
+
+    async def run_once(self, repo_urls):
+        await asyncio.gather(*(self.submit(url) for url in repo_urls))
+        return await self.publish_pending()
+
+    async def watch(self, repo_urls, interval):
+        """
+        Re-analyzes every repository each interval. Repositories whose previous
+        job is still running are skipped until it finishes.
+        """
+        while True:
+            for url in repo_urls:
+                self.submit(url)
+            await asyncio.sleep(interval)
+
+
+async def serve(repo_urls, interval=None, git_concurrency=4, parse_concurrency=2, render_dir=None, render_format="png",
+                metrics_jsonl=None, metrics_prom=None, profile_dir=None, trace_memory=False):
+    service = AnalysisService(git_concurrency=git_concurrency, parse_concurrency=parse_concurrency,
+                              render_dir=render_dir, render_format=render_format,
+                              metrics_jsonl=metrics_jsonl, metrics_prom=metrics_prom)
+    service.ai.metrics.profile_dir = profile_dir
+    service.ai.metrics.trace_memory = trace_memory
+    await service.start()
+    try:
+        if interval is None:
+            await service.run_once(repo_urls)
+        else:
+            await service.watch(repo_urls, interval)
+    finally:
+        await service.stop()
+    print(f"Jobs completed: {service.jobs_done}, failed: {service.jobs_failed}")
+    print(service.ai.metrics.summary())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze repositories and stream task priorities to the scheduler.")
+    parser.add_argument("repositories", nargs="*", default=[DEFAULT_REPOSITORY])
+    parser.add_argument("--interval", type=float, default=None,
+                        help="Re-analyze every INTERVAL seconds instead of running once")
+    parser.add_argument("--git-concurrency", type=int, default=4)
+    parser.add_argument("--parse-concurrency", type=int, default=2)
+    parser.add_argument("--render-dir", help="Write each repository's call graph to this directory")
+    parser.add_argument("--render-format", choices=FORMATS, default="png")
+    parser.add_argument("--metrics-jsonl", metavar="PATH", help="Append a stage-metrics snapshot after every publish")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="Keep PATH updated with stage metrics in Prometheus text format")
+    parser.add_argument("--profile-dir", metavar="DIR", help="Write a cProfile dump of every analysis run to DIR")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record the tracemalloc peak of each analysis run (slows analysis down; "
+                             "traced analyses run one at a time)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.repositories, args.interval, args.git_concurrency, args.parse_concurrency,
+                          args.render_dir, args.render_format, args.metrics_jsonl,
+                          args.metrics_prom, args.profile_dir, args.trace_memory))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Persistent analysis worker for C++ hosts. Instead of starting Python (and
+importing the analysis libraries) for every request, the host starts one
+worker and sends it requests, either in-process through handle_request() on
+an embedded interpreter or as JSON lines over a pipe to `python Python_Ai.py
+--worker`. Parse caches, function graphs and the priority connection stay warm
+between calls.
+
+Requests and responses are JSON objects, one per line on the pipe:
+
+    {"op": "ping"}
+    {"op": "analyze", "repo": "<git url>"} or {"op": "analyze", "path": "<checkout>"}
+        optional "send": true to publish the priorities to the scheduler socket,
+        "include_priorities": true to return them
+    {"op": "sample"}     the demo priorities from Python_Ai
+    {"op": "stats"}      uptime, request counts and stage metrics (PipelineMetrics)
+    {"op": "shutdown"}   pipe mode only
+
+Every response has "ok"; failures carry "error" instead of raising.
+
+handle() may be called from several threads at once (an embedding host's
+scheduler threads): analyses of the same checkout run one at a time, since
+they share its parse cache and function graph, while other requests and other
+checkouts go ahead.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from PipelineMetrics import metrics
+
+OPS = ("ping", "analyze", "sample", "stats", "shutdown")
+
+
+class AnalysisWorker:
+    def __init__(self):
+        self.ai = None  # ExtendedAI, created by the first analyze request
+        self.started = time.time()
+        self.requests = 0
+        self.busy_seconds = 0.0
+        self.lock = threading.Lock()  # Guards the counters, the ExtendedAI and repo_locks
+        self.repo_locks = {}  # repo_path -> threading.Lock held while analyzing that checkout
+
+    def extended_ai(self):
+        with self.lock:
+            if self.ai is None:
+                from AiServer import ExtendedAI
+                self.ai = ExtendedAI()
+            return self.ai
+
+    def repo_lock(self, repo_path):
+        with self.lock:
+            return self.repo_locks.setdefault(os.path.abspath(repo_path), threading.Lock())
+
+    def handle(self, request):
+        """
+        Runs one request (a dict) and returns the response dict.
+        """
+        start = time.perf_counter()
+        with self.lock:
+            self.requests += 1
+        op = request.get("op")
+        try:
+            if op not in OPS:
+                raise ValueError(f"Unknown op {op!r}; use one of {', '.join(OPS)}")
+            response = getattr(self, f"op_{op}")(request)
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.busy_seconds += elapsed
+        response.setdefault("ok", True)
+        response["seconds"] = elapsed
+        return response
+
+    def op_ping(self, request):
+        return {"pid": os.getpid()}
+
+    def op_shutdown(self, request):
+        return {"shutdown": True}
+
+    def op_stats(self, request):
+        ai = self.ai
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "busy_seconds": self.busy_seconds,
+            "repositories": sorted(ai.function_graphs) if ai else [],
+            "metrics": metrics.snapshot(),
+        }
+
+    def op_sample(self, request):
+        import Python_Ai
+        priorities = Python_Ai.analyze_repository()
+        if request.get("send"):
+            Python_Ai.send_task_priority(priorities)
+        return {"priorities": priorities}
+
+    def op_analyze(self, request):
+        ai = self.extended_ai()
+        if request.get("path"):
+            repo_path = request["path"]
+        elif request.get("repo"):
+            repo_path = ai.repo_path_for(request["repo"])
+        else:
+            raise ValueError("analyze needs a 'repo' url or a 'path'")
+        with self.repo_lock(repo_path):
+            return self.analyze(ai, request, repo_path)
+
+    def analyze(self, ai, request, repo_path):
+        if request.get("path"):
+            if not os.path.isdir(repo_path):
+                raise FileNotFoundError(f"No checkout at {repo_path}")
+        elif not ai.safe_clone_or_pull(request["repo"], repo_path):
+            raise RuntimeError(f"Could not clone or pull {request['repo']}")
+
+        with metrics.run(os.path.basename(repo_path)):
+            function_graph = ai.analyze_repository(repo_path)
+            priorities = ai.compute_task_priorities(function_graph)
+            if request.get("send"):
+                ai.send_task_priority(priorities)
+        response = {"repo_path": repo_path, "functions": function_graph.number_of_nodes(), "tasks": len(priorities)}
+        if request.get("include_priorities"):
+            response["priorities"] = priorities
+        return response
+
+
+# One worker per process, shared by every in-process call
+worker = AnalysisWorker()
+
+
+def handle_request(request_json):
+    """
+    In-process API for embedding hosts: takes a JSON request string and returns
+    a JSON response string. Never raises for a bad request.
+    """
+    try:
+        request = json.loads(request_json)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as e:
+        return json.dumps({"ok": False, "error": f"Bad request: {e}"})
+    return json.dumps(worker.handle(request))
+
+
+def serve_pipe(stdin=None, stdout=None):
+    """
+    Reads JSON-line requests until EOF or a shutdown request, answering each
+    with one JSON line. Anything the analysis prints goes to stderr so stdout
+    only carries responses.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        for line in stdin:
+            if not line.strip():
+                continue
+            response = handle_request(line)
+            stdout.write(response + "\n")
+            stdout.flush()
+            if json.loads(response).get("shutdown"):
+                break
+    finally:
+        sys.stdout = real_stdout
+
+
+class WorkerClient:
+    """
+    Drives a worker subprocess over its pipe, the way InvokePyFromCpp.cpp does.
+    """
+    def __init__(self, command=None):
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Python_Ai.py")
+        self.command = command or [sys.executable, script, "--worker"]
+        self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, bufsize=1)
+
+    def request(self, request):
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise ConnectionError(f"Worker exited with status {self.process.wait()}")
+        return json.loads(line)
+
+    def close(self):
+        if self.process.poll() is None:
+            try:
+                self.request({"op": "shutdown"})
+            except (ConnectionError, OSError):
+                pass
+            self.process.stdin.close()
+            self.process.wait()
@@ -0,0 +1,57 @@
+"""
+Wall time to compile a batch of files: one blocking subprocess.run after
+another (what Interpreter.execute_compile did), the CompileJobPool on a cold
+cache, and the pool again with every input unchanged. The compiler is a stand-in
+script that starts, sleeps briefly and prints a few lines, so the numbers show
+pooling and caching rather than compiler speed.
+
+Usage: python BenchmarkCompileJobs.py [files] [workers]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from CompileJobs import CompileJobPool
+
+STAND_IN_COMPILER = "import sys, time\ntime.sleep(0.2)\nfor i in range(3):\n    print('compiled', sys.argv[1], i)\n"
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    results = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed:7.2f}s")
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as work_dir:
+        compiler = os.path.join(work_dir, "compiler.py")
+        with open(compiler, "w") as f:
+            f.write(STAND_IN_COMPILER)
+        code_files = []
+        for index in range(count):
+            code_files.append(os.path.join(work_dir, f"module{index}.acp"))
+            with open(code_files[-1], "w") as f:
+                f.write(f"set x {index}\n")
+        command = [sys.executable, compiler]
+        pool = CompileJobPool(command, workers=workers, cache_dir=os.path.join(work_dir, "cache"))
+
+        print(f"{count} files, {workers} workers")
+        timed("sequential subprocess.run", lambda: [
+            subprocess.run(command + [code_file], capture_output=True, text=True) for code_file in code_files])
+        cold = timed("pool, cold cache", lambda: pool.compile_all(code_files))
+        timed("pool, unchanged inputs", lambda: pool.compile_all(code_files))
+        pool.shutdown()
+
+        for name in ("queue_wait", "startup", "run_time"):
+            values = sorted(getattr(result, name) for result in cold)
+            print(f"cold {name:<10} median {values[len(values) // 2] * 1000:7.1f} ms  max {values[-1] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Console output of a chatty command that writes to both stdout and stderr. The
+old run_command read stdout only, line by line, so once the unread stderr pipe
+filled up the command blocked forever; it is given a timeout here. The
+pipeline drains both pipes and the GUI would flush them in batches: the report
+shows lines per second and how many widget inserts that takes at the default
+flush interval, against one insert (and one see()) per line before.
+
+Usage: python BenchmarkConsole.py [lines] [commands]
+"""
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+from ConsolePipeline import FLUSH_INTERVAL_MS, ConsolePipeline
+
+CHATTY = ("import sys\n"
+          "for i in range({lines}):\n"
+          "    sys.stdout.write(f'compiling unit {{i}}\\n')\n"
+          "    sys.stderr.write(f'warning: unit {{i}} uses a deprecated call\\n')\n")
+
+
+def chatty_command(lines):
+    arguments = [sys.executable, "-c", CHATTY.format(lines=lines)]
+    return shlex.join(arguments) if os.name == "posix" else subprocess.list2cmdline(arguments)
+
+
+def run_old(lines, timeout):
+    # No shell, so killing the process below closes its pipes
+    process = subprocess.Popen([sys.executable, "-c", CHATTY.format(lines=lines)], stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True)
+    received = [0]
+
+    def threaded_run():
+        # The old loop, counting lines instead of inserting them
+        for line in iter(process.stdout.readline, ""):
+            received[0] += 1
+        process.stdout.close()
+        process.wait()
+
+    start = time.perf_counter()
+    reader = threading.Thread(target=threaded_run, daemon=True)
+    reader.start()
+    reader.join(timeout)
+    finished = not reader.is_alive()
+    elapsed = time.perf_counter() - start
+    process.kill()
+    reader.join()
+    return received[0], finished, elapsed
+
+
+def run_pipeline(lines, commands):
+    pipeline = ConsolePipeline()
+    start = time.perf_counter()
+    for index in range(commands):
+        pipeline.start(chatty_command(lines), f"job{index}")
+    received = flushes = exits = 0
+    while exits < commands:
+        time.sleep(FLUSH_INTERVAL_MS / 1000)
+        batch = pipeline.drain()
+        flushes += bool(batch)
+        exits += sum(1 for entry in batch if entry[1] == "exit")
+        received += len(batch) - sum(1 for entry in batch if entry[1] == "exit")
+    return received, flushes, time.perf_counter() - start
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    print(f"command writing {lines} lines to stdout and {lines} to stderr")
+
+    received, finished, elapsed = run_old(lines, timeout=5.0)
+    status = "finished" if finished else "still blocked on its stderr pipe"
+    print(f"old run_command       {received:8d} lines in {elapsed:6.2f}s, command {status}; "
+          f"{received} inserts")
+
+    for count in (1, commands):
+        received, flushes, elapsed = run_pipeline(lines, count)
+        print(f"pipeline, {count} command(s)  {received:8d} lines in {elapsed:6.2f}s "
+              f"({received / elapsed:9.0f} lines/s), {flushes} batched inserts")
+
+
+if __name__ == "__main__":
+    main()
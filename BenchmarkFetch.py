@@ -0,0 +1,111 @@
+"""
+Repository acquisition against local bare repositories served over file://:
+the old full clone and `pull` against RepositoryFetcher's shallow, partial,
+sparse clone and fetch-only update. The synthetic repositories have a history
+of commits touching Python sources and large non-Python assets. Reports time
+and disk used by each checkout, the update after one more commit, and many
+repositories acquired one after another against acquire_all()'s pool.
+
+Usage: python BenchmarkFetch.py [commits] [asset_kib] [repositories] [workers]
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import git
+
+from RepositoryFetcher import RepositoryFetcher
+
+
+def make_remote(work_dir, name, commits, asset_kib, rng):
+    source = os.path.join(work_dir, f"{name}-src")
+    repo = git.Repo.init(source)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "benchmark")
+        config.set_value("user", "email", "benchmark@example.com")
+    os.makedirs(os.path.join(source, "pkg"))
+    os.makedirs(os.path.join(source, "assets"))
+    for commit in range(commits):
+        for index in rng.sample(range(40), 5):
+            with open(os.path.join(source, "pkg", f"mod{index}.py"), "a") as f:
+                f.write(f"def f{commit}_{index}(x):\n    return x + {commit}\n")
+        with open(os.path.join(source, "assets", f"asset{commit % 10}.bin"), "wb") as f:
+            f.write(rng.randbytes(asset_kib * 1024))
+        repo.git.add("-A")
+        repo.index.commit(f"commit {commit}")
+    remote = os.path.join(work_dir, f"{name}.git")
+    git.Repo.clone_from(source, remote, bare=True)
+    git.Repo(remote).git.config("uploadpack.allowFilter", "true")
+    return source, remote
+
+
+def push_commit(source, remote, message):
+    repo = git.Repo(source)
+    with open(os.path.join(source, "pkg", "mod0.py"), "a") as f:
+        f.write(f"def changed_{time.perf_counter_ns()}():\n    return 0\n")
+    repo.git.add("-A")
+    repo.index.commit(message)
+    repo.git.push(remote, "HEAD:refs/heads/" + repo.active_branch.name)
+
+
+def disk_usage(path):
+    output = subprocess.run(["du", "-sk", path], capture_output=True, text=True).stdout
+    return int(output.split()[0]) / 1024 if output else 0.0
+
+
+def legacy_acquire(url, path):
+    # What safe_clone_or_pull did before
+    if not os.path.exists(path):
+        git.Repo.clone_from(url, path)
+    else:
+        git.Repo(path).remotes.origin.pull()
+
+
+def timed(action, *args):
+    start = time.perf_counter()
+    action(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    commits = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    asset_kib = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    repositories = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+    rng = random.Random(0)
+    fetcher = RepositoryFetcher(extensions=(".py",), workers=workers)
+    with tempfile.TemporaryDirectory() as work_dir:
+        source, remote = make_remote(work_dir, "main", commits, asset_kib, rng)
+        url = "file://" + remote
+        print(f"{commits} commits, 10 x {asset_kib} KiB assets rewritten in turn; remote {disk_usage(remote):.1f} MiB")
+
+        full_path, fetched_path = os.path.join(work_dir, "full"), os.path.join(work_dir, "fetched")
+        full_clone = timed(legacy_acquire, url, full_path)
+        shallow_clone = timed(fetcher.acquire, url, fetched_path)
+        print(f"{'clone':<28}{'seconds':>9}{'disk MiB':>10}")
+        print(f"{'full clone (old)':<28}{full_clone:>9.2f}{disk_usage(full_path):>10.1f}")
+        print(f"{'shallow sparse clone':<28}{shallow_clone:>9.2f}{disk_usage(fetched_path):>10.1f}")
+
+        push_commit(source, remote, "one more commit")
+        print(f"{'pull (old)':<28}{timed(legacy_acquire, url, full_path):>9.2f}")
+        start = time.perf_counter()
+        result = fetcher.acquire(url, fetched_path)
+        print(f"{'fetch + reset':<28}{time.perf_counter() - start:>9.2f}   changed {result.changed}")
+
+        remotes = [make_remote(work_dir, f"repo{index}", max(commits // 4, 1), asset_kib, rng)[1]
+                   for index in range(repositories)]
+        serial = RepositoryFetcher(extensions=(".py",), workers=1)
+        for label, active, tag in ((f"{repositories} repos, one at a time", serial, "serial"),
+                                   (f"{repositories} repos, {workers} workers", fetcher, "pooled")):
+            targets = [("file://" + path, os.path.join(work_dir, f"{tag}-{index}")) for index, path in enumerate(remotes)]
+            start = time.perf_counter()
+            results = active.acquire_all(targets)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<28}{elapsed:>9.2f}   {sum(r.ok for r in results)} ok")
+
+
+if __name__ == "__main__":
+    main()
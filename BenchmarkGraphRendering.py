@@ -0,0 +1,42 @@
+"""
+Times headless rendering of a large synthetic function graph to every output
+format, and the spring layout of a small graph with and without the layout
+cache. Output files go to a temporary directory.
+
+Usage: python BenchmarkGraphRendering.py [functions] [edges_per_function] [max_nodes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from BenchmarkGraphStore import build_compact, synthetic_results
+from GraphRendering import FORMATS, render_graph
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    edges_per_function = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    max_nodes = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    graph = build_compact(synthetic_results(functions * edges_per_function, edges_per_function, 50))
+    print(f"{functions} functions, {functions * edges_per_function} call edges, top {max_nodes} drawn")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for file_format in FORMATS:
+            path = os.path.join(output_dir, f"graph.{file_format}")
+            start = time.perf_counter()
+            rendered = render_graph(graph, path, max_nodes=max_nodes, title="Synthetic graph")
+            elapsed = time.perf_counter() - start
+            print(f"{file_format:<5} {elapsed:7.2f}s  {len(rendered)} nodes, {len(rendered.sources)} edges, "
+                  f"{os.path.getsize(path) / 1024:.0f} KiB")
+
+        small = build_compact(synthetic_results(2000 * edges_per_function, edges_per_function, 50))
+        for label in ("spring, cold cache", "spring, warm cache"):
+            start = time.perf_counter()
+            render_graph(small, os.path.join(output_dir, "small.png"), max_nodes=250, layout="spring",
+                         cache_key="benchmark", cache_dir=os.path.join(output_dir, "layouts"))
+            print(f"{label:<20} {time.perf_counter() - start:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
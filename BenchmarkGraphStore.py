@@ -0,0 +1,90 @@
+"""
+Compares CompactGraph with the networkx DiGraph it replaced on the analysis hot
+path: build time and memory held by the graph after merging synthetic per-file
+results, plus the CSR export the priority engine reads. Memory is measured with
+tracemalloc in a separate build, so the timings are not slowed down by tracing.
+
+Usage: python BenchmarkGraphStore.py [edges] [edges_per_function] [functions_per_file]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import networkx as nx
+
+from CompactGraph import CompactGraph
+from FileAnalysis import add_file_result
+from PriorityEngine import CSRGraph
+
+
+def synthetic_results(edges, edges_per_function, functions_per_file, seed=0):
+    rng = random.Random(seed)
+    functions = edges // edges_per_function
+    names = [f"pkg.mod{i // functions_per_file}:func_{i}" for i in range(functions)]
+    results = []
+    for start in range(0, functions, functions_per_file):
+        defs = names[start:start + functions_per_file]
+        results.append((f"pkg/mod{start // functions_per_file}.py", {
+            "defs": defs,
+            "edges": [(caller, rng.choice(names)) for caller in defs for _ in range(edges_per_function)],
+            "complexity": {func: rng.randrange(1, 20) for func in defs},
+        }))
+    return results
+
+
+def build_networkx(results):
+    graph = nx.DiGraph()
+    for rel_path, result in results:
+        add_file_result(graph, rel_path, result)
+    return graph
+
+
+def build_compact(results):
+    graph = CompactGraph()
+    for rel_path, result in results:
+        graph.add_file_result(rel_path, result)
+    return graph
+
+
+def measure(build, results):
+    gc.collect()
+    start = time.perf_counter()
+    graph = build(results)
+    elapsed = time.perf_counter() - start
+    del graph
+    gc.collect()
+
+    tracemalloc.start()
+    graph = build(results)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, size, graph
+
+
+def main():
+    edges = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    edges_per_function = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    functions_per_file = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    results = synthetic_results(edges, edges_per_function, functions_per_file)
+    print(f"{len(results)} files, {edges // edges_per_function} functions, {edges} call edges")
+
+    rows = []
+    for label, build, export in (("networkx DiGraph", build_networkx, CSRGraph.from_networkx),
+                                 ("CompactGraph", build_compact, lambda graph: graph.to_csr())):
+        elapsed, size, graph = measure(build, results)
+        export_time = time.perf_counter()
+        csr = export(graph)
+        export_time = time.perf_counter() - export_time
+        rows.append((label, elapsed, size, export_time, len(csr), len(csr.indices)))
+        del graph, csr
+
+    for label, elapsed, size, export_time, nodes, unique_edges in rows:
+        print(f"{label:<18} build {elapsed:7.2f}s  {size / 2**20:8.1f} MiB  "
+              f"CSR export {export_time:6.2f}s  ({nodes} nodes, {unique_edges} edges)")
+    print(f"memory ratio {rows[0][2] / rows[1][2]:.1f}x, build speedup {rows[0][1] / rows[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Local load test for PriorityIngestServer. Many producers connect at once, each
+sending frames of priority maps (as PriorityClient.send() does) and finishing
+with a stats request, so its finish time is when the server has taken all of
+its tasks. A consumer drains tasks at a fixed rate standing in for the
+scheduler. The baseline serves one connection at a time and runs its tasks
+before accepting the next, like SocketServer.cpp. The ingest server is run with
+a small queue under each policy, so backpressure and drops show up.
+
+Usage: python BenchmarkIngest.py [producers] [frames_per_producer] [tasks_per_frame] [capacity] [drain_rate]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from PipelineMetrics import PipelineMetrics
+from PriorityIngestServer import POLICIES, PriorityIngestServer, read_frame_async
+from PriorityTransport import HOST, decode_frame, encode_frame
+
+
+class SerialServer:
+    """
+    One connection at a time: read every frame, then run the tasks at the drain
+    rate, then accept the next producer.
+    """
+    def __init__(self, drain_rate):
+        self.drain_rate = drain_rate
+        self.turn = asyncio.Lock()
+        self.tasks = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, HOST, 0, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        async with self.turn:
+            received = 0
+            while True:
+                frame = await read_frame_async(reader)
+                if frame is None:
+                    break
+                message = decode_frame(*frame)
+                if message.get("type") == "stats":
+                    writer.write(encode_frame({"type": "stats"}))
+                    await writer.drain()
+                    continue
+                received += len(message)
+            writer.close()
+            self.tasks += received
+            await asyncio.sleep(received / self.drain_rate)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def make_frames(producer, frames, tasks_per_frame, rng):
+    return [encode_frame({f"producer{producer}/task{frame * tasks_per_frame + t}": rng.randrange(100)
+                          for t in range(tasks_per_frame)})
+            for frame in range(frames)]
+
+
+async def produce(port, frames, started):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    for frame in frames:
+        writer.write(frame)
+        await writer.drain()
+    writer.write(encode_frame({"type": "stats"}))
+    await writer.drain()
+    await read_frame_async(reader)
+    writer.close()
+    return time.perf_counter() - started
+
+
+async def drain_at(server, rate, batch_size=256):
+    # Scheduler stand-in: takes tasks off the queue no faster than `rate` per second
+    while True:
+        batch = await server.queue.pop(batch_size)
+        server.totals["tasks_forwarded"] += len(batch)
+        await asyncio.sleep(len(batch) / rate)
+
+
+async def run(server, all_frames, drain_rate=None):
+    await server.start()
+    consumer = asyncio.create_task(drain_at(server, drain_rate)) if drain_rate else None
+    started = time.perf_counter()
+    finish_times = await asyncio.gather(*(produce(server.port, frames, started) for frames in all_frames))
+    elapsed = time.perf_counter() - started
+    if consumer is not None:
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+    await server.stop()
+    return elapsed, finish_times
+
+
+def report(label, tasks, elapsed, finish_times, extra=""):
+    print(f"{label:<22}{elapsed:>8.2f}{tasks / elapsed:>12.0f}{statistics.median(finish_times):>10.3f}"
+          f"{max(finish_times):>10.3f}  {extra}")
+
+
+async def main():
+    producers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    tasks_per_frame = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    capacity = int(sys.argv[4]) if len(sys.argv) > 4 else 2000
+    drain_rate = float(sys.argv[5]) if len(sys.argv) > 5 else 100000
+    rng = random.Random(0)
+    all_frames = [make_frames(p, frames, tasks_per_frame, rng) for p in range(producers)]
+    tasks = producers * frames * tasks_per_frame
+    print(f"{producers} producers x {frames} frames x {tasks_per_frame} tasks = {tasks} tasks; "
+          f"consumer drains {drain_rate:.0f} tasks/s; queue capacity {capacity}")
+    print(f"{'server':<22}{'seconds':>8}{'tasks/s':>12}{'p50 done':>10}{'last done':>10}")
+
+    serial = SerialServer(drain_rate)
+    elapsed, finish_times = await run(serial, all_frames)
+    report("one at a time", serial.tasks, elapsed, finish_times)
+
+    unbounded = PriorityIngestServer(HOST, 0, capacity=tasks, recorder=PipelineMetrics())
+    elapsed, finish_times = await run(unbounded, all_frames)
+    report("ingest, unbounded", unbounded.totals["tasks_added"], elapsed, finish_times,
+           f"depth {unbounded.queue.high_water}")
+
+    for policy in POLICIES:
+        server = PriorityIngestServer(HOST, 0, capacity=capacity, policy=policy, recorder=PipelineMetrics())
+        elapsed, finish_times = await run(server, all_frames, drain_rate)
+        stats = server.stats()
+        report(f"ingest, {policy}", stats["tasks_received"], elapsed, finish_times,
+               f"max depth {stats['high_water']}, dropped {stats['tasks_dropped']}, "
+               f"producers blocked {stats['blocked_seconds']:.1f}s in total")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Statements per second when the same sandboxed script is executed repeatedly:
+the original Interpreter (split the source and walk an if/elif chain on every
+execute), the compiled interpreter with its program cache disabled, and with
+the cache on. The legacy class is copied here as it was; it dispatches every
+token, so its output differs, but the work per execute is what it did.
+
+Usage: python BenchmarkInterpreter.py [runs]
+"""
+import sys
+import time
+
+from SandboxInterpreter import Interpreter
+
+SCRIPT = "\n".join([
+    "set x 5",
+    "set y 7",
+    "function add a,b load a then load b then add them and store the sum of a and b",
+    "function scale a load a then multiply it by ten and store a times ten",
+    "add x y",
+    "add x 2",
+    "scale y",
+    "if x add y x",
+    "try scale x",
+    "set z 11",
+    "add z x",
+    "scale z",
+] * 4)
+
+
+class LegacyInterpreter:
+    def __init__(self):
+        self.variables = {}
+        self.functions = {}
+        self.error_handler = lambda message: None
+        self.sandboxed = True
+        self.state = {}
+        self.cache = {}
+
+    def execute(self, code):
+        operations = code.split()
+        for op in operations:
+            try:
+                if self.sandboxed and 'read_file' in op or 'write_file' in op:
+                    raise RuntimeError("Sandboxing prevents file access.")
+                if op == 'print':
+                    print(operations[1])
+                elif op == 'set':
+                    self.variables[operations[1]] = operations[2]
+                elif op == 'function':
+                    self.functions[operations[1]] = {'params': operations[2].split(','), 'body': operations[3:]}
+                elif op == 'if':
+                    self.execute_if(operations)
+                elif op == 'try':
+                    self.execute_try(operations)
+                elif op == 'async':
+                    self.execute_async(operations)
+                elif op == 'await':
+                    self.execute_await(operations)
+                elif op in self.functions:
+                    if op not in self.cache:
+                        self.cache[op] = self.functions[op]['body']
+                else:
+                    self.error_handler(f"Unrecognized operation: {op}")
+            except Exception as e:
+                self.error_handler(f"Error during execution: {str(e)}")
+
+
+def timed(label, interpreter, runs, statements):
+    start = time.perf_counter()
+    for _ in range(runs):
+        interpreter.execute(SCRIPT)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {runs * statements / elapsed:12.0f} statements/s  ({elapsed:.3f}s)")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    statements = len(Interpreter().parse(SCRIPT))
+    print(f"{runs} runs of a {statements}-statement script")
+    timed("legacy split + if/elif", LegacyInterpreter(), runs, statements)
+    timed("compiled, no program cache", Interpreter(program_cache_size=0), runs, statements)
+    timed("compiled, no memoization", Interpreter(memo_size=0), runs, statements)
+    timed("compiled + cached + memoized", Interpreter(), runs, statements)
+
+
+if __name__ == "__main__":
+    main()
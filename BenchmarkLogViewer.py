@@ -0,0 +1,71 @@
+"""
+Opening a large synthetic build log the old way (read() into one string, which
+view_logs then inserted into a ScrolledText) against LogIndex: time and Python
+memory to open it, render one window of lines, search for a rare message and
+pick up appended output. The log is written to a temporary directory.
+
+Usage: python BenchmarkLogViewer.py [megabytes] [window_lines]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from LogViewer import LogIndex
+
+LINE = "[{0:>9}] cl.exe /O2 /c src/module_{1}.cpp -> obj/module_{1}.obj  warning C4996: deprecated call ignored\n"
+
+
+def write_log(path, megabytes):
+    lines = 0
+    with open(path, "w") as log_file:
+        block = "".join(LINE.format(i, i % 997) for i in range(10000))
+        while log_file.tell() < megabytes << 20:
+            log_file.write(block)
+            lines += 10000
+        log_file.write("error LNK2019: unresolved external symbol rare_symbol\n")
+    return lines + 1
+
+
+def measure(label, action):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<36} {elapsed * 1000:10.2f} ms   peak {peak / (1 << 20):9.2f} MiB")
+    return result
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "build_log.log")
+        lines = write_log(path, megabytes)
+        print(f"{os.path.getsize(path) / (1 << 20):.0f} MiB log, {lines} lines, {window}-line window")
+
+        def read_whole():
+            with open(path, "r") as log_file:
+                return len(log_file.read())
+        measure("old: read() whole log", read_whole)
+
+        index = measure("LogIndex: open and index", lambda: LogIndex(path))
+        print(f"{'':<36} index {len(index.checkpoints) * index.checkpoints.itemsize / (1 << 20):.2f} MiB "
+              f"for {len(index)} lines")
+        measure("window at the middle", lambda: index.lines(len(index) // 2, window))
+        measure("window at the end", lambda: index.lines(len(index) - window, window))
+        found = measure("search from the top (rare line)", lambda: index.search("rare_symbol", -1))
+        assert found == len(index) - 1
+        measure("search backwards from the end", lambda: index.search("module_5.cpp", len(index), backwards=True))
+
+        with open(path, "a") as log_file:
+            log_file.write("".join(LINE.format(i, i % 997) for i in range(1000)))
+        measure("follow: index 1000 appended lines", index.refresh)
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cost of the stage instrumentation: one empty timed stage with metrics on and
+off, and a cold analysis of a synthetic repository (serial parsing, so every
+per-file stage runs in this process) with metrics off, on, and on with the
+optional cProfile and tracemalloc capture. Prints the stage table of the last
+instrumented run.
+
+Usage: python BenchmarkMetrics.py [files] [repeats]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from AiServer import ExtendedAI
+from BenchmarkWorker import make_repository
+from PipelineMetrics import metrics
+
+
+def stage_overhead(calls=200000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        with metrics.stage("overhead", items=1):
+            pass
+    return (time.perf_counter() - start) / calls
+
+
+def cold_analysis(repo_path, work_dir):
+    shutil.rmtree(os.path.join(work_dir, "cloned_repos"), ignore_errors=True)  # No parse cache
+    ai = ExtendedAI()
+    ai.parse_workers = 1
+    start = time.perf_counter()
+    with metrics.run(os.path.basename(repo_path)):
+        ai.compute_task_priorities(ai.analyze_repository(repo_path))
+    ai.priority_client.close()
+    return time.perf_counter() - start
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    for enabled in (False, True):
+        metrics.enabled = enabled
+        print(f"empty stage, metrics {'on' if enabled else 'off':<3}  {stage_overhead() * 1e9:8.0f} ns")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)  # Parse caches go under ./cloned_repos here
+        repo_path = os.path.join(work_dir, "synthetic")
+        make_repository(repo_path, files)
+        print(f"cold analysis of a {files}-file repository, median of {repeats}")
+        for label, enabled, profile_dir, trace_memory in (
+                ("metrics off", False, None, False),
+                ("metrics on", True, None, False),
+                ("metrics + cProfile", True, os.path.join(work_dir, "profiles"), False),
+                ("metrics + tracemalloc", True, None, True)):
+            metrics.reset()
+            metrics.enabled, metrics.profile_dir, metrics.trace_memory = enabled, profile_dir, trace_memory
+            samples = [cold_analysis(repo_path, work_dir) for _ in range(repeats)]
+            print(f"{label:<24} {statistics.median(samples):8.3f}s")
+            if label == "metrics on":
+                table = metrics.summary()
+        metrics.enabled, metrics.profile_dir, metrics.trace_memory = True, None, False
+        print(table)
+
+
+if __name__ == "__main__":
+    main()
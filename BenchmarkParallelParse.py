@@ -0,0 +1,52 @@
+"""
+Times serial against multi-process parsing of one repository and checks that every
+worker count produces exactly the same per-file records as the serial path.
+
+Usage: python BenchmarkParallelParse.py <repo_path> [max_workers] [chunksize]
+"""
+import sys
+import time
+
+from FileAnalysis import SOURCE_EXTENSIONS
+from ParallelParser import DEFAULT_CHUNKSIZE, default_workers, parse_files
+from ParseCache import iter_source_files
+
+
+def timed_parse(repo_path, rel_paths, workers, chunksize):
+    start = time.perf_counter()
+    records = list(parse_files(repo_path, [(rel_path, None) for rel_path in rel_paths], workers, chunksize))
+    return time.perf_counter() - start, records
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(2)
+    repo_path = sys.argv[1]
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else default_workers()
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CHUNKSIZE
+
+    rel_paths = list(iter_source_files(repo_path, SOURCE_EXTENSIONS))
+    print(f"{len(rel_paths)} source files, chunksize {chunksize}")
+
+    serial_time, serial_records = timed_parse(repo_path, rel_paths, 1, chunksize)
+    print(f"  1 worker : {serial_time:8.3f}s  {len(rel_paths) / serial_time:10.1f} files/s")
+
+    mismatches = 0
+    workers = 2
+    while workers <= max_workers:
+        elapsed, records = timed_parse(repo_path, rel_paths, workers, chunksize)
+        speedup = serial_time / elapsed
+        identical = records == serial_records
+        mismatches += not identical
+        print(f"{workers:3d} workers: {elapsed:8.3f}s  {len(rel_paths) / elapsed:10.1f} files/s  "
+              f"speedup {speedup:5.2f}x  efficiency {speedup / workers:5.0%}  identical={identical}")
+        workers *= 2
+
+    if mismatches:
+        print("Parallel output differs from the serial path!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
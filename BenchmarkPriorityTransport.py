@@ -0,0 +1,176 @@
+"""
+Loopback throughput benchmark for priority updates: the old connect-per-update JSON
+send against PriorityClient's persistent framed connection with each codec, and
+with batching. Reports messages/sec and bytes/sec as seen by the receiver, then
+compares resending the full map every cycle against versioned delta updates.
+
+Usage: python BenchmarkPriorityTransport.py [messages] [tasks_per_message] [map_size] [changes_per_cycle]
+"""
+import json
+import random
+import socket
+import sys
+import threading
+import time
+
+from PrioritySync import DeltaPublisher, PriorityState
+from PriorityTransport import PriorityClient, decode_frame, encode_frame, msgpack, read_frame
+
+
+class LoopbackSink:
+    """
+    Receives on an ephemeral port and decodes everything it is sent, framed or
+    (legacy) one raw JSON document per connection.
+    """
+    def __init__(self, framed, state=None):
+        self.framed = framed
+        self.state = state  # PriorityState answering full/delta messages
+        self.tasks_applied = 0
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        self.bytes_received = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        with conn:
+            if not self.framed:
+                data = b"".join(iter(lambda: conn.recv(65536), b""))
+                json.loads(data)
+                self.count(len(data))
+                return
+            while True:
+                frame = read_frame(conn)
+                if frame is None:
+                    return
+                message = decode_frame(*frame)
+                if self.state is not None:
+                    reply, upserts, _ = self.state.apply(message)
+                    self.tasks_applied += len(upserts)
+                    if reply is not None:
+                        conn.sendall(encode_frame(reply))
+                self.count(5 + len(frame[1]))
+
+    def count(self, size):
+        with self.lock:
+            self.bytes_received += size
+            self.messages += 1
+
+    def wait_for(self, total_bytes, timeout=60):
+        deadline = time.time() + timeout
+        while self.bytes_received < total_bytes and time.time() < deadline:
+            time.sleep(0.001)
+
+    def close(self):
+        self.server.close()
+
+
+def make_messages(messages, tasks_per_message):
+    return [{f"task_{m}_{t}": {"priority": t % 100, "executionTime": t} for t in range(tasks_per_message)}
+            for m in range(messages)]
+
+
+def run_legacy(updates):
+    sink = LoopbackSink(framed=False)
+    start = time.perf_counter()
+    sent = 0
+    for priorities in updates:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.connect(("127.0.0.1", sink.port))
+            data = json.dumps(priorities).encode()
+            s.sendall(data)
+            sent += len(data)
+    sink.wait_for(sent)
+    elapsed = time.perf_counter() - start
+    sink.close()
+    return elapsed, sent
+
+
+def run_client(updates, codec, batched):
+    sink = LoopbackSink(framed=True)
+    client = PriorityClient("127.0.0.1", sink.port, codec=codec, batch_size=len(updates[0]) * 64)
+    start = time.perf_counter()
+    for priorities in updates:
+        if batched:
+            client.queue(priorities)
+        else:
+            client.send(priorities)
+    client.flush()
+    sink.wait_for(client.bytes_sent)
+    elapsed = time.perf_counter() - start
+    client.close()
+    sink.close()
+    return elapsed, client.bytes_sent
+
+
+def run_cycles(cycles, map_size, changes_per_cycle, delta):
+    """
+    Re-prioritization cycles over one large map where only a few tasks change
+    between cycles. The initial full sync is not counted. Returns (seconds,
+    bytes sent, tasks the receiver re-queued).
+    """
+    rng = random.Random(0)
+    tasks = {f"module:func_{i}": {"priority": rng.randrange(100), "executionTime": 0} for i in range(map_size)}
+    names = list(tasks)
+    sink = LoopbackSink(framed=True, state=PriorityState())
+    client = PriorityClient("127.0.0.1", sink.port)
+    publisher = DeltaPublisher(client)
+    if delta:
+        publisher.publish(tasks)
+    else:
+        client.send(tasks)
+    sink.wait_for(client.bytes_sent)
+    initial_bytes, initial_applied = client.bytes_sent, sink.tasks_applied
+    start = time.perf_counter()
+    for _ in range(cycles):
+        for name in rng.sample(names, changes_per_cycle):
+            tasks[name] = {"priority": rng.randrange(100), "executionTime": 0}
+        if delta:
+            publisher.publish(tasks)
+        else:
+            client.send(tasks)
+    client.flush()
+    sink.wait_for(client.bytes_sent)
+    elapsed = time.perf_counter() - start
+    client.close()
+    sink.close()
+    return elapsed, client.bytes_sent - initial_bytes, sink.tasks_applied - initial_applied
+
+
+def report(label, messages, elapsed, sent):
+    print(f"{label:<22} {messages / elapsed:12.0f} msg/s {sent / elapsed / 1e6:10.2f} MB/s  ({elapsed:.3f}s)")
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tasks_per_message = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    map_size = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    changes_per_cycle = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+    updates = make_messages(messages, tasks_per_message)
+    print(f"{messages} updates of {tasks_per_message} tasks over loopback")
+
+    report("connect-per-update", messages, *run_legacy(updates))
+    codecs = ["json", "records"] + (["msgpack"] if msgpack is not None else [])
+    for codec in codecs:
+        report(f"persistent {codec}", messages, *run_client(updates, codec, batched=False))
+    for codec in codecs:
+        report(f"batched {codec}", messages, *run_client(updates, codec, batched=True))
+
+    cycles = 20
+    print(f"\n{cycles} cycles over a {map_size}-task map, {changes_per_cycle} changes per cycle")
+    for label, delta in (("full map", False), ("delta", True)):
+        elapsed, sent, applied = run_cycles(cycles, map_size, changes_per_cycle, delta)
+        print(f"{label:<22} {sent / cycles / 1024:10.1f} KiB/cycle {applied / cycles:10.0f} tasks re-queued/cycle  ({elapsed:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
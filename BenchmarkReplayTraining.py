@@ -0,0 +1,67 @@
+"""
+Transitions per second for SmartLearning's training loop: the original eager
+per-step update (three model calls and a GradientTape for every transition)
+against the replay-buffer trainer with compiled minibatch updates.
+
+Usage: python BenchmarkReplayTraining.py [episodes] [batch_size]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+import SmartLearning
+from SmartLearning import ACTIONS, QNetwork, action_space, env, loss_fn
+
+
+def legacy_train(num_episodes, epsilon=0.1):
+    model = QNetwork(action_space)
+    optimizer = tf.keras.optimizers.Adam(learning_rate=0.001)
+    steps = 0
+    for _ in range(num_episodes):
+        state = np.array(env.reset())
+        while True:
+            if random.random() < epsilon:
+                action = random.choice(range(action_space))
+            else:
+                q_values = model(tf.convert_to_tensor([state], dtype=tf.float32))
+                action = np.argmax(q_values.numpy())
+            next_state, reward = env.step(ACTIONS[action])
+            next_state = np.array(next_state)
+            with tf.GradientTape() as tape:
+                q_values = model(tf.convert_to_tensor([state], dtype=tf.float32))
+                next_q_values = model(tf.convert_to_tensor([next_state], dtype=tf.float32))
+                q_value = q_values[0, action]
+                target = reward + 0.99 * np.max(next_q_values.numpy())
+                loss = loss_fn([target], [q_value])  # Scalar MSE is rejected by Keras 3
+            grads = tape.gradient(loss, model.trainable_variables)
+            optimizer.apply_gradients(zip(grads, model.trainable_variables))
+            state = next_state
+            steps += 1
+            if np.random.random() < 0.1:
+                break
+    return steps
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    steps = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {steps:7d} transitions {elapsed:8.2f}s {steps / elapsed:10.0f} transitions/s")
+
+
+def main():
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    random.seed(0)
+    np.random.seed(0)
+    timed("eager per-step update", legacy_train, episodes)
+    for train_every in (1, 4):
+        timed(f"replay, batch {batch_size}, every {train_every}", SmartLearning.train,
+              num_episodes=episodes, batch_size=batch_size, train_every=train_every)
+
+
+if __name__ == "__main__":
+    main()
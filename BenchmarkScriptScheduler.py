@@ -0,0 +1,44 @@
+"""
+Wall time for scripts that each start two compiles with `async` and `await`
+them: the synchronous Interpreter runs every compile in turn, the
+ScriptScheduler runs all scripts on one event loop with the compiles as
+concurrent subprocesses. The compiler is replaced by a command that sleeps for
+a second, so the numbers show scheduling rather than compiler speed.
+
+Usage: python BenchmarkScriptScheduler.py [scripts]
+"""
+import sys
+import time
+
+from SandboxInterpreter import Interpreter
+from ScriptScheduler import run_scripts
+
+SLEEPING_COMPILER = ["sh", "-c", "sleep 1", "compile"]
+
+
+def script(index):
+    return f"async compile module{index}.acp\nasync compile tests{index}.acp\nawait"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    codes = [script(index) for index in range(count)]
+    interpreter = Interpreter()
+    interpreter.compiler_command = SLEEPING_COMPILER
+
+    start = time.perf_counter()
+    for code in codes:
+        interpreter.execute(code)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contexts = run_scripts(codes, interpreter=interpreter, max_scripts=count, max_compiles=2 * count)
+    concurrent = time.perf_counter() - start
+
+    print(f"{count} scripts, {2 * count} compiles of 1s each")
+    print(f"sequential Interpreter.execute   {sequential:7.2f}s")
+    print(f"ScriptScheduler, one event loop  {concurrent:7.2f}s  ({', '.join(sorted({c.status for c in contexts}))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Shared-memory priority channel against the socket path. Both carry the same
+precomputed delta updates of a large task map (a few tasks change per cycle),
+so the numbers show the transport and the receiver applying the update, not
+the diffing that DeltaPublisher and SharedPriorityPublisher share. A cycle ends
+when the receiver, in another process, has applied the update: the socket path
+waits for its ack, the shared-memory path for the reader to advance read_seq.
+Also reports tasks per second for full snapshots of the whole map.
+
+Usage: python BenchmarkSharedPriority.py [cycles] [map_size] [changes_per_cycle]
+"""
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+
+from BenchmarkPriorityTransport import LoopbackSink
+from PrioritySync import PriorityState
+from PriorityTransport import PriorityClient
+from SharedPriorityRing import SharedPriorityPublisher, SharedPriorityReader, SharedPriorityRing
+
+CHANNEL = "aicompilerplus_benchmark"
+
+
+def socket_receiver(ready, stop, port_queue):
+    sink = LoopbackSink(framed=True, state=PriorityState())
+    port_queue.put(sink.port)
+    ready.set()
+    stop.wait()
+    sink.close()
+
+
+def ring_reader(ready, stop):
+    reader = SharedPriorityReader(SharedPriorityRing.attach(CHANNEL))
+    ready.set()
+    while not stop.is_set():
+        if not reader.poll():
+            time.sleep(0.00005)  # Idle like SocketServer --shm, leaving the CPU to the writer
+    reader.close()
+
+
+def make_tasks(map_size, rng):
+    return {f"module_{i // 50}:func_{i}": {"priority": rng.randrange(100), "executionTime": 0, "flags": 0}
+            for i in range(map_size)}
+
+
+def make_updates(tasks, cycles, changes_per_cycle, rng):
+    names = list(tasks)
+    return [{name: {"priority": rng.randrange(100), "executionTime": 0, "flags": 0}
+             for name in rng.sample(names, changes_per_cycle)} for _ in range(cycles)]
+
+
+def timed(send, updates):
+    samples = []
+    for upserts in updates:
+        start = time.perf_counter()
+        send(upserts)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_socket(tasks, updates, rounds):
+    ready, stop, ports = multiprocessing.Event(), multiprocessing.Event(), multiprocessing.Queue()
+    receiver = multiprocessing.Process(target=socket_receiver, args=(ready, stop, ports), daemon=True)
+    receiver.start()
+    ready.wait()
+    client = PriorityClient("127.0.0.1", ports.get())
+    version = [0]
+
+    def send(message):
+        version[0] += 1
+        message["version"] = version[0]
+        if client.request(message).get("type") != "ack":
+            raise ConnectionError("receiver did not acknowledge")
+
+    send({"type": "full", "tasks": tasks})
+    samples = timed(lambda upserts: send({"type": "delta", "base": version[0], "upserts": upserts,
+                                          "removals": []}), updates)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        send({"type": "full", "tasks": tasks})
+    throughput = rounds * len(tasks) / (time.perf_counter() - start)
+    client.close()
+    stop.set()
+    receiver.join()
+    return samples, throughput
+
+
+def run_shared_memory(tasks, updates, rounds):
+    ring = SharedPriorityRing.create(CHANNEL)
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    reader = multiprocessing.Process(target=ring_reader, args=(ready, stop), daemon=True)
+    reader.start()
+    ready.wait()
+    publisher = SharedPriorityPublisher(ring)
+
+    def send(upserts, reset=False):
+        publisher.write_update(upserts, [], reset)
+        publisher.wait_consumed()
+
+    send(tasks, reset=True)
+    samples = timed(send, updates)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        send(tasks, reset=True)
+    throughput = rounds * len(tasks) / (time.perf_counter() - start)
+    stop.set()
+    reader.join()
+    ring.close()
+    return samples, throughput
+
+
+def report(label, samples, throughput):
+    samples = sorted(sample * 1e6 for sample in samples)
+    print(f"{label:<14} median {statistics.median(samples):9.1f} us  p99 {samples[int(len(samples) * 0.99)]:9.1f} us"
+          f"   full snapshots {throughput:12.0f} tasks/s")
+
+
+def main():
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    map_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    changes = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    print(f"{cycles} delta cycles of {changes} changes on a {map_size}-task map")
+    tasks = make_tasks(map_size, random.Random(0))
+    updates = make_updates(tasks, cycles, changes, random.Random(1))
+    report("socket", *run_socket(tasks, updates, 5))
+    report("shared memory", *run_shared_memory(tasks, updates, 5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Import time and peak RSS of the Python entry points, each measured in a fresh
+interpreter (what a C++ host or shell script pays per run), plus which heavy
+libraries the import pulled in. The best of `runs` imports is reported so disk
+cache warm-up does not dominate.
+
+Usage: python BenchmarkStartup.py [runs] [module ...]
+"""
+import json
+import os
+import subprocess
+import sys
+
+MODULES = ("Python_Ai", "PriorityTransport", "SandboxInterpreter", "SmartLearning", "AiServer",
+           "AnalysisService", "GraphRendering", "ParseCache")
+HEAVY = ("tensorflow", "matplotlib", "networkx", "scipy", "git", "radon")
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "rss_kib": rss, "heavy": heavy}}))
+"""
+
+
+def measure(module, runs):
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()
+            return {"error": error[-1] if error else f"exit status {completed.returncode}"}
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or sample["seconds"] < best["seconds"]:
+            best = sample
+    return best
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    modules = sys.argv[2:] or MODULES
+    print(f"{'module':<20} {'import':>9} {'peak RSS':>10}  heavy libraries loaded")
+    for module in modules:
+        result = measure(module, runs)
+        if "error" in result:
+            print(f"{module:<20} failed: {result['error']}")
+            continue
+        print(f"{module:<20} {result['seconds']:8.3f}s {result['rss_kib'] / 1024:8.1f}MiB  "
+              f"{', '.join(result['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Reproducible benchmark suite for the analysis engine. A synthetic git
+repository is generated from a fixed seed at the chosen scale (files, defs per
+file, call fan-out, language mix) in a temporary directory, and each scenario
+is timed offline against it:
+
+    analyze_cold      ExtendedAI.analyze_repository with no parse cache
+    analyze_cached    the same with every file already in the parse cache
+    analyze_sources   analyze_source on every file, all languages
+    complexity        radon scoring of every Python file
+    prioritize        compute_task_priorities on the analyzed graph
+    serialize_<codec> normalize, encode_frame and decode_frame of the priority map
+
+Throughput (items per second, best of the repeats, each repeat running a
+scenario for at least MIN_SAMPLE_SECONDS) is measured with tracing off; peak memory is measured in one extra run under tracemalloc. With
+--save-baseline the results are written to the baseline file under the scale's
+name; otherwise they are compared with it and the suite exits with status 1
+when a scenario's throughput drops or its peak memory grows past the allowed
+fraction. Baselines are machine-specific: record one on the machine that
+checks against it.
+
+Usage: python BenchmarkSuite.py [--scale small|medium|large] [--files N] [--defs N] [--fanout N]
+                                [--mix py=0.7,js=0.1,cpp=0.1,java=0.1] [--repeats N]
+                                [--baseline PATH] [--save-baseline]
+                                [--max-slowdown 0.25] [--max-memory-growth 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import git
+
+from AiServer import ExtendedAI
+from FileAnalysis import analyze_source, compute_file_complexity
+from PipelineMetrics import metrics
+from PriorityTransport import CODECS, FRAME_HEADER, decode_frame, encode_frame, msgpack, normalize_priorities
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "BenchmarkBaseline.json")
+SEED = 20240501
+# files, defs per file, calls per def
+SCALES = {
+    "small": (200, 8, 3),
+    "medium": (1000, 10, 4),
+    "large": (5000, 12, 4),
+}
+LANGUAGE_MIX = {"py": 0.7, "js": 0.1, "cpp": 0.1, "java": 0.1}
+FILES_PER_PACKAGE = 50
+MIN_SAMPLE_SECONDS = 0.2
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        language, share = part.split("=")
+        if language not in LANGUAGE_MIX:
+            raise argparse.ArgumentTypeError(f"unknown language {language}; use {', '.join(LANGUAGE_MIX)}")
+        mix[language] = float(share)
+    return mix
+
+
+def python_source(index, defs, calls):
+    lines = [f"from pkg{(index + 1) // FILES_PER_PACKAGE}.mod{index + 1} import f{index + 1}_0", ""]
+    for number, name in enumerate(defs):
+        lines.append(f"def {name}(x, depth=0):")
+        lines.append(f"    if x > {number}:")
+        lines.extend(f"        x += {callee}(x - 1, depth + 1)" for callee in calls[name])
+        lines.append(f"    for i in range(x % {number + 2}):")
+        lines.append("        if i % 2 and depth < 3:")
+        lines.append("            x -= i")
+        lines.append("    return x")
+        lines.append("")
+    lines.append(f"class Worker{index}:")
+    lines.append("    def run(self, x):")
+    lines.append(f"        return {defs[0]}(x) if x else self.run(x + 1)")
+    return "\n".join(lines) + "\n"
+
+
+def c_like_source(language, index, defs, calls):
+    signature = {"js": "function {name}(x) {{", "cpp": "int {name}(int x) {{", "java": "    static int {name}(int x) {{"}
+    body = []
+    for number, name in enumerate(defs):
+        body.append(signature[language].format(name=name))
+        body.append(f"    if (x > {number}) {{")
+        body.extend(f"        x += {callee}(x - 1);" for callee in calls[name])
+        body.append("    }")
+        body.append("    return x;")
+        body.append("}" if language != "java" else "    }")
+    if language == "java":
+        body = [f"class Module{index} {{"] + body + ["}"]
+    return "\n".join(body) + "\n"
+
+
+def make_synthetic_repository(path, files, defs_per_file, fanout, mix=None, seed=SEED):
+    """
+    Writes and commits a repository whose content depends only on the
+    arguments. Python calls reach into other modules, so the call graph spans
+    the repository. Returns {language: file count}.
+    """
+    rng = random.Random(seed)
+    mix = mix or LANGUAGE_MIX
+    languages, weights = list(mix), list(mix.values())
+    counts = dict.fromkeys(languages, 0)
+    os.makedirs(path)
+    rel_paths = []
+    for index in range(files):
+        language = rng.choices(languages, weights)[0]
+        counts[language] += 1
+        defs = [f"f{index}_{number}" for number in range(defs_per_file)]
+        calls = {}
+        for name in defs:
+            local = rng.sample(defs, min(fanout, len(defs)))
+            # Most calls stay in the file; some go to the entry point of another module
+            calls[name] = [callee if rng.random() < 0.75 else f"f{rng.randrange(files)}_0" for callee in local]
+        if language == "py":
+            content = python_source(index, defs, calls)
+        else:
+            content = c_like_source(language, index, defs, calls)
+        rel_path = f"pkg{index // FILES_PER_PACKAGE}/mod{index}.{language}"
+        os.makedirs(os.path.join(path, os.path.dirname(rel_path)), exist_ok=True)
+        with open(os.path.join(path, rel_path), "w") as f:
+            f.write(content)
+        rel_paths.append(rel_path)
+    repo = git.Repo.init(path)
+    repo.index.add(rel_paths)
+    repo.index.commit("synthetic repository")
+    return counts
+
+
+class Suite:
+    """
+    Scenario state over one synthetic repository. Every scenario is a pair of
+    methods: prepare_<name>() (untimed, may return None) and run_<name>(),
+    which returns the number of items it processed.
+    """
+    def __init__(self, work_dir, repo_path):
+        self.work_dir = work_dir
+        self.repo_path = repo_path
+        self.sources = []
+        for root, dirs, files in os.walk(repo_path):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            for file in sorted(files):
+                rel_path = os.path.relpath(os.path.join(root, file), repo_path).replace(os.sep, "/")
+                with open(os.path.join(root, file)) as f:
+                    self.sources.append((rel_path, f.read()))
+        self.sources.sort()
+        self.graph = None
+        self.priorities = None
+        self.ai = ExtendedAI()
+
+    def scenarios(self):
+        names = ["analyze_cold", "analyze_cached", "analyze_sources", "complexity", "prioritize"]
+        names += [f"serialize_{codec}" for codec in CODECS if codec != "msgpack" or msgpack is not None]
+        return names
+
+    def analyze(self):
+        ai = ExtendedAI()
+        ai.parse_workers = 1  # Serial, so results do not depend on the core count
+        self.graph = ai.analyze_repository(self.repo_path)
+        return len(self.sources)
+
+    def prepare_analyze_cold(self):
+        shutil.rmtree(os.path.join(self.work_dir, "cloned_repos"), ignore_errors=True)
+
+    def run_analyze_cold(self):
+        return self.analyze()
+
+    def prepare_analyze_cached(self):
+        if not os.path.isdir(os.path.join(self.work_dir, "cloned_repos")):
+            self.analyze()
+
+    def run_analyze_cached(self):
+        return self.analyze()
+
+    def run_analyze_sources(self):
+        for rel_path, content in self.sources:
+            analyze_source(rel_path, content)
+        return len(self.sources)
+
+    def run_complexity(self):
+        python_sources = [(rel_path, content) for rel_path, content in self.sources if rel_path.endswith(".py")]
+        for rel_path, content in python_sources:
+            compute_file_complexity(rel_path, content)
+        return len(python_sources)
+
+    def prepare_prioritize(self):
+        if self.graph is None:
+            self.analyze()
+
+    def run_prioritize(self):
+        self.priorities = self.ai.compute_task_priorities(self.graph)
+        return len(self.priorities)
+
+    def prepare_serialize(self):
+        if self.priorities is None:
+            self.prepare_prioritize()
+            self.run_prioritize()
+
+    def run_serialize(self, codec):
+        # What a publish does: normalize, encode, and the receiver decodes
+        frame = encode_frame(normalize_priorities(self.priorities), CODECS[codec])
+        decode_frame(CODECS[codec], frame[FRAME_HEADER.size:])
+        return len(self.priorities)
+
+    def measure(self, name, repeats):
+        if name.startswith("serialize_"):
+            prepare, run = self.prepare_serialize, lambda: self.run_serialize(name[len("serialize_"):])
+        else:
+            prepare, run = getattr(self, f"prepare_{name}", None), getattr(self, f"run_{name}")
+        samples = []
+        for _ in range(repeats):
+            # Fast scenarios are repeated until a sample is long enough to time reliably
+            elapsed, calls = 0.0, 0
+            while elapsed < MIN_SAMPLE_SECONDS:
+                if prepare is not None:
+                    prepare()
+                start = time.perf_counter()
+                items = run()
+                elapsed += time.perf_counter() - start
+                calls += 1
+            samples.append(elapsed / calls)
+        if prepare is not None:
+            prepare()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # The fastest sample is the one least disturbed by the rest of the machine
+        seconds = min(samples)
+        return {"items": items, "seconds": seconds, "items_per_second": items / seconds if seconds else None,
+                "peak_bytes": peak}
+
+
+def environment():
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system(),
+            "processor": platform.processor(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, max_slowdown, max_memory_growth):
+    """
+    Prints each scenario against the baseline; returns the names that regressed.
+    """
+    regressions = []
+    print(f"{'scenario':<20}{'items/s':>12}{'baseline':>12}{'change':>9}{'peak MiB':>10}{'baseline':>10}{'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<20}{result['items_per_second']:>12.0f}{'new':>12}")
+            continue
+        speed = result["items_per_second"] / base["items_per_second"] - 1
+        memory = result["peak_bytes"] / base["peak_bytes"] - 1 if base["peak_bytes"] else 0.0
+        failed = speed < -max_slowdown or memory > max_memory_growth
+        if failed:
+            regressions.append(name)
+        print(f"{name:<20}{result['items_per_second']:>12.0f}{base['items_per_second']:>12.0f}{speed:>+9.1%}"
+              f"{result['peak_bytes'] / (1 << 20):>10.2f}{base['peak_bytes'] / (1 << 20):>10.2f}{memory:>+9.1%}"
+              f"{'  REGRESSION' if failed else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis engine on a synthetic repository.")
+    parser.add_argument("--scale", choices=SCALES, default="medium")
+    parser.add_argument("--files", type=int, help="Override the scale's file count")
+    parser.add_argument("--defs", type=int, help="Override the scale's defs per file")
+    parser.add_argument("--fanout", type=int, help="Override the scale's calls per def")
+    parser.add_argument("--mix", type=parse_mix, default=LANGUAGE_MIX, help="Language shares, e.g. py=0.7,js=0.3")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--scenario", action="append", help="Run only this scenario (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--max-slowdown", type=float, default=0.25,
+                        help="Allowed drop in throughput, as a fraction of the baseline")
+    parser.add_argument("--max-memory-growth", type=float, default=0.25,
+                        help="Allowed growth of peak memory, as a fraction of the baseline")
+    args = parser.parse_args(argv)
+
+    files, defs, fanout = SCALES[args.scale]
+    config = {"files": args.files or files, "defs_per_file": args.defs or defs, "fanout": args.fanout or fanout,
+              "mix": args.mix, "seed": SEED}
+    # Overridden settings are a different workload from the named scale
+    key = args.scale if (config["files"], config["defs_per_file"], config["fanout"]) == SCALES[args.scale] \
+        and args.mix == LANGUAGE_MIX else f"custom-{config['files']}x{config['defs_per_file']}x{config['fanout']}"
+
+    metrics.enabled = False  # Measure the engine, not its instrumentation
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)  # Parse caches go under ./cloned_repos here
+        try:
+            repo_path = os.path.join(work_dir, "synthetic")
+            counts = make_synthetic_repository(repo_path, config["files"], config["defs_per_file"],
+                                               config["fanout"], args.mix)
+            print(f"{key}: {config['files']} files ({', '.join(f'{n} {lang}' for lang, n in counts.items())}), "
+                  f"{config['defs_per_file']} defs per file, {config['fanout']} calls per def; "
+                  f"best of {args.repeats}")
+            suite = Suite(work_dir, repo_path)
+            results = {name: suite.measure(name, args.repeats) for name in args.scenario or suite.scenarios()}
+        finally:
+            os.chdir(cwd)
+
+    try:
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+
+    if args.save_baseline:
+        baselines[key] = {"config": config, "environment": environment(), "recorded": time.time(),
+                          "results": results}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        for name, result in results.items():
+            print(f"{name:<20}{result['items_per_second']:>12.0f} items/s{result['peak_bytes'] / (1 << 20):>10.2f} MiB")
+        print(f"Baseline for {key} saved to {args.baseline}")
+        return 0
+
+    baseline = baselines.get(key)
+    if baseline is None:
+        for name, result in results.items():
+            print(f"{name:<20}{result['items_per_second']:>12.0f} items/s{result['peak_bytes'] / (1 << 20):>10.2f} MiB")
+        print(f"No baseline for {key} in {args.baseline}; record one with --save-baseline")
+        return 0
+    if baseline["environment"] != environment():
+        print(f"[BENCHMARK WARNING] Baseline was recorded on {baseline['environment']}")
+    regressions = compare(results, baseline["results"], args.max_slowdown, args.max_memory_growth)
+    if regressions:
+        print(f"Regressed past the thresholds: {', '.join(regressions)}")
+        return 1
+    print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
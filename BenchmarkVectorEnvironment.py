@@ -0,0 +1,64 @@
+"""
+Experience collection rate of the scalar LearningEnvironment (one state and one
+model call per step) against VectorLearningEnvironment with all states scored
+by the Q-network in one batched call, for growing numbers of environments.
+Ends with a short train_vectorized run.
+
+Usage: python BenchmarkVectorEnvironment.py [transitions]
+"""
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+import SmartLearning
+from ReplayTraining import DQNTrainer
+from SmartLearning import ACTIONS, action_space, env, loss_fn, model, optimizer, state_size, target_model
+from VectorEnvironment import VectorLearningEnvironment
+
+
+def scalar_collect(transitions):
+    state = np.array(env.reset())
+    for _ in range(transitions):
+        q_values = model(tf.convert_to_tensor([state], dtype=tf.float32))
+        action = int(np.argmax(q_values.numpy()))
+        next_state, reward = env.step(ACTIONS[action])
+        state = np.array(next_state)
+        if np.random.random() < 0.1:
+            state = np.array(env.reset())
+    return transitions
+
+
+def vector_collect(trainer, num_envs, transitions):
+    vector_env = VectorLearningEnvironment(num_envs)
+    states = vector_env.reset()
+    steps = max(1, transitions // num_envs)
+    for _ in range(steps):
+        actions = trainer.greedy_actions(tf.convert_to_tensor(states, dtype=tf.float32)).numpy()
+        explore = np.random.random(num_envs) < 0.1
+        actions[explore] = np.random.randint(action_space, size=int(explore.sum()))
+        vector_env.step(actions)
+        states = vector_env.reset(np.random.random(num_envs) < 0.1)
+    return steps * num_envs
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    transitions = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {transitions:8d} transitions {elapsed:7.2f}s {transitions / elapsed:12.0f} transitions/s")
+
+
+def main():
+    transitions = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    trainer = DQNTrainer(model, target_model, optimizer, loss_fn, state_size)
+    timed("scalar env, eager model", scalar_collect, min(transitions, 2000))
+    for num_envs in (1, 16, 256, 4096):
+        vector_collect(trainer, num_envs, num_envs)  # Traces the batched call for this shape
+        timed(f"vector env, N={num_envs}", vector_collect, trainer, num_envs, min(transitions, num_envs * 2000))
+    timed("train_vectorized, N=256", SmartLearning.train_vectorized, num_envs=256, num_steps=500)
+
+
+if __name__ == "__main__":
+    main()
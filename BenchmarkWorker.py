@@ -0,0 +1,99 @@
+"""
+Latency of an analyze request against a synthetic git repository: cold calls
+start a new Python per request (`Python_Ai.py --request`, what the per-run
+C++ hosts paid), warm calls go to one persistent worker over its pipe
+(InvokePyFromCpp) or straight to handle_request() in-process (EmbedPyIntoCpp).
+The last rows commit a change to one file between warm calls.
+
+Usage: python BenchmarkWorker.py [files] [calls]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import git
+
+from AnalysisWorker import WorkerClient, handle_request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, "Python_Ai.py")
+
+
+def make_repository(path, files):
+    os.makedirs(path)
+    for index in range(files):
+        with open(os.path.join(path, f"module{index}.py"), "w") as f:
+            f.write(f"from module{(index + 1) % files} import entry{(index + 1) % files}\n\n")
+            f.write(f"def entry{index}(x):\n    return helper{index}(x) + entry{(index + 1) % files}(x - 1)\n\n")
+            f.write(f"def helper{index}(x):\n    if x > {index}:\n        return x * 2\n    return x\n")
+    repo = git.Repo.init(path)
+    repo.index.add([f"module{index}.py" for index in range(files)])
+    repo.index.commit("synthetic repository")
+    return repo
+
+
+def report(label, samples):
+    samples = [sample * 1000 for sample in samples]
+    print(f"{label:<34} median {statistics.median(samples):9.1f} ms  min {min(samples):9.1f} ms  "
+          f"({len(samples)} calls)")
+
+
+def timed_calls(call, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        response = call()
+        samples.append(time.perf_counter() - start)
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+    return samples
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)  # Parse caches go under ./cloned_repos here
+        repo_path = os.path.join(work_dir, "synthetic")
+        repo = make_repository(repo_path, files)
+        request = json.dumps({"op": "analyze", "path": repo_path})
+        print(f"analyze request on a {files}-file repository")
+
+        def cold_call():
+            completed = subprocess.run([sys.executable, SCRIPT, "--request", request],
+                                       capture_output=True, text=True, check=True)
+            return json.loads(completed.stdout.strip().splitlines()[-1])
+
+        report("cold: new Python per request", timed_calls(cold_call, calls))
+
+        client = WorkerClient()
+        try:
+            report("first call to a new pipe worker", timed_calls(lambda: client.request(json.loads(request)), 1))
+            report("warm: pipe worker", timed_calls(lambda: client.request(json.loads(request)), calls))
+        finally:
+            client.close()
+
+        report("first in-process call", timed_calls(lambda: json.loads(handle_request(request)), 1))
+        report("warm: in-process handle_request", timed_calls(lambda: json.loads(handle_request(request)), calls))
+
+        def changed_call():
+            with open(os.path.join(repo_path, "module0.py"), "a") as f:
+                f.write(f"\ndef added{time.perf_counter_ns()}():\n    return entry0(1)\n")
+            repo.index.add(["module0.py"])
+            repo.index.commit("change one file")
+            start = time.perf_counter()
+            response = json.loads(handle_request(request))
+            response["seconds"] = time.perf_counter() - start
+            return response
+
+        samples = [changed_call()["seconds"] for _ in range(calls)]
+        report("warm in-process, one file changed", samples)
+        os.chdir(HERE)
+
+
+if __name__ == "__main__":
+    main()
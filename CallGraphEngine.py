@@ -0,0 +1,270 @@
+import ast
+import re
+
+# Tokens the C-family fallback cares about; strings and comments are matched so they can be skipped
+TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>::|->|=>|[{}()\[\];:,.=<>])
+""", re.VERBOSE | re.DOTALL)
+
+# Identifiers followed by "(" that are never function definitions or calls
+NON_CALL_KEYWORDS = {
+    "if", "for", "while", "switch", "catch", "return", "sizeof", "typeof", "new", "delete",
+    "throw", "do", "else", "case", "synchronized", "try", "alignof", "decltype", "static_assert",
+    "super", "this", "function", "await", "yield", "defined", "using",
+}
+SCOPE_KEYWORDS = {"class", "struct", "namespace", "interface", "enum", "union"}
+# Tokens that may sit between a parameter list and the body of a definition
+DEFINITION_SUFFIXES = {"const", "override", "final", "noexcept", "volatile", "mutable", "async"}
+
+
+class CallGraph:
+    """
+    Definitions and call sites collected from one file. Calls are resolved to
+    qualified definition names once the whole file has been seen, so calls to
+    functions defined further down the file are still linked.
+    """
+    def __init__(self, implicit_member_calls=False):
+        self.implicit_member_calls = implicit_member_calls  # C++/Java: bar() inside Foo may mean this->bar()
+        self.definitions = []
+        self.defined = set()
+        self.by_simple_name = {}
+        self.calls = []  # (caller, callee name, receiver, enclosing class, enclosing scopes)
+
+    def define(self, qualified_name):
+        if qualified_name not in self.defined:
+            self.defined.add(qualified_name)
+            self.definitions.append(qualified_name)
+            self.by_simple_name.setdefault(qualified_name.rsplit(".", 1)[-1], []).append(qualified_name)
+
+    def call(self, caller, name, receiver, class_name, scopes):
+        self.calls.append((caller, name, receiver, class_name, scopes))
+
+    def resolve(self, name, receiver, class_name, scopes):
+        if receiver in ("self", "cls", "this"):
+            candidate = f"{class_name}.{name}" if class_name else name
+            return candidate if candidate in self.defined else None
+        if receiver is None:
+            # Nested definitions shadow outer ones, then class members, then module level
+            for scope in reversed(scopes):
+                if f"{scope}.{name}" in self.defined:
+                    return f"{scope}.{name}"
+            if self.implicit_member_calls and class_name and f"{class_name}.{name}" in self.defined:
+                return f"{class_name}.{name}"
+            if name in self.defined:
+                return name
+            if f"{name}.__init__" in self.defined:
+                return f"{name}.__init__"
+            return None
+        if f"{receiver}.{name}" in self.defined:
+            return f"{receiver}.{name}"  # Static or qualified call such as Foo::bar / Foo.bar
+        candidates = self.by_simple_name.get(name, [])
+        return candidates[0] if len(candidates) == 1 else None  # obj.method(): only when unambiguous
+
+    def edges(self):
+        edges = []
+        seen = set()
+        for caller, name, receiver, class_name, scopes in self.calls:
+            callee = self.resolve(name, receiver, class_name, scopes)
+            if callee is not None and callee != caller and (caller, callee) not in seen:
+                seen.add((caller, callee))
+                edges.append((caller, callee))
+        return edges
+
+
+class PythonCallGraphVisitor(ast.NodeVisitor):
+    """
+    Single walk over a Python module recording qualified definitions
+    (Class.method, outer.inner) and the calls made from inside each one.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.scopes = []  # qualified names of enclosing classes and functions
+        self.classes = []  # qualified names of enclosing classes
+        self.functions = []  # qualified names of enclosing functions
+
+    def qualify(self, name):
+        return f"{self.scopes[-1]}.{name}" if self.scopes else name
+
+    def visit_ClassDef(self, node):
+        qualified_name = self.qualify(node.name)
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+        self.scopes.append(qualified_name)
+        self.classes.append(qualified_name)
+        for child in node.body:
+            self.visit(child)
+        self.classes.pop()
+        self.scopes.pop()
+
+    def visit_FunctionDef(self, node):
+        qualified_name = self.qualify(node.name)
+        self.graph.define(qualified_name)
+        for child in node.decorator_list:
+            self.visit(child)
+        self.visit(node.args)
+        self.scopes.append(qualified_name)
+        self.functions.append(qualified_name)
+        for child in node.body:
+            self.visit(child)
+        self.functions.pop()
+        self.scopes.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node):
+        if self.functions:
+            func = node.func
+            receiver = None
+            if isinstance(func, ast.Name):
+                name = func.id
+            elif isinstance(func, ast.Attribute):
+                name = func.attr
+                receiver = func.value.id if isinstance(func.value, ast.Name) else ""
+            else:
+                name = None
+            if name is not None:
+                class_name = self.classes[-1] if self.classes else None
+                self.graph.call(self.functions[-1], name, receiver, class_name, tuple(self.functions))
+        self.generic_visit(node)
+
+
+def python_call_graph(content):
+    """
+    Parses Python source once with `ast` and returns (definitions, edges).
+    """
+    graph = CallGraph()
+    PythonCallGraphVisitor(graph).visit(ast.parse(content))
+    return graph.definitions, graph.edges()
+
+
+def tokenize(content):
+    return [(match.lastgroup, match.group()) for match in TOKEN_PATTERN.finditer(content)
+            if match.lastgroup not in ("comment", "string")]
+
+
+def matching_paren(tokens, start):
+    depth = 0
+    for index in range(start, len(tokens)):
+        value = tokens[index][1]
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(tokens) - 1
+
+
+def definition_body_start(tokens, index, allow_initializer):
+    """
+    Given the index just past a parameter list, returns the index of the "{" that
+    opens a function body, or None when the parameter list belonged to a call.
+    """
+    while index < len(tokens):
+        value = tokens[index][1]
+        if value == "{":
+            return index
+        if value in DEFINITION_SUFFIXES or value == "=>":
+            index += 1
+        elif value == "throws" or value == "->" or value == ":" and allow_initializer:
+            # Java throws clauses, trailing return types and C++ constructor
+            # initializer lists all run up to the body
+            while index < len(tokens) and tokens[index][1] not in ("{", ";"):
+                index += 1
+        else:
+            return None
+    return None
+
+
+def token_call_graph(content):
+    """
+    Tokenizer-based call graph for C++, JavaScript and Java sources. Brace depth
+    tracks class, namespace and function scopes; `name(...) {` is a definition
+    and `name(` inside a function body is a call.
+    """
+    graph = CallGraph(implicit_member_calls=True)
+    tokens = tokenize(content)
+    scopes = []  # (kind, qualified name, brace depth the scope closes at)
+    classes_by_name = {}  # Foo -> ns.Foo, for out-of-class Foo::bar definitions
+    pending_scope = None
+    depth = 0
+    index = 0
+    while index < len(tokens):
+        kind, value = tokens[index]
+        prev = tokens[index - 1][1] if index >= 1 else None
+        qualifier = tokens[index - 2][1] if index >= 2 and tokens[index - 2][0] == "name" else None
+        next_value = tokens[index + 1][1] if index + 1 < len(tokens) else None
+        parent = scopes[-1][1] if scopes else None
+
+        if value == "{":
+            depth += 1
+            if pending_scope is not None:
+                scopes.append((pending_scope[0], pending_scope[1], depth))
+                pending_scope = None
+        elif value == "}":
+            if scopes and scopes[-1][2] == depth:
+                scopes.pop()
+            depth -= 1
+        elif value == ";":
+            pending_scope = None
+        elif kind == "name" and value in SCOPE_KEYWORDS and index + 1 < len(tokens) and tokens[index + 1][0] == "name":
+            name = tokens[index + 1][1]
+            pending_scope = ("class", f"{parent}.{name}" if parent else name)
+            classes_by_name.setdefault(name, pending_scope[1])
+            index += 1
+        elif value in ("function", "(") and prev in ("=", ":") and qualifier is not None:
+            # JavaScript name = function (...) { and name = (...) => {
+            start = index + 1 if value == "function" else index
+            if start < len(tokens) and tokens[start][1] == "(":
+                close = matching_paren(tokens, start)
+                after = tokens[close + 1][1] if close + 1 < len(tokens) else None
+                body = definition_body_start(tokens, close + 1, False)
+                if body is not None and (value == "function" or after == "=>"):
+                    qualified = f"{parent}.{qualifier}" if parent else qualifier
+                    graph.define(qualified)
+                    pending_scope = ("function", qualified)
+                    index = body
+                    continue
+        elif kind == "name" and next_value == "(" and value not in NON_CALL_KEYWORDS:
+            functions = [scope[1] for scope in scopes if scope[0] == "function"]
+            if prev == "::":
+                receiver = qualifier
+            elif prev in (".", "->"):
+                receiver = qualifier or ""
+            else:
+                receiver = None
+
+            close = matching_paren(tokens, index + 1)
+            body = None
+            if receiver is None or prev == "::":
+                body = definition_body_start(tokens, close + 1, not functions)
+            if body is not None:
+                if prev == "::" and qualifier:
+                    qualified = f"{classes_by_name.get(qualifier, qualifier)}.{value}"  # Out-of-class Foo::bar
+                else:
+                    qualified = f"{parent}.{value}" if parent else value
+                graph.define(qualified)
+                pending_scope = ("function", qualified)
+                index = body
+                continue
+            if functions:
+                caller = functions[-1]
+                classes = [scope[1] for scope in scopes if scope[0] == "class"]
+                class_name = classes[-1] if classes else (caller.rsplit(".", 1)[0] if "." in caller else None)
+                graph.call(caller, value, receiver, class_name, tuple(scope[1] for scope in scopes))
+        index += 1
+    return graph.definitions, graph.edges()
+
+
+def extract_call_graph(file_name, content):
+    """
+    Returns (definitions, edges) for one source file: `ast` for Python, the
+    tokenizer for C++, JavaScript and Java. Raises SyntaxError for Python source
+    that does not parse so the caller can pick its own fallback.
+    """
+    if file_name.endswith(".py"):
+        return python_call_graph(content)
+    return token_call_graph(content)
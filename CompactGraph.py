@@ -0,0 +1,174 @@
+from array import array
+
+import numpy as np
+
+from PriorityEngine import CSRGraph
+
+# A dead edge row keeps its slot until the next compaction
+DEAD = -1
+
+
+class NodeRecord:
+    __slots__ = ("complexity", "refs")
+
+    def __init__(self):
+        self.complexity = None
+        self.refs = 0  # Files currently defining this node
+
+
+class FileRecord:
+    __slots__ = ("defs", "edge_rows")
+
+    def __init__(self):
+        self.defs = array("i")  # Node ids the file defines
+        self.edge_rows = array("i")  # Rows of the edge arrays the file contributed
+
+
+class CompactGraph:
+    """
+    Array-backed function graph for the analysis hot path. Names are interned to
+    int ids and every call edge contributed by a file is one row of three int32
+    arrays (caller, callee, file), so a graph costs a few dozen bytes per edge
+    instead of networkx's nested dicts. Retracting a file marks its rows dead;
+    duplicate edges from different files are merged when the graph is exported.
+
+    Use to_csr() for prioritization and to_networkx() only where a networkx graph
+    is really needed (drawing, ad-hoc analysis).
+    """
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.nodes = []  # NodeRecord per interned id
+        self.files = {}  # rel_path -> FileRecord
+        self.sources = array("i")
+        self.targets = array("i")
+        self.edge_files = array("i")
+        self.file_ids = {}
+        self.dead_rows = 0
+
+    def intern(self, name):
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.nodes.append(NodeRecord())
+        return node_id
+
+    def add_file_result(self, rel_path, result):
+        """
+        Merges one file's definitions, call edges and complexity scores. A file
+        already in the graph is retracted first.
+        """
+        if rel_path in self.files:
+            self.remove_file_result(rel_path)
+        record = self.files[rel_path] = FileRecord()
+        file_id = self.file_ids.setdefault(rel_path, len(self.file_ids))
+        complexity = result.get("complexity", {})
+        for func in result["defs"]:
+            node_id = self.intern(func)
+            node = self.nodes[node_id]
+            node.refs += 1
+            if func in complexity:
+                node.complexity = complexity[func]
+            record.defs.append(node_id)
+
+        for caller, callee in result["edges"]:
+            record.edge_rows.append(len(self.sources))
+            self.sources.append(self.intern(caller))
+            self.targets.append(self.intern(callee))
+            self.edge_files.append(file_id)
+
+    def remove_file_result(self, rel_path, result=None):
+        """
+        Retracts everything rel_path contributed. Nodes and edges shared with other
+        files stay until their last contributing file is removed. `result` is
+        accepted for symmetry with FileAnalysis.remove_file_result and not needed.
+        """
+        record = self.files.pop(rel_path, None)
+        if record is None:
+            return
+        for node_id in record.defs:
+            node = self.nodes[node_id]
+            node.refs -= 1
+            if node.refs == 0:
+                node.complexity = None
+        for row in record.edge_rows:
+            self.sources[row] = DEAD
+        self.dead_rows += len(record.edge_rows)
+        if self.dead_rows * 2 > len(self.sources):
+            self.compact()
+
+    def compact(self):
+        """
+        Drops dead edge rows and renumbers the rows each file owns.
+        """
+        sources = np.frombuffer(self.sources, dtype=np.int32)
+        live = sources != DEAD
+        new_rows = np.cumsum(live, dtype=np.int32) - 1
+        self.sources = array("i", sources[live].tobytes())
+        self.targets = array("i", np.frombuffer(self.targets, dtype=np.int32)[live].tobytes())
+        self.edge_files = array("i", np.frombuffer(self.edge_files, dtype=np.int32)[live].tobytes())
+        for record in self.files.values():
+            if len(record.edge_rows):
+                rows = np.frombuffer(record.edge_rows, dtype=np.int32)
+                record.edge_rows = array("i", new_rows[rows].tobytes())
+        self.dead_rows = 0
+
+    def live_edges(self):
+        """
+        (sources, targets) of the distinct live edges, as int32 node ids.
+        """
+        sources = np.frombuffer(self.sources, dtype=np.int32)
+        targets = np.frombuffer(self.targets, dtype=np.int32)
+        live = sources != DEAD
+        keys = np.unique((sources[live].astype(np.int64) << 32) | targets[live].astype(np.int64))
+        return (keys >> 32).astype(np.int32), (keys & 0xFFFFFFFF).astype(np.int32)
+
+    def present_nodes(self, sources, targets):
+        """
+        Ids of nodes that are defined by some file or are the endpoint of a live
+        edge, in interning order.
+        """
+        present = np.zeros(len(self.names), dtype=bool)
+        present[sources] = True
+        present[targets] = True
+        present |= np.fromiter((node.refs > 0 for node in self.nodes), dtype=bool, count=len(self.nodes))
+        return np.flatnonzero(present)
+
+    def number_of_nodes(self):
+        return len(self.present_nodes(*self.live_edges()))
+
+    def number_of_edges(self):
+        return len(self.live_edges()[0])
+
+    def complexity_scores(self):
+        return {self.names[node_id]: node.complexity
+                for node_id, node in enumerate(self.nodes) if node.complexity is not None}
+
+    def to_csr(self):
+        sources, targets = self.live_edges()
+        node_ids = self.present_nodes(sources, targets)
+        position = np.full(len(self.names), -1, dtype=np.int64)
+        position[node_ids] = np.arange(len(node_ids))
+        names = [self.names[node_id] for node_id in node_ids.tolist()]
+        complexity = [self.nodes[node_id].complexity for node_id in node_ids.tolist()]
+        complexity = np.array([np.nan if score is None else score for score in complexity], dtype=np.float64)
+        return CSRGraph.from_edges(names, position[sources], position[targets], complexity)
+
+    def to_networkx(self):
+        """
+        DiGraph copy with the "complexity" node attribute, for drawing and other
+        networkx-based features. Not kept in sync with later updates.
+        """
+        import networkx as nx  # Only needed for this export
+        sources, targets = self.live_edges()
+        graph = nx.DiGraph()
+        for node_id in self.present_nodes(sources, targets).tolist():
+            complexity = self.nodes[node_id].complexity
+            if complexity is None:
+                graph.add_node(self.names[node_id])
+            else:
+                graph.add_node(self.names[node_id], complexity=complexity)
+        names = self.names
+        graph.add_edges_from((names[s], names[t]) for s, t in zip(sources.tolist(), targets.tolist()))
+        return graph
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Command a compile job runs, followed by the file name
+COMPILER_COMMAND = ("python", "path_to_AICompilerPlus/AIEngine.py")
+# Content-addressed compile results, one JSON file per (input, tool version)
+CACHE_DIR = os.path.join(".", "cloned_repos", ".compile_cache")
+CACHE_FORMAT = 1
+READ_BLOCK = 1 << 16
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(READ_BLOCK), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def tool_version(command):
+    """
+    Identifies the compiler: the command line plus the contents of any of its
+    arguments that are files (the compiler script itself), so editing the
+    compiler invalidates every cached result. A file that cannot be read is
+    marked as such rather than hashed.
+    """
+    digest = hashlib.sha256("\0".join(command).encode())
+    for argument in command:
+        if os.path.isfile(argument):
+            digest.update((file_digest(argument) or f"unreadable:{argument}").encode())
+    return digest.hexdigest()
+
+
+class CompileResult:
+    """
+    Outcome of one compile job. Timings are in seconds: `queue_wait` from
+    submit until a worker picked the job up, `startup` from launching the
+    process until its first line of output (or exit), and `run_time` from then
+    until it exited. Cached results have zero startup and run time.
+    """
+    __slots__ = ("code_file", "returncode", "stdout", "stderr", "cached", "queue_wait", "startup", "run_time")
+
+    def __init__(self, code_file, returncode, stdout, stderr, cached=False, queue_wait=0.0, startup=0.0, run_time=0.0):
+        self.code_file = code_file
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.cached = cached
+        self.queue_wait = queue_wait
+        self.startup = startup
+        self.run_time = run_time
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def timings(self):
+        return {"queue_wait": self.queue_wait, "startup": self.startup, "run_time": self.run_time, "cached": self.cached}
+
+
+class CompileCache:
+    """
+    Compile results on disk keyed by sha256 of the input file and the tool
+    version. Only successful compiles are stored, so a failure caused by the
+    environment is retried next time.
+    """
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def key(self, code_file, version):
+        digest = file_digest(code_file)
+        if digest is None:
+            return None
+        return hashlib.sha256(f"{version}|{digest}".encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        if key is None:
+            return None
+        try:
+            with open(self.path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[CACHE ERROR] Ignoring unreadable compile cache entry {key}: {e}")
+            return None
+        if data.get("format") != CACHE_FORMAT:
+            return None
+        return data
+
+    def put(self, key, stdout, stderr):
+        if key is None:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"format": CACHE_FORMAT, "stdout": stdout, "stderr": stderr}, f)
+        os.replace(temp_file, path)
+
+
+class CompileJobPool:
+    """
+    Runs compiles on at most `workers` processes at once. Each line the
+    compiler writes is passed to the job's `on_line(stream, line)` callback
+    ("stdout" or "stderr") as it arrives, instead of being buffered until exit.
+    Unchanged inputs compiled by the same tool version come back from the
+    cache without starting a process; their cached lines are replayed to
+    `on_line`.
+    """
+    def __init__(self, command=COMPILER_COMMAND, workers=4, cache_dir=CACHE_DIR, timeout=None):
+        self.command = list(command)
+        self.workers = workers
+        self.version = tool_version(self.command)
+        self.cache = CompileCache(cache_dir) if cache_dir else None
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compile")
+
+    def submit(self, code_file, on_line=None, preexec_fn=None, on_start=None):
+        """
+        Queues a compile and returns a Future for its CompileResult (wrap it with
+        asyncio.wrap_future to await it). preexec_fn is passed to Popen, e.g. to
+        set resource limits; on_start(process) is called once the compiler has
+        been launched, so the caller can kill it.
+        """
+        return self.executor.submit(self.run_job, code_file, on_line, time.perf_counter(), preexec_fn, on_start)
+
+    def compile(self, code_file, on_line=None):
+        return self.submit(code_file, on_line).result()
+
+    def compile_all(self, code_files, on_line=None):
+        futures = [self.submit(code_file, on_line) for code_file in code_files]
+        return [future.result() for future in futures]
+
+    def lookup(self, code_file):
+        """
+        The cached result for a file, or (None, key) on a miss. The key is what
+        `store` expects once the compile has run.
+        """
+        key = self.cache.key(code_file, self.version) if self.cache else None
+        entry = self.cache.get(key) if self.cache else None
+        if entry is None:
+            return None, key
+        return CompileResult(code_file, 0, entry["stdout"], entry["stderr"], cached=True), key
+
+    def store(self, key, result):
+        if self.cache and result.ok:
+            try:
+                self.cache.put(key, result.stdout, result.stderr)
+            except OSError as e:
+                print(f"[CACHE ERROR] Could not store compile result for {result.code_file}: {e}")
+
+    def run_job(self, code_file, on_line, submitted, preexec_fn=None, on_start=None):
+        queue_wait = time.perf_counter() - submitted
+        cached, key = self.lookup(code_file)
+        if cached is not None:
+            cached.queue_wait = queue_wait
+            if on_line is not None:
+                for stream, text in (("stdout", cached.stdout), ("stderr", cached.stderr)):
+                    for line in text.splitlines(True):
+                        on_line(stream, line)
+            return cached
+        result = self.run_process(code_file, on_line, preexec_fn, on_start)
+        result.queue_wait = queue_wait
+        self.store(key, result)
+        return result
+
+    def run_process(self, code_file, on_line, preexec_fn=None, on_start=None):
+        lines = {"stdout": [], "stderr": []}
+        first_output = []
+        lock = threading.Lock()
+
+        def pump(stream, pipe):
+            for line in pipe:
+                with lock:
+                    if not first_output:
+                        first_output.append(time.perf_counter())
+                    lines[stream].append(line)
+                    if on_line is not None:
+                        on_line(stream, line)
+            pipe.close()
+
+        launched = time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                self.command + [code_file], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, errors="replace", bufsize=1, preexec_fn=preexec_fn,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            return CompileResult(code_file, -1, "", f"Could not start compiler: {e}\n")
+        if on_start is not None:
+            on_start(process)
+        # The pipes are read to EOF, so a hung compiler is killed from a timer
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(self.timeout, expire) if self.timeout else None
+        if timer is not None:
+            timer.start()
+        stderr_reader = threading.Thread(target=pump, args=("stderr", process.stderr), daemon=True)
+        stderr_reader.start()
+        pump("stdout", process.stdout)
+        stderr_reader.join()
+        returncode = process.wait()
+        if timer is not None:
+            timer.cancel()
+        if timed_out.is_set():
+            lines["stderr"].append(f"Compile timed out after {self.timeout}s\n")
+        finished = time.perf_counter()
+        started = first_output[0] if first_output else finished
+        return CompileResult(code_file, returncode, "".join(lines["stdout"]), "".join(lines["stderr"]),
+                             startup=started - launched, run_time=finished - started)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
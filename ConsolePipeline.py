@@ -0,0 +1,208 @@
+"""
+Streaming console output for the GUI. ConsolePipeline runs shell commands with
+one reader thread per pipe, so stdout and stderr are drained concurrently and a
+chatty compiler can never block on a full pipe. Lines go into a bounded,
+thread-safe queue tagged with the command they came from; nothing touches Tk
+from a worker thread. The GUI's own messages go into a separate unbounded
+queue, so logging from the Tk thread never waits on the bounded one that only
+the Tk thread empties. ConsoleView empties the queue on a Tk `after` timer and
+inserts each batch with a single call, keeping the widget and the scrollback
+ring buffer at `max_lines`.
+"""
+import itertools
+import os
+import queue
+import signal
+import subprocess
+import threading
+from collections import deque
+
+import tkinter as tk
+
+# Lines kept in the scrollback and in the console widget
+MAX_LINES = 10000
+# Command output lines waiting for the GUI; readers block (pausing the command) beyond this
+QUEUE_LIMIT = 50000
+FLUSH_INTERVAL_MS = 50
+# Colours cycled through for the tags of concurrent commands
+TAG_COLORS = ("#FFD700", "#7FDBFF", "#9BE564", "#FF9F6E", "#D9A5FF")
+STDERR_COLOR = "#FF6B6B"
+
+
+class ConsoleCommand:
+    __slots__ = ("id", "label", "command", "process", "returncode")
+
+    def __init__(self, command_id, label, command, process):
+        self.id = command_id
+        self.label = label
+        self.command = command
+        self.process = process
+        self.returncode = None
+
+
+class ConsolePipeline:
+    """
+    Runs commands and collects their output as (command id, stream, text)
+    entries. Stream is "stdout", "stderr", "message" for text logged by the GUI
+    itself, or "exit" once a command finishes (text holds the return code).
+    Only the reader threads wait for room in the bounded queue.
+    """
+    def __init__(self, max_lines=MAX_LINES, queue_limit=QUEUE_LIMIT):
+        self.entries = queue.Queue(maxsize=queue_limit)
+        self.messages = queue.SimpleQueue()  # GUI messages: never blocks the thread logging them
+        self.scrollback = deque(maxlen=max_lines)
+        self.commands = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def message(self, text):
+        """
+        Queues a line of the GUI's own; safe to call from any thread, and never
+        blocks, even while command output fills the bounded queue.
+        """
+        for line in str(text).splitlines() or [""]:
+            self.messages.put((None, "message", line))
+
+    def start(self, command, label=None):
+        """
+        Starts `command` in a shell and returns its id, or None if it could not
+        be started (the error is queued as a message).
+        """
+        command_id = next(self.ids)
+        label = f"{label or (command.split() or ['command'])[0]} #{command_id}"
+        try:
+            process = subprocess.Popen(command, shell=True, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, text=True, errors="replace", bufsize=1,
+                                       start_new_session=os.name == "posix")
+        except OSError as e:
+            self.message(f"[CONSOLE ERROR] Could not start {command}: {e}")
+            return None
+        with self.lock:
+            self.commands[command_id] = ConsoleCommand(command_id, label, command, process)
+        readers = [threading.Thread(target=self.pump, args=(command_id, stream, pipe), daemon=True)
+                   for stream, pipe in (("stdout", process.stdout), ("stderr", process.stderr))]
+        for reader in readers:
+            reader.start()
+        threading.Thread(target=self.wait, args=(command_id, readers), daemon=True).start()
+        return command_id
+
+    def pump(self, command_id, stream, pipe):
+        for line in pipe:
+            self.entries.put((command_id, stream, line.rstrip("\r\n")))
+        pipe.close()
+
+    def wait(self, command_id, readers):
+        for reader in readers:
+            reader.join()
+        returncode = self.commands[command_id].process.wait()
+        self.entries.put((command_id, "exit", returncode))
+
+    def drain(self, limit=None):
+        """
+        The entries queued when called (at most `limit` command entries), GUI
+        messages first and then command output, each oldest first, after adding
+        them to the scrollback. Never blocks, and returns even while commands
+        keep writing.
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self.messages.get_nowait())
+            except queue.Empty:
+                break
+        if limit is None:
+            limit = self.entries.qsize()
+        limit += len(batch)
+        while len(batch) < limit:
+            try:
+                entry = self.entries.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(entry)
+            if entry[1] == "exit":
+                with self.lock:
+                    self.commands[entry[0]].returncode = entry[2]
+        self.scrollback.extend(batch)
+        return batch
+
+    def label(self, command_id):
+        return self.commands[command_id].label if command_id in self.commands else None
+
+    def running(self):
+        with self.lock:
+            return [command for command in self.commands.values() if command.returncode is None]
+
+    def stop(self, command_id):
+        command = self.commands.get(command_id)
+        if command is None or command.process.poll() is not None:
+            return
+        if os.name == "posix":
+            # The shell's children hold the pipes open too; stop the whole group
+            try:
+                os.killpg(command.process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        else:
+            command.process.terminate()
+
+    def stop_all(self):
+        for command in self.running():
+            self.stop(command.id)
+
+
+class ConsoleView:
+    """
+    Flushes a ConsolePipeline into a Text widget every FLUSH_INTERVAL_MS.
+    Lines are prefixed with their command's label and coloured per command,
+    stderr in STDERR_COLOR. The view only scrolls to the end if it was there.
+    """
+    def __init__(self, widget, pipeline, max_lines=MAX_LINES, interval_ms=FLUSH_INTERVAL_MS):
+        self.widget = widget
+        self.pipeline = pipeline
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        self.lines = 0
+        self.tags = set()
+        self.widget.tag_configure("stderr", foreground=STDERR_COLOR)
+        self.after_id = self.widget.after(self.interval_ms, self.flush)
+
+    def tag_for(self, command_id):
+        tag = f"command-{command_id}"
+        if tag not in self.tags:
+            self.tags.add(tag)
+            self.widget.tag_configure(tag, foreground=TAG_COLORS[(command_id - 1) % len(TAG_COLORS)])
+            self.widget.tag_raise("stderr")
+        return tag
+
+    def format(self, entry):
+        command_id, stream, text = entry
+        if command_id is None:
+            return text, ()
+        label = self.pipeline.label(command_id)
+        if stream == "exit":
+            return f"[{label}] exited with code {text}", (self.tag_for(command_id),)
+        if stream == "stderr":
+            return f"[{label}] {text}", (self.tag_for(command_id), "stderr")
+        return f"[{label}] {text}", (self.tag_for(command_id),)
+
+    def flush(self):
+        batch = self.pipeline.drain()
+        if batch:
+            # Older lines of a flood would be trimmed straight away; skip inserting them
+            skipped = max(len(batch) - self.max_lines, 0)
+            arguments = []
+            for entry in batch[skipped:]:
+                text, tags = self.format(entry)
+                arguments.extend((text + "\n", tags))
+            at_end = self.widget.yview()[1] >= 1.0
+            self.widget.insert(tk.END, *arguments)
+            self.lines += len(batch) - skipped
+            if self.lines > self.max_lines:
+                self.widget.delete("1.0", f"{self.lines - self.max_lines + 1}.0")
+                self.lines = self.max_lines
+            if at_end:
+                self.widget.see(tk.END)
+        self.after_id = self.widget.after(self.interval_ms, self.flush)
+
+    def close(self):
+        self.widget.after_cancel(self.after_id)
@@ -0,0 +1,143 @@
+import json
+import time
+
+import numpy as np
+
+# Decision names in code order; matches SmartLearning.ACTIONS
+DECISIONS = ("solve_problem", "read_documentation", "test_code", "debug_code", "peer_review")
+NO_OUTCOME = -1
+# Contexts beyond this many share one histogram
+MAX_CONTEXTS = 64
+OTHER_CONTEXT = "other"
+
+
+class DecisionTelemetry:
+    """
+    Bounded record of DecisionMakingEngine decisions. The last `capacity`
+    decisions are kept in a ring buffer of small integer codes; totals,
+    per-context histograms and per-decision outcome counters are running
+    aggregates; the success rate is computed over the last `window` outcomes.
+    Memory stays flat however long the process runs, and every query is O(1)
+    or O(capacity).
+    """
+    def __init__(self, capacity=1024, window=256, decisions=DECISIONS, snapshot_every=None, snapshot_path=None):
+        self.decisions = tuple(decisions)
+        self.codes = {decision: code for code, decision in enumerate(self.decisions)}
+        self.capacity = capacity
+        self.recent = np.zeros(capacity, dtype=np.int8)
+        self.recent_contexts = np.zeros(capacity, dtype=np.int16)
+        self.position = 0
+        self.total = 0
+        self.counts = np.zeros(len(self.decisions), dtype=np.int64)
+        self.context_ids = {}
+        self.histograms = np.zeros((MAX_CONTEXTS, len(self.decisions)), dtype=np.int64)
+
+        self.window = window
+        self.outcomes = np.full(window, NO_OUTCOME, dtype=np.int8)
+        self.outcome_position = 0
+        self.window_successes = 0
+        self.window_outcomes = 0
+        self.successes = np.zeros(len(self.decisions), dtype=np.int64)
+        self.outcome_counts = np.zeros(len(self.decisions), dtype=np.int64)
+
+        self.snapshot_every = snapshot_every  # Export a snapshot every N decisions
+        self.snapshot_path = snapshot_path  # JSON-lines file the snapshots are appended to
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def context_id(self, context):
+        context_id = self.context_ids.get(context)
+        if context_id is None:
+            if len(self.context_ids) < MAX_CONTEXTS - 1:
+                context_id = self.context_ids[context] = len(self.context_ids)
+            else:
+                context_id = self.context_ids.setdefault(OTHER_CONTEXT, MAX_CONTEXTS - 1)
+        return context_id
+
+    def record(self, decision, context=None):
+        code = self.codes[decision]
+        context_id = self.context_id(context)
+        self.recent[self.position] = code
+        self.recent_contexts[self.position] = context_id
+        self.position = (self.position + 1) % self.capacity
+        self.total += 1
+        self.counts[code] += 1
+        self.histograms[context_id, code] += 1
+        if self.snapshot_every and self.total % self.snapshot_every == 0:
+            self.export_snapshot()
+
+    def last_decision(self):
+        if not self.total:
+            return None
+        return self.decisions[self.recent[(self.position - 1) % self.capacity]]
+
+    def record_outcome(self, success, decision=None):
+        """
+        Records whether a decision (default: the most recent one) worked out.
+        Returns the decision's success rate so far.
+        """
+        decision = decision or self.last_decision()
+        if decision is None:
+            return None
+        code = self.codes[decision]
+        success = int(bool(success))
+
+        previous = int(self.outcomes[self.outcome_position])
+        if previous != NO_OUTCOME:
+            self.window_successes -= previous
+            self.window_outcomes -= 1
+        self.outcomes[self.outcome_position] = success
+        self.outcome_position = (self.outcome_position + 1) % self.window
+        self.window_successes += success
+        self.window_outcomes += 1
+
+        self.successes[code] += success
+        self.outcome_counts[code] += 1
+        return int(self.successes[code]) / int(self.outcome_counts[code])
+
+    def success_rate(self):
+        """
+        Share of successful outcomes among the last `window` recorded, or None.
+        """
+        return self.window_successes / self.window_outcomes if self.window_outcomes else None
+
+    def decision_success_rates(self):
+        return {decision: int(self.successes[code]) / int(self.outcome_counts[code])
+                for code, decision in enumerate(self.decisions) if self.outcome_counts[code]}
+
+    def recent_decisions(self, limit=None):
+        """
+        The retained decisions, oldest first (at most `capacity`, or `limit`).
+        """
+        count = len(self)
+        if limit is not None:
+            count = min(count, limit)
+        rows = (self.position - count + np.arange(count)) % self.capacity
+        return [self.decisions[code] for code in self.recent[rows].tolist()]
+
+    def context_histograms(self):
+        return {context: dict(zip(self.decisions, self.histograms[context_id].tolist()))
+                for context, context_id in self.context_ids.items()}
+
+    def snapshot(self):
+        return {
+            "time": time.time(),
+            "total": self.total,
+            "counts": dict(zip(self.decisions, self.counts.tolist())),
+            "contexts": self.context_histograms(),
+            "success_rate": self.success_rate(),
+            "window": self.window,
+            "decision_success_rates": self.decision_success_rates(),
+        }
+
+    def export_snapshot(self, path=None):
+        snapshot = self.snapshot()
+        path = path or self.snapshot_path
+        if path:
+            try:
+                with open(path, "a") as f:
+                    f.write(json.dumps(snapshot) + "\n")
+            except OSError as e:
+                print(f"[TELEMETRY ERROR] Could not write snapshot to {path}: {e}")
+        return snapshot
@@ -1,35 +1,120 @@
 #include <Python.h>
+#include <chrono>
 #include <iostream>
 #include <queue>
 #include <string>
 #include <unistd.h>
 
-// Function to execute Python code from C++
-void run_python_script(const std::string &script_name) {
-    FILE* fp = fopen(script_name.c_str(), "r");
-    if (fp == nullptr) {
-        std::cerr << "Error opening Python script: " << script_name << std::endl;
-        return;
+// Long-lived embedded Python worker. The interpreter is initialized and the
+// analysis module imported once; every request then calls its
+// handle_request(json) -> json function, so library imports, parse caches and
+// function graphs stay warm between calls. Any thread may call() once start()
+// has returned: the GIL is taken per call, and AnalysisWorker runs analyses of
+// the same checkout one at a time (other requests and checkouts overlap).
+class EmbeddedPythonWorker {
+public:
+    bool start(const std::string &module_name) {
+        Py_Initialize();
+        // Import the analysis modules from the directory the host runs in
+        PyRun_SimpleString("import os, sys\nsys.path.insert(0, os.getcwd())");
+        PyObject* module = PyImport_ImportModule(module_name.c_str());
+        if (module == nullptr) {
+            PyErr_Print();
+            std::cerr << "Error importing Python module: " << module_name << std::endl;
+            return false;
+        }
+        handler = PyObject_GetAttrString(module, "handle_request");
+        Py_DECREF(module);
+        if (handler == nullptr || !PyCallable_Check(handler)) {
+            PyErr_Print();
+            std::cerr << "Python module has no handle_request(): " << module_name << std::endl;
+            return false;
+        }
+        main_thread = PyEval_SaveThread();  // Release the GIL until a call needs it
+        return true;
     }
-    PyRun_SimpleFile(fp, script_name.c_str());
-    fclose(fp);
-}
 
-void start_python_interpreter() {
-    // Initialize the Python interpreter
-    Py_Initialize();
+    std::string call(const std::string &request) {
+        PyGILState_STATE gil = PyGILState_Ensure();
+        std::string response = "{\"ok\": false, \"error\": \"Python call failed\"}";
+        PyObject* result = PyObject_CallFunction(handler, "s", request.c_str());
+        if (result == nullptr) {
+            PyErr_Print();
+        } else {
+            const char* text = PyUnicode_AsUTF8(result);
+            if (text != nullptr) {
+                response = text;
+            } else {
+                PyErr_Print();
+            }
+            Py_DECREF(result);
+        }
+        PyGILState_Release(gil);
+        return response;
+    }
 
-    // Execute the Python script that contains AI analysis logic
-    run_python_script("python_ai.py");
+    ~EmbeddedPythonWorker() {
+        if (main_thread != nullptr) {
+            PyEval_RestoreThread(main_thread);
+        }
+        Py_XDECREF(handler);
+        if (Py_IsInitialized()) {
+            Py_Finalize();
+        }
+    }
 
-    // Finalize the Python interpreter
-    Py_Finalize();
+private:
+    PyObject* handler = nullptr;
+    PyThreadState* main_thread = nullptr;
+};
+
+std::string json_quote(const std::string &text) {
+    std::string quoted = "\"";
+    for (char c : text) {
+        if (c == '"' || c == '\\') {
+            quoted += '\\';
+        }
+        quoted += c;
+    }
+    return quoted + "\"";
 }
 
-int main() {
+// Repository URLs on the command line are analyzed in turn; without any, JSON
+// requests are read from stdin one per line (see AnalysisWorker.py).
+int main(int argc, char* argv[]) {
     std::cout << "Starting C++ task scheduler and Python integration..." << std::endl;
 
-    start_python_interpreter();
+    EmbeddedPythonWorker worker;
+    auto started = std::chrono::steady_clock::now();
+    if (!worker.start("Python_Ai")) {
+        return 1;
+    }
+    auto ready = std::chrono::steady_clock::now();
+    std::cerr << "Python worker ready in "
+              << std::chrono::duration<double, std::milli>(ready - started).count() << " ms" << std::endl;
+
+    std::queue<std::string> requests;
+    for (int i = 1; i < argc; ++i) {
+        requests.push("{\"op\": \"analyze\", \"repo\": " + json_quote(argv[i]) + ", \"send\": true}");
+    }
+
+    std::string line;
+    while (!requests.empty() || (argc == 1 && std::getline(std::cin, line))) {
+        std::string request = line;
+        if (!requests.empty()) {
+            request = requests.front();
+            requests.pop();
+        }
+        if (request.empty()) {
+            continue;
+        }
+        auto call_start = std::chrono::steady_clock::now();
+        std::string response = worker.call(request);
+        auto call_end = std::chrono::steady_clock::now();
+        std::cout << response << std::endl;
+        std::cerr << "call took "
+                  << std::chrono::duration<double, std::milli>(call_end - call_start).count() << " ms" << std::endl;
+    }
 
     return 0;
 }
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import re
+
+from CallGraphEngine import extract_call_graph
+from PipelineMetrics import metrics
+
+# File extensions picked up by the repository scanners
+SOURCE_EXTENSIONS = ('.py', '.js', '.cpp', '.java')
+
+DEFINITION_PATTERN = re.compile(r"def (\w+)\(")
+CALL_PATTERN = re.compile(r"(\w+)\(")
+
+
+def git_blob_id(data):
+    """
+    Hashes file bytes the same way git hashes blobs, so ids computed from the
+    working tree can be compared with ids read from the git index.
+    """
+    header = f"blob {len(data)}\0".encode()
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def read_source_file(repo_path, rel_path):
+    with metrics.stage("read", items=1) as timer:
+        with open(os.path.join(repo_path, rel_path), "rb") as f:
+            data = f.read()
+        timer.bytes = len(data)
+    return git_blob_id(data), data.decode("utf-8", errors="ignore")
+
+
+def extract_function_block(func_name, content):
+    """
+    Returns the indented body that follows a Python-style definition of func_name.
+    """
+    pattern = re.compile(rf"def {func_name}\(.*?\):((\n    .*)+)")
+    match = pattern.search(content)
+    return match.group(1) if match else ""
+
+
+def extract_functions(content):
+    """
+    Regex fallback that detects Python-style definitions and the calls between them.
+    Returns (definitions, edges) where edges are (caller, callee) pairs. Costs one
+    full rescan of content per definition; see CallGraphEngine for the main path.
+    """
+    function_defs = DEFINITION_PATTERN.findall(content)
+    known = set(function_defs)
+    edges = []
+    seen = set()
+    for caller in function_defs:
+        caller_block = extract_function_block(caller, content)
+        for callee in CALL_PATTERN.findall(caller_block):
+            if callee != caller and callee in known and (caller, callee) not in seen:
+                seen.add((caller, callee))
+                edges.append((caller, callee))
+    return function_defs, edges
+
+
+def extract_file_call_graph(file_name, content):
+    """
+    Qualified definitions and call edges for one file. Python that `ast` cannot
+    parse falls back to the regex scanner.
+    """
+    try:
+        return extract_call_graph(file_name, content)
+    except (SyntaxError, ValueError, RecursionError):
+        return extract_functions(content)
+
+
+def compute_file_complexity(file_name, content):
+    """
+    Radon cyclomatic complexity for one Python file, keyed by the same qualified
+    names the call graph uses (Class.method, Outer.Inner.method, outer.inner).
+    Only functions are scored; classes are walked for their methods and nested
+    classes. Non-Python files score as empty; radon errors propagate so the
+    caller can isolate them per file.
+    """
+    if not file_name.endswith('.py'):
+        return {}
+
+    from radon.complexity import cc_visit  # Loaded on the first Python file, not at import
+    from radon.visitors import Class
+    scores = {}
+    pending = [(block, getattr(block, "fullname", block.name)) for block in cc_visit(content)]
+    while pending:
+        block, name = pending.pop()
+        if isinstance(block, Class):
+            # Top-level methods are also listed by cc_visit; the dict keeps one score each
+            pending.extend((method, f"{name}.{method.name}") for method in block.methods)
+            pending.extend((inner, f"{name}.{inner.name}") for inner in block.inner_classes)
+            continue
+        scores[name] = block.complexity
+        pending.extend((closure, f"{name}.{closure.name}") for closure in block.closures)
+    return scores
+
+
+def module_name(rel_path):
+    """
+    Dotted module path for a file relative to the repository root, e.g.
+    "pkg/util.py" -> "pkg.util" and "pkg/__init__.py" -> "pkg".
+    """
+    stem, ext = os.path.splitext(rel_path.replace(os.sep, "/"))
+    if ext != ".py":
+        return rel_path.replace(os.sep, "/")  # Keep the extension so a.cpp and a.js stay apart
+    parts = stem.split("/")
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    return ".".join(parts)
+
+
+def qualify(module, name):
+    return f"{module}:{name}"
+
+
+def analyze_source(rel_path, content):
+    """
+    Runs every per-file analysis pass over one read of the file and returns a
+    JSON-serializable result that can be cached and merged into a function graph
+    later. Names are module-qualified ("pkg.util:Class.method") so definitions in
+    different files never collide. A failing pass only loses its own output and
+    is recorded under "errors".
+    """
+    module = module_name(rel_path)
+    result = {"defs": [], "edges": [], "complexity": {}, "errors": []}
+    try:
+        with metrics.stage("call_graph", items=1):
+            function_defs, edges = extract_file_call_graph(rel_path, content)
+        result["defs"] = [qualify(module, func) for func in function_defs]
+        result["edges"] = [[qualify(module, caller), qualify(module, callee)] for caller, callee in edges]
+    except Exception as e:
+        result["errors"].append(f"call graph: {e}")
+    try:
+        with metrics.stage("complexity", items=1):
+            complexity = compute_file_complexity(rel_path, content)
+        # Scores only attach to definitions the call graph reported, never to stray blocks
+        defs = set(result["defs"])
+        result["complexity"] = {qualified: score for qualified, score in
+                                ((qualify(module, name), score) for name, score in complexity.items())
+                                if qualified in defs}
+    except Exception as e:
+        result["errors"].append(f"complexity: {e}")
+
+    for error in result["errors"]:
+        print(f"[ANALYSIS ERROR] {rel_path}: {error}")
+    return result
+
+
+def unreadable_result(rel_path, error):
+    print(f"[ANALYSIS ERROR] {rel_path}: {error}")
+    return {"defs": [], "edges": [], "complexity": {}, "errors": [f"read: {error}"]}
+
+
+def add_file_result(function_graph, rel_path, result):
+    """
+    Merges one file's definitions, call edges and complexity scores into the graph.
+    Every node and edge remembers which files contributed it so the file can be
+    retracted later.
+    """
+    complexity = result.get("complexity", {})
+    for func in result["defs"]:
+        if not function_graph.has_node(func):
+            function_graph.add_node(func, files=set())
+        attributes = function_graph.nodes[func]
+        attributes.setdefault("files", set()).add(rel_path)
+        if func in complexity:
+            attributes["complexity"] = complexity[func]
+
+    for caller, callee in result["edges"]:
+        if not function_graph.has_edge(caller, callee):
+            function_graph.add_edge(caller, callee, files=set())
+        function_graph.edges[caller, callee].setdefault("files", set()).add(rel_path)
+
+
+def collect_complexity_scores(function_graph):
+    """
+    Complexity scores merged into the graph by add_file_result, keyed by node.
+    """
+    return {func: data["complexity"] for func, data in function_graph.nodes(data=True) if "complexity" in data}
+
+
+def remove_file_result(function_graph, rel_path, result):
+    """
+    Retracts a previously merged file result. Nodes and edges shared with other
+    files stay in the graph until their last contributing file is removed.
+    """
+    for caller, callee in result["edges"]:
+        if function_graph.has_edge(caller, callee):
+            files = function_graph.edges[caller, callee].get("files", set())
+            files.discard(rel_path)
+            if not files:
+                function_graph.remove_edge(caller, callee)
+
+    for func in result["defs"]:
+        if function_graph.has_node(func):
+            files = function_graph.nodes[func].get("files", set())
+            files.discard(rel_path)
+            if not files:
+                function_graph.remove_node(func)
@@ -0,0 +1,290 @@
+"""
+Headless rendering of function call graphs. Graphs are reduced to the
+highest-priority functions, with everything else collapsed into one node per
+module, laid out with an O(n) module-grid layout (or a spring layout for small
+graphs, cached across runs) and written to PNG, SVG, GraphViz DOT or JSON
+without opening a window. networkx and matplotlib are imported only when a
+spring layout or an image is actually produced.
+"""
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from PriorityEngine import CSRGraph, PriorityEngine, rank_scores
+
+LAYOUT_CACHE_DIR = "./cloned_repos/.layout_cache"
+# Collapsed graphs at most this large get a spring layout under layout="auto"
+SPRING_LAYOUT_LIMIT = 300
+# Node labels are only drawn on images with at most this many nodes
+LABEL_LIMIT = 150
+FORMATS = ("png", "svg", "dot", "json")
+
+
+class RenderedGraph:
+    """
+    The reduced graph that gets drawn: node names, their module, score and how
+    many functions each one stands for (1 unless it is a collapsed module node),
+    plus deduplicated edges with the number of calls they aggregate.
+    """
+    def __init__(self, names, modules, scores, members, sources, targets, weights):
+        self.names = names
+        self.modules = modules
+        self.scores = scores
+        self.members = members
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.names)
+
+
+def as_csr(function_graph):
+    if isinstance(function_graph, CSRGraph):
+        return function_graph
+    if hasattr(function_graph, "to_csr"):
+        return function_graph.to_csr()
+    return CSRGraph.from_networkx(function_graph)
+
+
+def module_of(name, depth=None):
+    """
+    "pkg.mod:Class.method" -> "pkg.mod"; with depth only the first `depth`
+    dotted components are kept.
+    """
+    module = name.split(":", 1)[0]
+    if depth is not None:
+        module = ".".join(module.split(".")[:depth])
+    return module
+
+
+def collapse_graph(csr, scores, max_nodes):
+    """
+    Keeps the max_nodes highest-scoring functions and merges the rest into one
+    node per module. When there are more such modules than max_nodes, modules
+    are merged by their leading package components until they fit.
+    """
+    count = len(csr)
+    keep = rank_scores(scores, max_nodes)
+    kept = np.zeros(count, dtype=bool)
+    kept[keep] = True
+    rest = np.flatnonzero(~kept)
+
+    group = np.empty(count, dtype=np.int64)
+    group[keep] = np.arange(len(keep))
+    names = [csr.names[i] for i in keep.tolist()]
+    modules = [module_of(name) for name in names]
+    node_scores = scores[keep].astype(np.float64)
+    members = np.ones(len(keep), dtype=np.int64)
+
+    if len(rest):
+        rest_names = [csr.names[i] for i in rest.tolist()]
+        depth = None
+        while True:
+            rest_modules = [module_of(name, depth) for name in rest_names]
+            distinct = dict.fromkeys(rest_modules)
+            if len(distinct) <= max(max_nodes, 1) or depth == 0:
+                break
+            depth = max(len(module.split(".")) for module in distinct) - 1 if depth is None else depth - 1
+        if depth == 0:
+            rest_modules = [""] * len(rest_names)
+            distinct = {"": None}
+        module_ids = {module: len(keep) + i for i, module in enumerate(distinct)}
+        group[rest] = [module_ids[module] for module in rest_modules]
+        collapsed = group[rest] - len(keep)
+        sizes = np.bincount(collapsed, minlength=len(module_ids))
+        names += [f"{module or '(all)'} (+{size})" for module, size in zip(module_ids, sizes.tolist())]
+        modules += list(module_ids)
+        node_scores = np.concatenate([node_scores, np.bincount(collapsed, weights=scores[rest], minlength=len(module_ids))])
+        members = np.concatenate([members, sizes])
+
+    sources = group[np.repeat(np.arange(count), np.diff(csr.indptr))]
+    targets = group[csr.indices]
+    between = sources != targets
+    keys = sources[between] * len(names) + targets[between]
+    keys, weights = np.unique(keys, return_counts=True)
+    return RenderedGraph(names, modules, node_scores, members, keys // len(names), keys % len(names), weights)
+
+
+def module_grid_layout(graph):
+    """
+    Hierarchical layout by module in linear time: modules sit on a square grid in
+    name order and each module's nodes fill a smaller grid inside its cell.
+    """
+    by_module = {}
+    for index, module in enumerate(graph.modules):
+        by_module.setdefault(module, []).append(index)
+    columns = math.ceil(math.sqrt(len(by_module))) or 1
+    positions = np.zeros((len(graph), 2))
+    for cell, module in enumerate(sorted(by_module)):
+        nodes = by_module[module]
+        cell_x, cell_y = cell % columns, -(cell // columns)
+        inner = math.ceil(math.sqrt(len(nodes)))
+        for slot, index in enumerate(nodes):
+            positions[index] = (cell_x + 0.1 + 0.8 * (slot % inner + 0.5) / inner,
+                                cell_y + 0.1 + 0.8 * (slot // inner + 0.5) / inner)
+    return positions
+
+
+def spring_layout(graph, cached_positions):
+    """
+    Sparse spring layout of the reduced graph. Nodes placed in an earlier run start
+    from their cached position, so an unchanged graph is not laid out again and a
+    slightly changed one settles in a few iterations.
+    """
+    if not len(graph):
+        return np.zeros((0, 2))
+    if cached_positions and all(name in cached_positions for name in graph.names):
+        return np.array([cached_positions[name] for name in graph.names])
+    import networkx as nx
+    nx_graph = nx.Graph()
+    nx_graph.add_nodes_from(range(len(graph)))
+    nx_graph.add_edges_from(zip(graph.sources.tolist(), graph.targets.tolist()))
+    initial = {i: cached_positions[name] for i, name in enumerate(graph.names) if name in cached_positions}
+    iterations = 15 if initial else 50
+    layout = nx.spring_layout(nx_graph, pos=initial or None, iterations=iterations, seed=0)
+    return np.array([layout[i] for i in range(len(graph))])
+
+
+def layout_cache_path(cache_key, layout, cache_dir=LAYOUT_CACHE_DIR):
+    digest = hashlib.sha1(f"{cache_key}\0{layout}".encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def load_layout_cache(path):
+    try:
+        with open(path) as f:
+            return {name: tuple(position) for name, position in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_layout_cache(path, graph, positions):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(dict(zip(graph.names, positions.tolist())), f)
+    os.replace(path + ".tmp", path)
+
+
+def compute_layout(graph, layout="auto", cache_key=None, cache_dir=LAYOUT_CACHE_DIR):
+    if layout == "auto":
+        layout = "spring" if len(graph) <= SPRING_LAYOUT_LIMIT else "module"
+    if layout == "module":
+        return module_grid_layout(graph)
+    if layout != "spring":
+        raise ValueError(f"Unknown layout {layout!r}")
+    path = layout_cache_path(cache_key, layout, cache_dir) if cache_key is not None else None
+    positions = spring_layout(graph, load_layout_cache(path) if path else {})
+    if path:
+        save_layout_cache(path, graph, positions)
+    return positions
+
+
+def draw_graph(ax, graph, positions, title=None):
+    """
+    Draws a RenderedGraph onto matplotlib axes: edges as one LineCollection and
+    nodes as one scatter, sized by score and colored by module. Collapsed module
+    nodes get a black outline.
+    """
+    from matplotlib.collections import LineCollection
+    ax.set_axis_off()
+    if title:
+        ax.set_title(title)
+    if not len(graph):
+        return  # A repository without functions renders as an empty figure
+    if len(graph.sources):
+        segments = np.stack([positions[graph.sources], positions[graph.targets]], axis=1)
+        widths = 0.3 + np.log1p(graph.weights) * 0.3
+        ax.add_collection(LineCollection(segments, colors="gray", linewidths=widths, alpha=0.4, zorder=1))
+    module_ids = {module: i for i, module in enumerate(sorted(set(graph.modules)))}
+    colors = [module_ids[module] % 20 for module in graph.modules]
+    sizes = 20 + 200 * np.sqrt(graph.scores / max(graph.scores.max(), 1e-9))
+    ax.scatter(positions[:, 0], positions[:, 1], s=sizes, c=colors, cmap="tab20", vmin=0, vmax=19,
+               edgecolors=["black" if size > 1 else "none" for size in graph.members.tolist()], zorder=2)
+    if len(graph) <= LABEL_LIMIT:
+        for name, (x, y) in zip(graph.names, positions.tolist()):
+            ax.annotate(name.split(":", 1)[-1], (x, y), fontsize=7, ha="center", va="bottom")
+    ax.autoscale_view()
+
+
+def write_image(graph, positions, path, file_format, title):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    figure = Figure(figsize=(16, 12))
+    FigureCanvasAgg(figure)
+    draw_graph(figure.add_subplot(), graph, positions, title)
+    figure.savefig(path, format=file_format, dpi=100, bbox_inches="tight")
+
+
+def dot_quote(text):
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_dot(graph, positions, path, title):
+    by_module = {}
+    for index, module in enumerate(graph.modules):
+        by_module.setdefault(module, []).append(index)
+    with open(path, "w") as f:
+        f.write(f"digraph {dot_quote(title or 'function_graph')} {{\n")
+        for cluster, module in enumerate(sorted(by_module)):
+            f.write(f"  subgraph cluster_{cluster} {{\n    label={dot_quote(module)};\n")
+            for index in by_module[module]:
+                x, y = positions[index]
+                f.write(f"    {index} [label={dot_quote(graph.names[index])}, pos=\"{x * 100:.1f},{y * 100:.1f}\", "
+                        f"score={graph.scores[index]:.3f}, members={graph.members[index]}];\n")
+            f.write("  }\n")
+        for source, target, weight in zip(graph.sources.tolist(), graph.targets.tolist(), graph.weights.tolist()):
+            f.write(f"  {source} -> {target} [weight={weight}];\n")
+        f.write("}\n")
+
+
+def write_json(graph, positions, path):
+    with open(path, "w") as f:
+        json.dump({
+            "nodes": [{"id": name, "module": module, "x": x, "y": y, "score": score, "members": members}
+                      for name, module, (x, y), score, members
+                      in zip(graph.names, graph.modules, positions.tolist(), graph.scores.tolist(), graph.members.tolist())],
+            "edges": [{"source": graph.names[source], "target": graph.names[target], "weight": weight}
+                      for source, target, weight
+                      in zip(graph.sources.tolist(), graph.targets.tolist(), graph.weights.tolist())],
+        }, f)
+
+
+def prepare_graph(function_graph, scores=None, max_nodes=500, layout="auto", cache_key=None,
+                  cache_dir=LAYOUT_CACHE_DIR):
+    """
+    Returns (RenderedGraph, positions) for drawing. Accepts a CompactGraph,
+    CSRGraph or networkx graph. Nodes are ranked by `scores` (default:
+    PriorityEngine's) and only the top max_nodes are kept individually.
+    cache_key, e.g. the repository path, enables the layout cache.
+    """
+    csr = as_csr(function_graph)
+    if scores is None:
+        scores = PriorityEngine().scores(csr)
+    graph = collapse_graph(csr, scores, max_nodes)
+    return graph, compute_layout(graph, layout, cache_key, cache_dir)
+
+
+def render_graph(function_graph, path, scores=None, max_nodes=500, layout="auto", cache_key=None,
+                 title=None, cache_dir=LAYOUT_CACHE_DIR):
+    """
+    Writes the graph to path without a display; the format follows the extension
+    (.png, .svg, .dot, .json). See prepare_graph for the other arguments.
+    Returns the RenderedGraph that was written.
+    """
+    file_format = os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported graph output format {file_format!r}; use one of {', '.join(FORMATS)}")
+    graph, positions = prepare_graph(function_graph, scores, max_nodes, layout, cache_key, cache_dir)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if file_format == "dot":
+        write_dot(graph, positions, path, title)
+    elif file_format == "json":
+        write_json(graph, positions, path)
+    else:
+        write_image(graph, positions, path, file_format, title)
+    return graph
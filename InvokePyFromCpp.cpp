@@ -1,15 +1,141 @@
-#include <iostream>
+#include <chrono>
+#include <csignal>
+#include <cstdio>
 #include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+// Persistent Python worker driven over a local pipe. The bundled executable is
+// started once in worker mode and answers one JSON line per request, instead
+// of a fresh `./python_ai` process (and full library startup) per run.
+class PythonWorkerProcess {
+public:
+    bool start(const std::vector<std::string> &command) {
+        int to_child[2], from_child[2];
+        if (pipe(to_child) != 0 || pipe(from_child) != 0) {
+            perror("pipe");
+            return false;
+        }
+        pid = fork();
+        if (pid < 0) {
+            perror("fork");
+            return false;
+        }
+        if (pid == 0) {
+            dup2(to_child[0], STDIN_FILENO);
+            dup2(from_child[1], STDOUT_FILENO);
+            close(to_child[0]);
+            close(to_child[1]);
+            close(from_child[0]);
+            close(from_child[1]);
+            std::vector<char*> args;
+            for (const std::string &arg : command) {
+                args.push_back(const_cast<char*>(arg.c_str()));
+            }
+            args.push_back(nullptr);
+            execvp(args[0], args.data());
+            perror("execvp");
+            _exit(127);
+        }
+        close(to_child[0]);
+        close(from_child[1]);
+        requests = fdopen(to_child[1], "w");
+        responses = fdopen(from_child[0], "r");
+        return requests != nullptr && responses != nullptr;
+    }
+
+    // Sends one JSON request line and returns the response line ("" if the worker died)
+    std::string call(const std::string &request) {
+        if (fputs(request.c_str(), requests) < 0 || fputc('\n', requests) == EOF || fflush(requests) != 0) {
+            return "";
+        }
+        std::string response;
+        int c;
+        while ((c = fgetc(responses)) != EOF && c != '\n') {
+            response += static_cast<char>(c);
+        }
+        return response;
+    }
+
+    ~PythonWorkerProcess() {
+        if (requests != nullptr) {
+            call("{\"op\": \"shutdown\"}");
+            fclose(requests);
+        }
+        if (responses != nullptr) {
+            fclose(responses);
+        }
+        if (pid > 0) {
+            waitpid(pid, nullptr, 0);
+        }
+    }
 
-void run_python_executable() {
-    std::string command = "./python_ai";  // Path to the bundled Python executable
-    system(command.c_str());
+private:
+    pid_t pid = -1;
+    FILE* requests = nullptr;
+    FILE* responses = nullptr;
+};
+
+std::string json_quote(const std::string &text) {
+    std::string quoted = "\"";
+    for (char c : text) {
+        if (c == '"' || c == '\\') {
+            quoted += '\\';
+        }
+        quoted += c;
+    }
+    return quoted + "\"";
+}
+
+// The worker command defaults to the bundled executable; PYTHON_AI_WORKER
+// overrides it (e.g. "python3 Python_Ai.py --worker").
+std::vector<std::string> worker_command() {
+    const char* configured = std::getenv("PYTHON_AI_WORKER");
+    std::vector<std::string> command;
+    std::istringstream words(configured != nullptr ? configured : "./python_ai --worker");
+    for (std::string word; words >> word;) {
+        command.push_back(word);
+    }
+    return command;
 }
 
-int main() {
+// Repository URLs on the command line are analyzed in turn; without any, JSON
+// requests are read from stdin one per line (see AnalysisWorker.py).
+int main(int argc, char* argv[]) {
     std::cout << "Starting C++ task scheduler..." << std::endl;
 
-    run_python_executable();
+    signal(SIGPIPE, SIG_IGN);  // A dead worker shows up as a failed call, not a killed host
+    PythonWorkerProcess worker;
+    if (!worker.start(worker_command())) {
+        return 1;
+    }
+
+    std::vector<std::string> requests;
+    for (int i = 1; i < argc; ++i) {
+        requests.push_back("{\"op\": \"analyze\", \"repo\": " + json_quote(argv[i]) + ", \"send\": true}");
+    }
+    std::string line;
+    for (size_t next = 0; next < requests.size() || (argc == 1 && std::getline(std::cin, line)); ) {
+        std::string request = next < requests.size() ? requests[next++] : line;
+        if (request.empty()) {
+            continue;
+        }
+        auto call_start = std::chrono::steady_clock::now();
+        std::string response = worker.call(request);
+        auto call_end = std::chrono::steady_clock::now();
+        if (response.empty()) {
+            std::cerr << "Python worker exited" << std::endl;
+            return 1;
+        }
+        std::cout << response << std::endl;
+        std::cerr << "call took "
+                  << std::chrono::duration<double, std::milli>(call_end - call_start).count() << " ms" << std::endl;
+    }
 
     return 0;
 }
@@ -0,0 +1,301 @@
+"""
+Log viewer for build logs of any size. LogIndex memory-maps the file and keeps
+the byte offset of every STRIDE-th line, so opening a multi-GB log costs one
+vectorized newline scan and a few MB of index, and any line is found by
+scanning at most STRIDE lines from its checkpoint. LogViewer only renders the
+lines that fit the window, follows appended output like `tail -f` (indexing
+just the new bytes) and searches the mapping directly, turning match offsets
+into line numbers through the index.
+"""
+import bisect
+import mmap
+import os
+import tkinter as tk
+from array import array
+from tkinter import ttk
+from tkinter import font as tkfont
+
+import numpy as np
+
+# Offset of every STRIDE-th line start is kept; lines in between are found by scanning
+STRIDE = 64
+# Bytes scanned for newlines per numpy pass, bounding temporary memory
+INDEX_CHUNK = 16 << 20
+# Longer lines are cut when rendered so one huge line cannot stall the window
+MAX_LINE_CHARS = 4000
+FOLLOW_INTERVAL_MS = 500
+
+
+class LogIndex:
+    """
+    Line index over a memory-mapped log file. refresh() picks up appended
+    bytes, and starts over if the file was truncated or replaced (log rotation).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.map = None
+        self.identity = None
+        self.reset()
+        self.refresh()
+
+    def reset(self):
+        if self.map is not None:
+            self.map.close()
+        self.map = None
+        self.size = 0
+        self.newlines = 0  # Complete lines indexed so far
+        self.last_line_start = 0
+        self.checkpoints = array("Q", [0])  # Start of line n * STRIDE
+
+    def refresh(self):
+        """
+        Indexes whatever was appended since the last call. Returns True if the
+        log changed.
+        """
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            info = None
+        identity = None if info is None else (info.st_dev, info.st_ino)
+        changed = False
+        if info is None or identity != self.identity or info.st_size < self.size:
+            changed = self.size > 0
+            self.reset()
+            self.identity = identity
+        if info is None or info.st_size == self.size:
+            return changed
+        start = self.size
+        with open(self.path, "rb") as log_file:
+            if self.map is not None:
+                self.map.close()
+            self.map = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self.map)
+        self.index_range(start, self.size)
+        return True
+
+    def index_range(self, start, end):
+        position = start
+        while position < end:
+            stop = min(position + INDEX_CHUNK, end)
+            chunk = np.frombuffer(self.map, dtype=np.uint8, count=stop - position, offset=position)
+            newlines = np.flatnonzero(chunk == 10)
+            del chunk  # The mapping cannot be closed while a view of it exists
+            if len(newlines):
+                # Newline k of this chunk starts line self.newlines + k + 1
+                first = -(self.newlines + 1) % STRIDE
+                self.checkpoints.extend((newlines[first::STRIDE] + position + 1).tolist())
+                self.newlines += len(newlines)
+                self.last_line_start = int(newlines[-1]) + position + 1
+            position = stop
+
+    def __len__(self):
+        # A partial last line (still being written) counts as a line
+        return self.newlines + (self.size > self.last_line_start)
+
+    def line_offset(self, number):
+        offset = self.checkpoints[number // STRIDE]
+        for _ in range(number % STRIDE):
+            offset = self.map.find(b"\n", offset, self.size) + 1
+        return offset
+
+    def lines(self, first, count):
+        """
+        Decoded text of up to `count` lines starting at line `first` (0-based).
+        """
+        if first >= len(self):
+            return []
+        offset = self.line_offset(first)
+        result = []
+        for _ in range(min(count, len(self) - first)):
+            end = self.map.find(b"\n", offset, self.size)
+            if end < 0:
+                end = self.size
+            raw = self.map[offset:min(end, offset + MAX_LINE_CHARS * 4)]
+            text = raw.decode("utf-8", errors="replace").rstrip("\r")
+            if end - offset > len(raw) or len(text) > MAX_LINE_CHARS:
+                text = text[:MAX_LINE_CHARS] + " …"
+            result.append(text)
+            offset = end + 1
+        return result
+
+    def line_of(self, offset):
+        """
+        (line number, byte column) of a byte offset.
+        """
+        block = bisect.bisect_right(self.checkpoints, offset) - 1
+        line_start = self.checkpoints[block]
+        number = block * STRIDE
+        newline = self.map.find(b"\n", line_start, offset)
+        while newline >= 0:
+            number += 1
+            line_start = newline + 1
+            newline = self.map.find(b"\n", line_start, offset)
+        return number, offset - line_start
+
+    def search(self, text, from_line=0, backwards=False, wrap=True):
+        """
+        Line number of the next line containing `text` after `from_line`
+        (before it when searching backwards; -1 searches from the top),
+        wrapping around the end of the log. Returns None when there is no match.
+        """
+        needle = text.encode("utf-8")
+        if not needle or not self.size:
+            return None
+        if backwards:
+            end = self.line_offset(from_line) if 0 <= from_line < len(self) else self.size
+            offset = self.map.rfind(needle, 0, end)
+            if offset < 0 and wrap:
+                offset = self.map.rfind(needle, 0, self.size)
+        else:
+            next_line = max(from_line + 1, 0)
+            start = self.line_offset(next_line) if next_line < len(self) else self.size
+            offset = self.map.find(needle, start, self.size)
+            if offset < 0 and wrap:
+                offset = self.map.find(needle, 0, self.size)
+        return None if offset < 0 else self.line_of(offset)[0]
+
+    def count(self, text, limit=None):
+        """
+        Lines containing `text`, counted once each, stopping at `limit`.
+        """
+        needle = text.encode("utf-8")
+        if not needle or not self.size:
+            return 0
+        matches, offset = 0, 0
+        while limit is None or matches < limit:
+            offset = self.map.find(needle, offset, self.size)
+            if offset < 0:
+                break
+            matches += 1
+            line_end = self.map.find(b"\n", offset, self.size)
+            offset = self.size if line_end < 0 else line_end + 1
+        return matches
+
+    def close(self):
+        self.reset()
+
+
+class LogViewer(tk.Toplevel):
+    """
+    Window over a LogIndex showing only the lines that fit. Following keeps
+    the view on the end of the log as it grows; scrolling up stops it.
+    """
+    def __init__(self, master, path, title="Build Logs", background="#1A0B29", foreground="#FFFFFF",
+                 highlight="#B86FC6"):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("800x500")
+        self.configure(bg=background)
+        self.index = LogIndex(path)
+        self.first_line = 0
+        self.rows = 1
+        self.found_line = None
+        self.follow = tk.BooleanVar(value=True)
+        self.query = tk.StringVar()
+        self.status = tk.StringVar()
+
+        toolbar = ttk.Frame(self)
+        toolbar.pack(side=tk.TOP, fill=tk.X)
+        ttk.Checkbutton(toolbar, text="Follow", variable=self.follow, command=self.on_follow).pack(side=tk.LEFT, padx=5)
+        search_entry = ttk.Entry(toolbar, textvariable=self.query, width=30)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<Return>", lambda event: self.find(backwards=False))
+        search_entry.bind("<Shift-Return>", lambda event: self.find(backwards=True))
+        ttk.Button(toolbar, text="Previous", command=lambda: self.find(backwards=True)).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="Next", command=lambda: self.find(backwards=False)).pack(side=tk.LEFT)
+        ttk.Label(toolbar, textvariable=self.status).pack(side=tk.RIGHT, padx=5)
+
+        body = ttk.Frame(self)
+        body.pack(expand=True, fill=tk.BOTH)
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text = tk.Text(body, wrap=tk.NONE, bg=background, fg=foreground, insertbackground=foreground)
+        self.text.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.text.tag_configure("match", background=highlight)
+        self.line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+
+        self.text.bind("<Configure>", self.on_resize)
+        self.text.bind("<MouseWheel>", lambda event: self.scroll_by(-3 if event.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll_by(3))
+        for key, step in (("<Up>", -1), ("<Down>", 1)):
+            self.text.bind(key, lambda event, step=step: self.scroll_by(step) or "break")
+        self.text.bind("<Prior>", lambda event: self.scroll_by(-self.rows) or "break")
+        self.text.bind("<Next>", lambda event: self.scroll_by(self.rows) or "break")
+        self.text.bind("<Control-Home>", lambda event: self.scroll_to(0) or "break")
+        self.text.bind("<Control-End>", lambda event: self.on_follow(True) or "break")
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.scroll_to(self.last_page())
+        self.poll_id = self.after(FOLLOW_INTERVAL_MS, self.poll)
+
+    def last_page(self):
+        return max(len(self.index) - self.rows, 0)
+
+    def render(self):
+        lines = self.index.lines(self.first_line, self.rows)
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        if self.found_line is not None and 0 <= self.found_line - self.first_line < len(lines):
+            row = self.found_line - self.first_line + 1
+            self.text.tag_add("match", f"{row}.0", f"{row}.end")
+        self.text.configure(state=tk.DISABLED)
+        total = max(len(self.index), 1)
+        self.scrollbar.set(self.first_line / total, min((self.first_line + self.rows) / total, 1.0))
+        self.status.set(f"lines {self.first_line + 1}-{self.first_line + len(lines)} of {len(self.index)}")
+
+    def scroll_to(self, line):
+        self.first_line = min(max(line, 0), self.last_page())
+        self.render()
+
+    def scroll_by(self, lines):
+        if lines < 0:
+            self.follow.set(False)
+        self.scroll_to(self.first_line + lines)
+        if self.first_line == self.last_page() and lines > 0:
+            self.follow.set(True)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.follow.set(False)
+            self.scroll_to(int(float(amount) * len(self.index)))
+        else:
+            self.scroll_by(int(amount) * (self.rows if unit == "pages" else 1))
+
+    def on_resize(self, event):
+        rows = max(event.height // self.line_height, 1)
+        if rows != self.rows:
+            self.rows = rows
+            self.scroll_to(self.last_page() if self.follow.get() else self.first_line)
+
+    def on_follow(self, enable=None):
+        if enable is not None:
+            self.follow.set(enable)
+        if self.follow.get():
+            self.scroll_to(self.last_page())
+
+    def poll(self):
+        if self.index.refresh():
+            self.scroll_to(self.last_page() if self.follow.get() else self.first_line)
+        self.poll_id = self.after(FOLLOW_INTERVAL_MS, self.poll)
+
+    def find(self, backwards):
+        query = self.query.get()
+        if not query:
+            return
+        start = self.found_line if self.found_line is not None else self.first_line - (0 if backwards else 1)
+        line = self.index.search(query, start, backwards=backwards)
+        if line is None:
+            self.found_line = None
+            self.status.set(f"'{query}' not found")
+            self.text.bell()
+            return
+        self.follow.set(False)
+        self.found_line = line
+        self.scroll_to(line - self.rows // 2)
+
+    def close(self):
+        self.after_cancel(self.poll_id)
+        self.index.close()
+        self.destroy()
@@ -0,0 +1,100 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from FileAnalysis import analyze_source, read_source_file, unreadable_result
+from PipelineMetrics import metrics
+
+# Files handed to a worker per round trip; larger chunks amortize pickling overhead
+DEFAULT_CHUNKSIZE = 16
+# Chunks in flight per worker; caps how many finished results wait for the parent
+CHUNKS_IN_FLIGHT = 4
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def parse_file(job):
+    """
+    Worker entry point. Reads and analyzes one file and returns the compact
+    (rel_path, blob_id, result) record the parent merges into the graph. When the
+    file still hashes to known_blob_id the parse is skipped and result is None.
+    """
+    repo_path, rel_path, known_blob_id = job
+    try:
+        blob_id, content = read_source_file(repo_path, rel_path)
+    except OSError as e:
+        return rel_path, None, unreadable_result(rel_path, e)
+    if blob_id == known_blob_id:
+        return rel_path, blob_id, None
+    return rel_path, blob_id, analyze_source(rel_path, content)
+
+
+def start_worker():
+    metrics.reset()  # A forked worker starts with a copy of the parent's totals
+
+
+def make_parse_pool(workers=None):
+    """
+    A process pool that several parse_files() calls can share, e.g. concurrent
+    analysis jobs. Its workers are started here, so they are forked from the
+    calling thread (call it from the main thread) rather than from whichever
+    thread happens to submit first.
+    """
+    workers = workers or default_workers()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=start_worker)
+    for future in [pool.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+    return pool
+
+
+def parse_chunk(jobs):
+    """
+    Worker entry point for a chunk: the parsed records plus the stage totals
+    recorded while parsing them, which the parent merges into its metrics.
+    """
+    records = [parse_file(job) for job in jobs]
+    return records, metrics.take_stage_totals()
+
+
+def merge_chunk(future):
+    records, stage_totals = future.result()
+    metrics.merge_stage_totals(stage_totals)
+    return records
+
+
+def parse_files(repo_path, files, workers=None, chunksize=DEFAULT_CHUNKSIZE, pool=None):
+    """
+    Parses (rel_path, known_blob_id) pairs and yields parse_file records in input
+    order, so the merged graph is identical whichever path produced it. Small
+    batches and workers <= 1 run serially in this process; anything else is
+    fanned out in chunks over `pool` when given (see make_parse_pool), or over
+    a process pool started for this call. Only a few chunks per worker are
+    in flight at once, so memory stays bounded however large the repository is.
+    """
+    jobs = [(repo_path, rel_path, known_blob_id) for rel_path, known_blob_id in files]
+    if workers is None:
+        workers = default_workers()
+
+    if workers <= 1 or len(jobs) <= chunksize:
+        for job in jobs:
+            yield parse_file(job)
+        return
+
+    chunks = (jobs[start:start + chunksize] for start in range(0, len(jobs), chunksize))
+    if pool is not None:
+        yield from run_chunks(pool, chunks, workers)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker) as own_pool:
+        yield from run_chunks(own_pool, chunks, workers)
+
+
+def run_chunks(pool, chunks, workers):
+    in_flight = deque()
+    for chunk in chunks:
+        in_flight.append(pool.submit(parse_chunk, chunk))
+        if len(in_flight) >= workers * CHUNKS_IN_FLIGHT:
+            yield from merge_chunk(in_flight.popleft())
+    while in_flight:
+        yield from merge_chunk(in_flight.popleft())
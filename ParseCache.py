@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+
+from CompactGraph import CompactGraph
+from FileAnalysis import SOURCE_EXTENSIONS
+from ParallelParser import DEFAULT_CHUNKSIZE, parse_files
+from PipelineMetrics import metrics
+
+# Where per-repository parse caches are kept between runs
+CACHE_DIR = os.path.join(".", "cloned_repos", ".parse_cache")
+CACHE_FORMAT = 4  # 4: complexity covers nested-class methods and only def nodes
+
+
+class ParseCache:
+    """
+    Persistent per-file analysis results for one repository. Entries are keyed by
+    path relative to the repository root and are only valid while the file's
+    blob id matches. `head` is the commit the cached graph was last built for.
+    """
+    def __init__(self, repo_path, extensions=SOURCE_EXTENSIONS, cache_dir=CACHE_DIR):
+        self.extensions = tuple(extensions)
+        repo_key = hashlib.sha1(f"{os.path.abspath(repo_path)}|{','.join(self.extensions)}".encode()).hexdigest()[:12]
+        self.cache_file = os.path.join(cache_dir, f"{os.path.basename(os.path.abspath(repo_path))}-{repo_key}.json")
+        self.head = None
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[CACHE ERROR] Ignoring unreadable parse cache {self.cache_file}: {e}")
+            return
+        if data.get("format") != CACHE_FORMAT:
+            return
+        self.head = data.get("head")
+        self.entries = data.get("files", {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temp_file = self.cache_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"format": CACHE_FORMAT, "head": self.head, "files": self.entries}, f)
+        os.replace(temp_file, self.cache_file)
+        self.dirty = False
+
+    def get(self, rel_path, blob_id):
+        entry = self.entries.get(rel_path)
+        if entry is not None and blob_id is not None and entry["blob"] == blob_id:
+            return entry["result"]
+        return None
+
+    def put(self, rel_path, blob_id, result):
+        self.entries[rel_path] = {"blob": blob_id, "result": result}
+        self.dirty = True
+
+    def discard(self, rel_path):
+        entry = self.entries.pop(rel_path, None)
+        if entry is None:
+            return None
+        self.dirty = True
+        return entry["result"]
+
+    def set_head(self, head):
+        if head != self.head:
+            self.head = head
+            self.dirty = True
+
+
+def current_head(repo_path):
+    import git  # GitPython is imported where used so loading a cache stays cheap
+    try:
+        return git.Repo(repo_path).head.commit.hexsha
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError, ValueError):
+        return None  # Not a git checkout, or a repository without commits
+
+
+def indexed_blob_ids(repo_path):
+    """
+    Blob ids for tracked files taken from the git index, so unchanged files can be
+    recognised without opening them. Files with uncommitted edits are left out.
+    """
+    import git
+    try:
+        repo = git.Repo(repo_path)
+        staged = repo.git.ls_files("-s", "-z")
+        modified = set(filter(None, repo.git.diff("--name-only", "-z").split("\0")))
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError, git.GitCommandError):
+        return {}
+
+    blob_ids = {}
+    for record in filter(None, staged.split("\0")):
+        meta, rel_path = record.split("\t", 1)
+        if rel_path not in modified:
+            blob_ids[rel_path] = meta.split()[1]
+    return blob_ids
+
+
+def changed_paths(repo_path, old_head, new_head):
+    """
+    Returns (changed, deleted) relative paths between two commits.
+    """
+    import git
+    output = git.Repo(repo_path).git.diff("--name-status", "--no-renames", "-z", old_head, new_head)
+    fields = output.split("\0")
+    changed, deleted = [], []
+    for status, rel_path in zip(fields[0::2], fields[1::2]):
+        (deleted if status == "D" else changed).append(rel_path)
+    return changed, deleted
+
+
+def iter_source_files(repo_path, extensions):
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for file in files:
+            if file.endswith(extensions):
+                yield os.path.relpath(os.path.join(root, file), repo_path).replace(os.sep, "/")
+
+
+def build_function_graph(repo_path, function_graph, cache, workers=None, chunksize=DEFAULT_CHUNKSIZE, pool=None):
+    """
+    Full scan of the working tree. Files whose blob id still matches the cache are
+    merged from the cache; everything else is read and parsed again.
+    """
+    with metrics.stage("scan") as timer:
+        blob_ids = indexed_blob_ids(repo_path)
+        rel_paths = list(iter_source_files(repo_path, cache.extensions))
+        cached = {}
+        misses = []
+        for rel_path in rel_paths:
+            result = cache.get(rel_path, blob_ids.get(rel_path))
+            if result is None:
+                misses.append((rel_path, cache.entries.get(rel_path, {}).get("blob")))
+            else:
+                cached[rel_path] = result
+        timer.items = len(rel_paths)
+    metrics.count("files_cached", len(cached))
+    metrics.count("files_parsed", len(misses))
+
+    # Parsed records arrive in the order of misses, which follows rel_paths
+    with metrics.stage("parse", items=len(misses)):
+        parsed = parse_files(repo_path, misses, workers, chunksize, pool)
+        for rel_path in rel_paths:
+            result = cached.get(rel_path)
+            if result is None:
+                _, blob_id, result = next(parsed)
+                if result is None:
+                    result = cache.get(rel_path, blob_id)
+                else:
+                    cache.put(rel_path, blob_id, result)
+            function_graph.add_file_result(rel_path, result)
+        parsed.close()  # Shuts a per-call worker pool down
+
+    seen = set(rel_paths)
+    for rel_path in [p for p in cache.entries if p not in seen]:
+        cache.discard(rel_path)
+    cache.set_head(current_head(repo_path))
+
+
+def update_function_graph(repo_path, function_graph, cache, new_head, workers=None, chunksize=DEFAULT_CHUNKSIZE,
+                          pool=None):
+    """
+    Patches a graph previously built for cache.head so it matches new_head.
+    Only files touched by the git diff between the two commits are re-parsed.
+    """
+    with metrics.stage("diff") as timer:
+        changed, deleted = changed_paths(repo_path, cache.head, new_head)
+        for rel_path in changed + deleted:
+            old_result = cache.discard(rel_path)
+            if old_result is not None:
+                function_graph.remove_file_result(rel_path, old_result)
+        timer.items = len(changed) + len(deleted)
+
+    to_parse = [(rel_path, None) for rel_path in changed
+                if rel_path.endswith(cache.extensions) and os.path.isfile(os.path.join(repo_path, rel_path))]
+    metrics.count("files_parsed", len(to_parse))
+    with metrics.stage("parse", items=len(to_parse)):
+        for rel_path, blob_id, result in parse_files(repo_path, to_parse, workers, chunksize, pool):
+            cache.put(rel_path, blob_id, result)
+            function_graph.add_file_result(rel_path, result)
+    cache.set_head(new_head)
+
+
+def refresh_function_graph(repo_path, cache, function_graph=None, workers=None, chunksize=DEFAULT_CHUNKSIZE,
+                           pool=None):
+    """
+    Brings a function graph up to date with the repository. A graph already built
+    for cache.head is patched in place from the git diff; otherwise a new graph
+    is built with a cache-assisted full scan. The cache is saved afterwards.
+    The graph is a CompactGraph; call to_networkx() where networkx is needed.
+    Parsing is spread over `workers` processes, in `pool` when one is shared
+    between callers (see ParallelParser.make_parse_pool).
+    """
+    import git
+    new_head = current_head(repo_path)
+    if isinstance(function_graph, CompactGraph) and cache.head and new_head:
+        if new_head != cache.head:
+            try:
+                update_function_graph(repo_path, function_graph, cache, new_head, workers, chunksize, pool)
+            except git.GitCommandError as e:
+                print(f"[GIT ERROR] Incremental update failed, rescanning: {e}")
+                function_graph = None
+    else:
+        function_graph = None
+
+    if function_graph is None:
+        function_graph = CompactGraph()
+        build_function_graph(repo_path, function_graph, cache, workers, chunksize, pool)
+
+    with metrics.stage("cache_save"):
+        cache.save()
+    return function_graph
@@ -0,0 +1,307 @@
+"""
+Stage timing for the analyze -> prioritize -> send pipeline. Code wraps a stage
+in `with metrics.stage("parse", items=files):` and the process-wide `metrics`
+recorder accumulates calls, wall and CPU seconds, items and bytes per stage,
+plus plain counters (socket bytes, ...) and gauges (graph size, ...). Timers
+are two clock reads on entry and exit, so they stay on in production.
+
+Parse workers record into their own copy of `metrics`; ParallelParser ships
+each chunk's totals back with its records and merges them here, so per-file
+stages (read, call_graph, complexity) add up CPU and wall time over all
+workers. A run() can also capture a cProfile dump and the tracemalloc peak.
+Snapshots export as JSON lines or Prometheus text exposition format.
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = "aicompilerplus"
+
+
+class StageStats:
+    __slots__ = ("calls", "wall_ns", "cpu_ns", "max_wall_ns", "items", "bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_ns = 0
+        self.cpu_ns = 0
+        self.max_wall_ns = 0
+        self.items = 0
+        self.bytes = 0
+
+    def as_dict(self):
+        wall = self.wall_ns / 1e9
+        return {
+            "calls": self.calls,
+            "wall_seconds": wall,
+            "cpu_seconds": self.cpu_ns / 1e9,
+            "max_wall_seconds": self.max_wall_ns / 1e9,
+            "items": self.items,
+            "bytes": self.bytes,
+            "items_per_second": self.items / wall if wall else None,
+        }
+
+
+class StageTimer:
+    """
+    Context manager returned by PipelineMetrics.stage(). Items and bytes known
+    only inside the block can be added with timer.items += n / timer.bytes += n.
+    """
+    __slots__ = ("metrics", "name", "items", "bytes", "wall_start", "cpu_start")
+
+    def __init__(self, metrics, name, items, size):
+        self.metrics = metrics
+        self.name = name
+        self.items = items
+        self.bytes = size
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter_ns()
+        self.cpu_start = time.thread_time_ns()  # CPU of this thread, not of concurrent stages
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.metrics.record(self.name, time.perf_counter_ns() - self.wall_start,
+                            time.thread_time_ns() - self.cpu_start, self.items, self.bytes)
+        return False
+
+
+class NullTimer:
+    __slots__ = ("items", "bytes")
+
+    def __enter__(self):
+        self.items = self.bytes = 0
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class PipelineMetrics:
+    """
+    Thread-safe per-stage totals, counters and gauges. Stages may nest; each
+    one is timed on its own, so nested stage times are not additive.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+        self.runs = 0
+        self.profile_dir = None  # run() writes a cProfile dump per run here when set
+        self.trace_memory = False  # run() records the tracemalloc peak when set
+        self.trace_lock = threading.Lock()  # tracemalloc is process-wide: traced runs go one at a time
+
+    def stage(self, name, items=0, size=0):
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self, name, items, size)
+
+    def record(self, name, wall_ns, cpu_ns=0, items=0, size=0):
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.calls += 1
+            stats.wall_ns += wall_ns
+            stats.cpu_ns += cpu_ns
+            stats.max_wall_ns = max(stats.max_wall_ns, wall_ns)
+            stats.items += items
+            stats.bytes += size
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        if self.enabled:
+            with self.lock:
+                self.gauges[name] = value
+
+    def take_stage_totals(self):
+        """
+        Stage totals as plain tuples, reset afterwards. Used to ship a parse
+        worker's numbers back to the parent.
+        """
+        with self.lock:
+            totals = {name: (s.calls, s.wall_ns, s.cpu_ns, s.max_wall_ns, s.items, s.bytes)
+                      for name, s in self.stages.items()}
+            self.stages = {}
+        return totals
+
+    def merge_stage_totals(self, totals):
+        if not self.enabled:
+            return
+        with self.lock:
+            for name, (calls, wall_ns, cpu_ns, max_wall_ns, items, size) in totals.items():
+                stats = self.stages.get(name)
+                if stats is None:
+                    stats = self.stages[name] = StageStats()
+                stats.calls += calls
+                stats.wall_ns += wall_ns
+                stats.cpu_ns += cpu_ns
+                stats.max_wall_ns = max(stats.max_wall_ns, max_wall_ns)
+                stats.items += items
+                stats.bytes += size
+
+    @contextmanager
+    def run(self, label):
+        """
+        Times one pipeline run as the "run" stage. With profile_dir set the run's
+        thread is profiled into <profile_dir>/<label>-<timestamp>.prof (open it
+        with pstats or snakeviz); with trace_memory the tracemalloc peak of the
+        process during the run is kept as the peak_traced_bytes gauge. Tracing
+        and its peak are process-wide, so traced runs started from several
+        threads wait for each other instead of resetting each other's peak.
+        """
+        trace_memory = self.trace_memory
+        if trace_memory:
+            self.trace_lock.acquire()
+        profiler = None
+        if self.profile_dir:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        tracing = trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif trace_memory:
+            tracemalloc.reset_peak()
+        try:
+            with self.stage("run"):
+                yield
+        finally:
+            if trace_memory:
+                self.gauge("peak_traced_bytes", tracemalloc.get_traced_memory()[1])
+                if tracing:
+                    tracemalloc.stop()
+                self.trace_lock.release()
+            if profiler is not None:
+                profiler.disable()
+                self.dump_profile(profiler, label)
+            with self.lock:
+                self.runs += 1
+
+    def dump_profile(self, profiler, label):
+        safe_label = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+        path = os.path.join(self.profile_dir, f"{safe_label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as e:
+            print(f"[METRICS ERROR] Could not write profile {path}: {e}")
+            return None
+        return path
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "time": time.time(),
+                "uptime": time.time() - self.started,
+                "runs": self.runs,
+                "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+            self.gauges = {}
+            self.runs = 0
+            self.started = time.time()
+
+    def export_jsonl(self, path):
+        """
+        Appends one snapshot line to a JSON-lines file.
+        """
+        snapshot = self.snapshot()
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+        except OSError as e:
+            print(f"[METRICS ERROR] Could not write metrics to {path}: {e}")
+        return snapshot
+
+    def prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """
+        The current totals in Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{escape_label(str(val))}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value!r}" if label_text
+                             else f"{prefix}_{name} {value!r}")
+
+        stages = sorted(snapshot["stages"].items())
+        family("stage_calls_total", "counter", "Times each pipeline stage ran.",
+               [({"stage": name}, stats["calls"]) for name, stats in stages])
+        family("stage_wall_seconds_total", "counter", "Wall-clock seconds spent per stage.",
+               [({"stage": name}, stats["wall_seconds"]) for name, stats in stages])
+        family("stage_cpu_seconds_total", "counter", "CPU seconds spent per stage.",
+               [({"stage": name}, stats["cpu_seconds"]) for name, stats in stages])
+        family("stage_max_wall_seconds", "gauge", "Longest single call of each stage.",
+               [({"stage": name}, stats["max_wall_seconds"]) for name, stats in stages])
+        family("stage_items_total", "counter", "Items (files, tasks) handled per stage.",
+               [({"stage": name}, stats["items"]) for name, stats in stages])
+        family("stage_bytes_total", "counter", "Bytes handled per stage.",
+               [({"stage": name}, stats["bytes"]) for name, stats in stages])
+        family("runs_total", "counter", "Pipeline runs completed.", [({}, snapshot["runs"])])
+        for name, value in sorted(snapshot["counters"].items()):
+            family(f"{name}_total", "counter", f"Total {name.replace('_', ' ')}.", [({}, value)])
+        for name, value in sorted(snapshot["gauges"].items()):
+            family(name, "gauge", f"Latest {name.replace('_', ' ')}.", [({}, value)])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix=PROMETHEUS_PREFIX):
+        """
+        Writes the Prometheus text to `path` atomically (for node_exporter's
+        textfile collector or any scraper reading the file).
+        """
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w") as f:
+                f.write(self.prometheus(prefix))
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"[METRICS ERROR] Could not write metrics to {path}: {e}")
+
+    def summary(self):
+        """
+        A plain-text table of the stages, slowest first.
+        """
+        snapshot = self.snapshot()
+        rows = [f"{'stage':<14}{'calls':>8}{'wall s':>10}{'cpu s':>10}{'items':>10}{'items/s':>12}{'MiB':>9}"]
+        for name, stats in sorted(snapshot["stages"].items(), key=lambda item: -item[1]["wall_seconds"]):
+            rate = stats["items_per_second"]
+            rows.append(f"{name:<14}{stats['calls']:>8}{stats['wall_seconds']:>10.3f}{stats['cpu_seconds']:>10.3f}"
+                        f"{stats['items']:>10}{rate if rate is not None else 0:>12.0f}"
+                        f"{stats['bytes'] / (1 << 20):>9.2f}")
+        for name, value in sorted({**snapshot["counters"], **snapshot["gauges"]}.items()):
+            rows.append(f"{name}: {value}")
+        return "\n".join(rows)
+
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Process-wide recorder shared by every stage of the pipeline
+metrics = PipelineMetrics()
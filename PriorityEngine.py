@@ -0,0 +1,176 @@
+import numpy as np
+
+# Linear weights handed to the scheduler run from MAX_PRIORITY down to MIN_PRIORITY
+MAX_PRIORITY = 100
+MIN_PRIORITY = 1
+
+
+class CSRGraph:
+    """
+    Read-only snapshot of a function graph as CSR adjacency arrays: the successors
+    of node i are indices[indptr[i]:indptr[i + 1]]. Node names keep the order the
+    graph reported them in, so ties rank the same way the dict-based path did.
+    """
+    def __init__(self, names, indptr, indices, complexity):
+        self.names = names
+        self.indptr = indptr
+        self.indices = indices
+        self.complexity = complexity  # NaN where no score is known
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_edges(cls, names, sources, targets, complexity=None):
+        """
+        Builds the snapshot from parallel source/target index arrays.
+        """
+        count = len(names)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int32)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=count), out=indptr[1:])
+        if complexity is None:
+            complexity = np.full(count, np.nan)
+        return cls(names, indptr, targets[order], np.asarray(complexity, dtype=np.float64))
+
+    @classmethod
+    def from_networkx(cls, function_graph, complexity_scores=None):
+        """
+        Exports a DiGraph once. Complexity comes from complexity_scores when given,
+        otherwise from the nodes' "complexity" attribute set by add_file_result.
+        """
+        names = list(function_graph.nodes)
+        index = {name: i for i, name in enumerate(names)}
+        if complexity_scores is None:
+            complexity = [data.get("complexity", np.nan) for _, data in function_graph.nodes(data=True)]
+        else:
+            complexity = [complexity_scores.get(name, np.nan) for name in names]
+        edges = np.fromiter((index[node] for edge in function_graph.edges for node in edge),
+                            dtype=np.int64, count=2 * function_graph.number_of_edges()).reshape(-1, 2)
+        return cls.from_edges(names, edges[:, 0], edges[:, 1], complexity)
+
+    @classmethod
+    def from_graph(cls, function_graph, complexity_scores=None):
+        """
+        CSR snapshot of a CompactGraph (what analyze_repository returns), a
+        networkx DiGraph or an existing CSRGraph. complexity_scores, when given,
+        replace the scores stored in the graph.
+        """
+        if isinstance(function_graph, cls):
+            graph = function_graph
+        elif hasattr(function_graph, "to_csr"):
+            graph = function_graph.to_csr()
+        else:
+            return cls.from_networkx(function_graph, complexity_scores)
+        if complexity_scores is not None:
+            complexity = np.array([complexity_scores.get(name, np.nan) for name in graph.names], dtype=np.float64)
+            graph = cls(graph.names, graph.indptr, graph.indices, complexity)
+        return graph
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        return np.bincount(self.indices, minlength=len(self))
+
+    def edge_sources(self):
+        return np.repeat(np.arange(len(self), dtype=np.int32), self.out_degree())
+
+
+def pagerank(graph, damping=0.85, tolerance=1e-6, max_iterations=100):
+    """
+    Power iteration over the CSR arrays. Rank held by nodes without successors is
+    spread evenly over all nodes. Like networkx, iteration stops once the total
+    change drops below tolerance per node. Returns a vector that sums to 1.
+    """
+    count = len(graph)
+    if count == 0:
+        return np.zeros(0)
+    out_degree = graph.out_degree()
+    sources = graph.edge_sources()
+    dangling = out_degree == 0
+    share = np.divide(1.0, out_degree, out=np.zeros(count), where=~dangling)
+    rank = np.full(count, 1.0 / count)
+    for _ in range(max_iterations):
+        flow = np.bincount(graph.indices, weights=(rank * share)[sources], minlength=count)
+        updated = damping * (flow + rank[dangling].sum() / count) + (1.0 - damping) / count
+        converged = np.abs(updated - rank).sum() < count * tolerance
+        rank = updated
+        if converged:
+            break
+    return rank
+
+
+def linear_weights(count):
+    """
+    The scheduler's stepped weights for `count` ranked tasks, highest first:
+    MAX_PRIORITY, then one step lower per task, never below MIN_PRIORITY.
+    """
+    step = int(MAX_PRIORITY / count) if count else 1
+    return np.maximum(MAX_PRIORITY - step * np.arange(count, dtype=np.int64), MIN_PRIORITY)
+
+
+def rank_scores(scores, top_k=None):
+    """
+    Indices of the highest scores, best first; equal scores keep node order. With
+    top_k only that many are selected, using argpartition so the full array is
+    never sorted.
+    """
+    count = len(scores)
+    if top_k is None or top_k >= count:
+        return np.argsort(-scores, kind="stable")
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    selected = np.argpartition(-scores, top_k - 1)[:top_k]
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+class PriorityEngine:
+    """
+    Vectorized replacement for the per-node loops in ExtendedAI. A node's score is
+
+        out_degree_weight * successors + in_degree_weight * callers
+        + complexity_weight * complexity + pagerank_weight * pagerank * nodes
+
+    with complexity defaulting to 1 when unknown. The defaults reproduce the
+    original successors-plus-complexity score. PageRank is scaled by the node
+    count so its mean term is 1, comparable to the other weights.
+    """
+    def __init__(self, out_degree_weight=1.0, in_degree_weight=0.0, complexity_weight=1.0,
+                 pagerank_weight=0.0, damping=0.85, top_k=None):
+        self.out_degree_weight = out_degree_weight
+        self.in_degree_weight = in_degree_weight
+        self.complexity_weight = complexity_weight
+        self.pagerank_weight = pagerank_weight
+        self.damping = damping
+        self.top_k = top_k
+
+    def scores(self, graph):
+        complexity = np.where(np.isnan(graph.complexity), 1.0, graph.complexity)
+        scores = self.complexity_weight * complexity
+        if self.out_degree_weight:
+            scores += self.out_degree_weight * graph.out_degree()
+        if self.in_degree_weight:
+            scores += self.in_degree_weight * graph.in_degree()
+        if self.pagerank_weight:
+            scores += self.pagerank_weight * pagerank(graph, self.damping) * len(graph)
+        return scores
+
+    def rank(self, graph, top_k=None):
+        """
+        Returns (order, weights): node indices best first and the scheduler weight
+        assigned to each.
+        """
+        order = rank_scores(self.scores(graph), self.top_k if top_k is None else top_k)
+        return order, linear_weights(len(order))
+
+    def prioritize(self, graph, top_k=None):
+        """
+        {task: weight} for the ranked tasks, in rank order.
+        """
+        graph = CSRGraph.from_graph(graph)
+        order, weights = self.rank(graph, top_k)
+        names = graph.names
+        return dict(zip([names[i] for i in order.tolist()], weights.tolist()))
@@ -0,0 +1,544 @@
+"""
+Asyncio front end for the scheduler's priority socket. SocketServer.cpp serves
+one connection at a time and runs its tasks before it accepts the next one, so
+producers block or are refused under load. This server accepts any number of
+producers at once, speaking the same frames as PriorityClient (every codec),
+and merges their updates into one bounded priority heap. A forwarder drains the
+heap highest priority first and sends batches on to the scheduler.
+
+Producers send what PriorityClient already sends:
+    plain priority maps (send()/queue()), never answered
+    {"type": "full"/"delta", ...} from DeltaPublisher, answered with ack/resync
+    {"type": "stats"}, answered with queue depth, ingest rate and totals
+Priority maps must have the shape of PrioritySchema.json: task id -> priority,
+or task id -> {"priority", "executionTime", "flags"}, every field an integer
+that fits the records codec. A malformed frame is counted and skipped; an
+invalid protocol message is answered with {"type": "error"}.
+
+When the heap is full, new tasks are handled by the policy (updates to a queued
+task always replace it in place):
+    block        stop reading from the producer until the forwarder makes room,
+                 so backpressure reaches it through TCP
+    drop_lowest  evict the lowest-priority queued task (or the new task if it is
+                 not higher)
+    drop_new     drop the new task
+Every task dropped either way, evicted or new, counts towards tasks_dropped.
+
+Usage: python PriorityIngestServer.py [--port PORT] [--capacity N] [--policy POLICY]
+                                      [--sink scheduler|discard] [--metrics-prom PATH]
+"""
+import argparse
+import asyncio
+import heapq
+import struct
+import time
+from collections import deque
+
+from PipelineMetrics import metrics
+from PrioritySync import PriorityState
+from PriorityTransport import (CODECS, FRAME_HEADER, HOST, MAX_FRAME_SIZE, PORT, FrameError, PriorityClient,
+                               decode_frame, encode_frame)
+
+INGEST_PORT = PORT + 1
+DEFAULT_CAPACITY = 100000
+POLICIES = ("block", "drop_lowest", "drop_new")
+# Field limits of the records codec (PriorityTransport.RECORD_ID_LENGTH / RECORD_FIELDS)
+MAX_TASK_ID_BYTES = 0xFFFF
+INT32_RANGE = (-(1 << 31), (1 << 31) - 1)
+UINT32_RANGE = (0, (1 << 32) - 1)
+RECORD_KEYS = {"priority": INT32_RANGE, "executionTime": INT32_RANGE, "flags": UINT32_RANGE}
+RATE_WINDOW = 10  # Seconds of history behind the ingest rate
+# Seconds to wait before retrying a batch the scheduler did not accept
+FORWARD_RETRY_DELAY = 1.0
+
+
+def check_integer(task_id, key, value, bounds):
+    # bool is an int subclass, but True is not a priority
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{task_id!r}: {key} must be an integer, not {type(value).__name__}")
+    if not bounds[0] <= value <= bounds[1]:
+        raise ValueError(f"{task_id!r}: {key} {value} is outside {bounds[0]}..{bounds[1]}")
+    return value
+
+
+def validate_priorities(priorities):
+    """
+    Checks a priority map against the PrioritySchema.json format and returns it
+    in the normalized {task: {"priority", "executionTime", "flags"}} form.
+    Raises ValueError naming the first offending task.
+    """
+    if not isinstance(priorities, dict):
+        raise ValueError(f"A priority map must be an object, not {type(priorities).__name__}")
+    normalized = {}
+    for task_id, value in priorities.items():
+        if not isinstance(task_id, str) or not task_id:
+            raise ValueError(f"Task ids must be non-empty strings, not {task_id!r}")
+        if len(task_id.encode("utf-8")) > MAX_TASK_ID_BYTES:
+            raise ValueError(f"Task id {task_id[:40]!r}... is longer than {MAX_TASK_ID_BYTES} bytes")
+        if isinstance(value, dict):
+            unknown = set(value) - set(RECORD_KEYS)
+            if unknown:
+                raise ValueError(f"{task_id!r}: unknown fields {', '.join(sorted(map(str, unknown)))}")
+            if "priority" not in value:
+                raise ValueError(f"{task_id!r}: missing priority")
+            normalized[task_id] = {key: check_integer(task_id, key, value.get(key, 0), bounds)
+                                   for key, bounds in RECORD_KEYS.items()}
+        else:
+            normalized[task_id] = {"priority": check_integer(task_id, "priority", value, INT32_RANGE),
+                                   "executionTime": 0, "flags": 0}
+    return normalized
+
+
+def validate_message(message):
+    """
+    Validates a full/delta protocol message in place, normalizing its tasks.
+    """
+    version = message.get("version")
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise ValueError("version must be an integer")
+    if message["type"] == "full":
+        message["tasks"] = validate_priorities(message.get("tasks"))
+        return message
+    base = message.get("base")
+    if not isinstance(base, int) or isinstance(base, bool):
+        raise ValueError("base must be an integer")
+    message["upserts"] = validate_priorities(message.get("upserts", {}))
+    removals = message.get("removals", [])
+    if not isinstance(removals, list) or not all(isinstance(task_id, str) for task_id in removals):
+        raise ValueError("removals must be a list of task ids")
+    message["removals"] = removals
+    return message
+
+
+class RateMeter:
+    """
+    Events per second over the last `window` seconds, kept in one-second buckets.
+    """
+    def __init__(self, window=RATE_WINDOW):
+        self.window = window
+        self.started = time.monotonic()
+        self.buckets = deque()  # [second, count]
+
+    def mark(self, count=1):
+        second = int(time.monotonic())
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += count
+        else:
+            self.buckets.append([second, count])
+        self.expire(second)
+
+    def expire(self, second):
+        while self.buckets and self.buckets[0][0] <= second - self.window:
+            self.buckets.popleft()
+
+    def rate(self):
+        now = time.monotonic()
+        self.expire(int(now))
+        span = min(self.window, now - self.started)
+        return sum(count for _, count in self.buckets) / span if span > 0 else 0.0
+
+
+class BoundedPriorityQueue:
+    """
+    Tasks keyed by id, popped highest priority first (oldest first among equal
+    priorities). A task that is already queued is updated in place. Stale heap
+    entries are skipped lazily and compacted away once they outnumber live ones.
+    Create it inside the running event loop.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, policy="block"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; use one of {', '.join(POLICIES)}")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.policy = policy
+        self.entries = {}  # task_id -> (sequence, record)
+        self.highest = []  # (-priority, sequence, task_id)
+        self.lowest = []  # (priority, -sequence, task_id), kept for drop_lowest only
+        self.sequence = 0
+        self.high_water = 0
+        self.space = asyncio.Event()
+        self.space.set()
+        self.ready = asyncio.Event()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def full(self):
+        return len(self.entries) >= self.capacity
+
+    def offer(self, task_id, record):
+        """
+        Adds or updates a task without waiting. Returns "added", "merged",
+        "evicted" (added in place of a lower-priority task, which was dropped)
+        or "dropped", or None when the queue is full under the block policy.
+        """
+        merged = task_id in self.entries
+        evicted = None
+        if not merged and self.full():
+            if self.policy == "block":
+                self.space.clear()
+                return None
+            if self.policy == "drop_lowest":
+                evicted = self.evict_below(record["priority"])
+            if evicted is None:
+                return "dropped"
+        self.insert(task_id, record)
+        if merged:
+            return "merged"
+        return "added" if evicted is None else "evicted"
+
+    async def put(self, task_id, record):
+        """
+        offer(), waiting for room under the block policy.
+        """
+        while True:
+            outcome = self.offer(task_id, record)
+            if outcome is not None:
+                return outcome
+            await self.space.wait()
+
+    def insert(self, task_id, record):
+        self.sequence += 1
+        self.entries[task_id] = (self.sequence, record)
+        heapq.heappush(self.highest, (-record["priority"], self.sequence, task_id))
+        if self.policy == "drop_lowest":
+            heapq.heappush(self.lowest, (record["priority"], -self.sequence, task_id))
+        self.high_water = max(self.high_water, len(self.entries))
+        self.ready.set()
+        if len(self.highest) > 2 * len(self.entries) + 1024:
+            self.compact()
+
+    def evict_below(self, priority):
+        # Drops the lowest queued task (newest first among equals) if it ranks below
+        # `priority`, returning its id, or None when nothing ranks below
+        while self.lowest:
+            lowest_priority, negative_sequence, task_id = self.lowest[0]
+            entry = self.entries.get(task_id)
+            if entry is None or entry[0] != -negative_sequence:
+                heapq.heappop(self.lowest)
+                continue
+            if lowest_priority >= priority:
+                return None
+            heapq.heappop(self.lowest)
+            del self.entries[task_id]
+            return task_id
+        return None
+
+    def remove(self, task_id):
+        if self.entries.pop(task_id, None) is None:
+            return False
+        self.space.set()
+        return True
+
+    def pop_nowait(self, count=1):
+        """
+        Removes and returns up to `count` (task_id, record) pairs, highest first.
+        """
+        popped = []
+        while self.highest and len(popped) < count:
+            _, sequence, task_id = heapq.heappop(self.highest)
+            entry = self.entries.get(task_id)
+            if entry is not None and entry[0] == sequence:
+                del self.entries[task_id]
+                popped.append((task_id, entry[1]))
+        if not self.entries:
+            self.ready.clear()
+            self.highest.clear()
+            self.lowest.clear()
+        if popped:
+            self.space.set()
+        return popped
+
+    async def pop(self, count=1):
+        """
+        pop_nowait(), waiting until at least one task is queued.
+        """
+        while not self.entries:
+            self.ready.clear()
+            await self.ready.wait()
+        return self.pop_nowait(count)
+
+    def restore(self, items):
+        """
+        Puts popped tasks back after a failed forward, unless a newer update for
+        the task arrived meanwhile. May exceed capacity by at most one batch.
+        """
+        for task_id, record in items:
+            if task_id not in self.entries:
+                self.insert(task_id, record)
+
+    def compact(self):
+        self.highest = [(-record["priority"], sequence, task_id)
+                        for task_id, (sequence, record) in self.entries.items()]
+        heapq.heapify(self.highest)
+        if self.policy == "drop_lowest":
+            self.lowest = [(record["priority"], -sequence, task_id)
+                           for task_id, (sequence, record) in self.entries.items()]
+            heapq.heapify(self.lowest)
+
+
+async def read_frame_async(reader, max_frame=MAX_FRAME_SIZE):
+    """
+    Asyncio counterpart of PriorityTransport.read_frame().
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise FrameError("Connection closed in the middle of a frame")
+        return None
+    length, codec = FRAME_HEADER.unpack(header)
+    if length > max_frame:
+        raise FrameError(f"Frame of {length} bytes exceeds {max_frame}")
+    try:
+        payload = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        raise FrameError("Connection closed in the middle of a frame")
+    return codec, payload
+
+
+class PriorityIngestServer:
+    """
+    Accepts producers on host:port and merges their tasks into `queue`. Each
+    connection keeps its own PriorityState, so DeltaPublisher clients get the
+    same ack/resync replies as from SocketServer; only the tasks a message
+    changes are queued, and removals take queued tasks back out.
+    """
+    def __init__(self, host=HOST, port=INGEST_PORT, capacity=DEFAULT_CAPACITY, policy="block",
+                 max_frame=MAX_FRAME_SIZE, recorder=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; use one of {', '.join(POLICIES)}")
+        self.host = host
+        self.port = port  # 0 picks a free port; the bound port is stored here by start()
+        self.capacity = capacity
+        self.policy = policy
+        self.max_frame = max_frame
+        self.metrics = recorder or metrics
+        self.queue = None
+        self.server = None
+        self.connections = set()
+        self.totals = dict.fromkeys(("connections", "frames", "bytes", "frames_rejected", "tasks_received",
+                                     "tasks_added", "tasks_merged", "tasks_dropped", "tasks_removed",
+                                     "tasks_forwarded"), 0)
+        self.blocked_seconds = 0.0
+        self.rate = RateMeter()
+        self.started = time.time()
+
+    async def start(self):
+        self.queue = BoundedPriorityQueue(self.capacity, self.policy)
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Priority ingest listening on {self.host}:{self.port} "
+              f"(capacity {self.capacity}, policy {self.policy})")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.connections):
+                writer.close()
+            await self.server.wait_closed()
+        self.update_gauges()
+
+    def tally(self, name, value=1):
+        if value:
+            self.totals[name] += value
+            self.metrics.count(f"ingest_{name}", value)
+
+    async def handle(self, reader, writer):
+        self.connections.add(writer)
+        self.tally("connections")
+        peer = writer.get_extra_info("peername")
+        state = PriorityState()
+        try:
+            while True:
+                frame = await read_frame_async(reader, self.max_frame)
+                if frame is None:
+                    return
+                self.tally("frames")
+                self.tally("bytes", FRAME_HEADER.size + len(frame[1]))
+                reply = await self.process(frame, state)
+                if reply is not None:
+                    writer.write(encode_frame(reply))
+                    await writer.drain()
+        except FrameError as e:
+            print(f"[INGEST ERROR] {peer}: {e}")
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+    async def process(self, frame, state):
+        """
+        Decodes, validates and queues one frame. Returns the reply to send, if any.
+        """
+        codec, payload = frame
+        kind = None
+        with self.metrics.stage("ingest", size=len(payload)) as timer:
+            try:
+                message = decode_frame(codec, payload)
+                if not isinstance(message, dict):
+                    raise ValueError(f"Expected an object, got {type(message).__name__}")
+                kind = message.get("type")
+                if kind == "stats":
+                    return {"type": "stats", **self.stats()}
+                if kind in ("full", "delta"):
+                    reply, upserts, removals = state.apply(validate_message(message))
+                else:
+                    reply, upserts, removals = None, validate_priorities(message), []
+            except (FrameError, ValueError, struct.error) as e:
+                # Frames are length-prefixed, so the connection stays usable after a bad one
+                self.tally("frames_rejected")
+                print(f"[INGEST ERROR] Rejected frame: {e}")
+                # Only protocol messages are read back by PriorityClient.request(); answering
+                # a plain map would leave a stray reply on the pooled connection
+                return {"type": "error", "error": str(e)} if kind in ("full", "delta") else None
+            timer.items = len(upserts)
+        await self.enqueue(upserts, removals)
+        return reply
+
+    async def enqueue(self, upserts, removals):
+        queue = self.queue
+        self.tally("tasks_received", len(upserts))
+        self.rate.mark(len(upserts))
+        removed = sum(queue.remove(task_id) for task_id in removals)
+        self.tally("tasks_removed", removed)
+        outcomes = {"added": 0, "merged": 0, "dropped": 0}
+        for task_id, record in upserts.items():
+            outcome = queue.offer(task_id, record)
+            if outcome is None:
+                # Full under the block policy: stop reading this producer until there is room
+                blocked = time.perf_counter()
+                outcome = await queue.put(task_id, record)
+                self.blocked_seconds += time.perf_counter() - blocked
+            if outcome == "evicted":
+                # The new task went in; the lower-priority task it replaced counts as dropped
+                outcomes["added"] += 1
+                outcome = "dropped"
+            outcomes[outcome] += 1
+        for outcome, count in outcomes.items():
+            self.tally(f"tasks_{outcome}", count)
+
+    async def forward(self, client, batch_size=1024, linger=0.005):
+        """
+        Sends queued tasks to the scheduler through `client` (a PriorityClient),
+        up to batch_size of the highest-priority tasks per frame. Waits `linger`
+        seconds after the first task so small updates share a frame. A batch
+        the scheduler does not accept is put back and retried.
+        """
+        while True:
+            await self.queue.ready.wait()
+            if linger and len(self.queue) < batch_size:
+                await asyncio.sleep(linger)
+            batch = self.queue.pop_nowait(batch_size)
+            if not batch:
+                continue
+            try:
+                with self.metrics.stage("forward", items=len(batch)):
+                    await asyncio.to_thread(client.send, dict(batch))
+            except ConnectionError as e:
+                print(f"[FORWARD ERROR] {e}")
+                self.queue.restore(batch)
+                await asyncio.sleep(FORWARD_RETRY_DELAY)
+                continue
+            self.tally("tasks_forwarded", len(batch))
+
+    async def discard(self, batch_size=1024):
+        """
+        Drains the queue without forwarding, for load tests without a scheduler.
+        """
+        while True:
+            batch = await self.queue.pop(batch_size)
+            self.tally("tasks_forwarded", len(batch))
+            await asyncio.sleep(0)
+
+    def stats(self):
+        depth = len(self.queue) if self.queue is not None else 0
+        return {
+            "uptime": time.time() - self.started,
+            "depth": depth,
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "high_water": self.queue.high_water if self.queue is not None else 0,
+            "producers": len(self.connections),
+            "ingest_rate": self.rate.rate(),
+            "blocked_seconds": self.blocked_seconds,
+            **self.totals,
+        }
+
+    def update_gauges(self):
+        stats = self.stats()
+        self.metrics.gauge("ingest_queue_depth", stats["depth"])
+        self.metrics.gauge("ingest_queue_high_water", stats["high_water"])
+        self.metrics.gauge("ingest_producers", stats["producers"])
+        self.metrics.gauge("ingest_tasks_per_second", stats["ingest_rate"])
+        self.metrics.gauge("ingest_blocked_seconds", stats["blocked_seconds"])
+        return stats
+
+
+async def report_loop(server, interval, metrics_jsonl=None, metrics_prom=None):
+    while True:
+        await asyncio.sleep(interval)
+        stats = server.update_gauges()
+        print(f"depth {stats['depth']}/{stats['capacity']}  {stats['ingest_rate']:.0f} tasks/s  "
+              f"producers {stats['producers']}  dropped {stats['tasks_dropped']}  "
+              f"blocked {stats['blocked_seconds']:.1f}s  forwarded {stats['tasks_forwarded']}")
+        if metrics_jsonl:
+            server.metrics.export_jsonl(metrics_jsonl)
+        if metrics_prom:
+            server.metrics.write_prometheus(metrics_prom)
+
+
+async def serve(host=HOST, port=INGEST_PORT, capacity=DEFAULT_CAPACITY, policy="block", sink="scheduler",
+                scheduler_host=HOST, scheduler_port=PORT, codec="json", batch_size=1024, report_interval=5.0,
+                metrics_jsonl=None, metrics_prom=None):
+    server = PriorityIngestServer(host, port, capacity, policy)
+    await server.start()
+    client = None
+    if sink == "scheduler":
+        client = PriorityClient(scheduler_host, scheduler_port, codec=codec, batch_size=batch_size)
+        drain = server.forward(client, batch_size)
+    else:
+        drain = server.discard(batch_size)
+    tasks = [asyncio.create_task(drain),
+             asyncio.create_task(report_loop(server, report_interval, metrics_jsonl, metrics_prom))]
+    try:
+        await server.server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.stop()
+        if client is not None:
+            client.close()
+        print(server.metrics.summary())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accept priority updates from many producers and feed the scheduler.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=INGEST_PORT)
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Most tasks held in the queue")
+    parser.add_argument("--policy", choices=POLICIES, default="block", help="What to do with new tasks when full")
+    parser.add_argument("--sink", choices=("scheduler", "discard"), default="scheduler",
+                        help="Forward to the scheduler socket, or drop drained tasks (load tests)")
+    parser.add_argument("--scheduler-host", default=HOST)
+    parser.add_argument("--scheduler-port", type=int, default=PORT)
+    parser.add_argument("--codec", choices=sorted(CODECS), default="json", help="Codec used towards the scheduler")
+    parser.add_argument("--batch-size", type=int, default=1024, help="Most tasks forwarded per frame")
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--metrics-jsonl", metavar="PATH", help="Append a metrics snapshot every report interval")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="Keep PATH updated with queue depth, ingest rate and stage metrics in Prometheus format")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.capacity, args.policy, args.sink, args.scheduler_host,
+                          args.scheduler_port, args.codec, args.batch_size, args.report_interval,
+                          args.metrics_jsonl, args.metrics_prom))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
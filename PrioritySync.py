@@ -0,0 +1,94 @@
+from PriorityTransport import normalize_priorities
+
+# Protocol messages, all sent with PriorityClient.request():
+#   {"type": "full", "version": v, "tasks": {task: record}}
+#   {"type": "delta", "version": v, "base": v - 1, "upserts": {task: record}, "removals": [task]}
+# The receiver answers {"type": "ack", "version": v}, or {"type": "resync", "version": current}
+# when a delta's base does not match the version it holds.
+
+
+def diff_priorities(previous, current):
+    """
+    Returns (upserts, removals) that turn the previous task map into the current one.
+    """
+    upserts = {task_id: task for task_id, task in current.items() if previous.get(task_id) != task}
+    removals = [task_id for task_id in previous if task_id not in current]
+    return upserts, removals
+
+
+class DeltaPublisher:
+    """
+    Sends priority maps as versioned deltas against the last snapshot the receiver
+    acknowledged. Unchanged maps send nothing; a receiver that reports a gap is
+    brought back in line with a full snapshot.
+    """
+    def __init__(self, client):
+        self.client = client
+        self.version = 0
+        self.acked = None  # Last acknowledged task map; None until the first full send
+        self.full_sends = 0
+        self.delta_sends = 0
+
+    def publish(self, priorities):
+        tasks = normalize_priorities(priorities)
+        if self.acked is None:
+            reply = self.send_full(tasks)
+        else:
+            upserts, removals = diff_priorities(self.acked, tasks)
+            if not upserts and not removals:
+                return
+            reply = self.client.request({
+                "type": "delta", "version": self.version + 1, "base": self.version,
+                "upserts": upserts, "removals": removals,
+            })
+            self.delta_sends += 1
+            if reply.get("type") == "resync":
+                print(f"Receiver is at version {reply.get('version')}, expected {self.version}; resending full snapshot")
+                reply = self.send_full(tasks)
+
+        if reply.get("type") != "ack":
+            self.acked = None  # Unknown receiver state; the next publish starts over
+            raise ConnectionError(f"Unexpected reply from priority receiver: {reply}")
+        self.version = reply["version"]
+        self.acked = tasks
+
+    def send_full(self, tasks):
+        self.full_sends += 1
+        return self.client.request({"type": "full", "version": self.version + 1, "tasks": tasks})
+
+    def reset(self):
+        """
+        Forgets the acknowledged snapshot so the next publish is a full resync.
+        """
+        self.acked = None
+
+
+class PriorityState:
+    """
+    Receiver side of the protocol: the current task map and its version.
+    apply() returns (reply, upserts, removals) so callers only touch changed tasks.
+    """
+    def __init__(self):
+        self.version = 0
+        self.tasks = {}
+
+    def apply(self, message):
+        kind = message.get("type")
+        if kind == "full":
+            upserts, removals = diff_priorities(self.tasks, message["tasks"])
+            self.tasks = dict(message["tasks"])
+        elif kind == "delta":
+            if message["base"] != self.version:
+                return {"type": "resync", "version": self.version}, {}, []
+            upserts, removals = message["upserts"], message["removals"]
+            self.tasks.update(upserts)
+            for task_id in removals:
+                self.tasks.pop(task_id, None)
+        else:
+            # Legacy plain priority map: treat it as an unversioned set of upserts
+            upserts = normalize_priorities(message)
+            self.tasks.update(upserts)
+            return None, upserts, []
+
+        self.version = message["version"]
+        return {"type": "ack", "version": self.version}, upserts, removals
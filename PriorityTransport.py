@@ -0,0 +1,289 @@
+import json
+import select
+import socket
+import struct
+import threading
+import time
+from queue import Empty, LifoQueue
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for the msgpack codec
+    msgpack = None
+
+# Socket settings shared with SocketServer.cpp
+HOST = '127.0.0.1'
+PORT = 65432
+
+# Every frame starts with the payload length and a codec id, both big-endian
+FRAME_HEADER = struct.Struct(">IB")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+CODEC_RECORDS = 2
+CODECS = {"json": CODEC_JSON, "msgpack": CODEC_MSGPACK, "records": CODEC_RECORDS}
+
+# CODEC_RECORDS payload: record count, then per record the id length, the
+# UTF-8 id and the fixed-size priority, executionTime and flags fields
+RECORD_COUNT = struct.Struct(">I")
+RECORD_ID_LENGTH = struct.Struct(">H")
+RECORD_FIELDS = struct.Struct(">iiI")
+
+
+class FrameError(Exception):
+    pass
+
+
+def normalize_priorities(priorities):
+    """
+    Accepts either {task: priority} as produced by ExtendedAI or the scheduler's
+    {task: {"priority": p, "executionTime": t}} form and returns the latter.
+    """
+    normalized = {}
+    for task_id, value in priorities.items():
+        if isinstance(value, dict):
+            normalized[task_id] = {
+                "priority": int(value.get("priority", 0)),
+                "executionTime": int(value.get("executionTime", 0)),
+                "flags": int(value.get("flags", 0)),
+            }
+        else:
+            normalized[task_id] = {"priority": int(value), "executionTime": 0, "flags": 0}
+    return normalized
+
+
+def encode_records(priorities):
+    parts = [RECORD_COUNT.pack(len(priorities))]
+    for task_id, task in priorities.items():
+        encoded_id = task_id.encode("utf-8")
+        parts.append(RECORD_ID_LENGTH.pack(len(encoded_id)))
+        parts.append(encoded_id)
+        parts.append(RECORD_FIELDS.pack(task["priority"], task["executionTime"], task.get("flags", 0)))
+    return b"".join(parts)
+
+
+def decode_records(payload):
+    (count,), offset = RECORD_COUNT.unpack_from(payload), RECORD_COUNT.size
+    priorities = {}
+    for _ in range(count):
+        (id_length,) = RECORD_ID_LENGTH.unpack_from(payload, offset)
+        offset += RECORD_ID_LENGTH.size
+        task_id = payload[offset:offset + id_length].decode("utf-8")
+        offset += id_length
+        priority, execution_time, flags = RECORD_FIELDS.unpack_from(payload, offset)
+        offset += RECORD_FIELDS.size
+        priorities[task_id] = {"priority": priority, "executionTime": execution_time, "flags": flags}
+    return priorities
+
+
+def encode_frame(message, codec=CODEC_JSON):
+    """
+    Serializes one message into a length-prefixed frame. CODEC_RECORDS only
+    carries priority maps; JSON and msgpack carry any message.
+    """
+    if codec == CODEC_JSON:
+        payload = json.dumps(message, separators=(",", ":")).encode()
+    elif codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise FrameError("msgpack codec requested but the msgpack package is not installed")
+        payload = msgpack.packb(message)
+    elif codec == CODEC_RECORDS:
+        payload = encode_records(message)
+    else:
+        raise FrameError(f"Unknown codec {codec}")
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    return FRAME_HEADER.pack(len(payload), codec) + payload
+
+
+def decode_frame(codec, payload):
+    if codec == CODEC_JSON:
+        return json.loads(payload)
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise FrameError("Received a msgpack frame but the msgpack package is not installed")
+        return msgpack.unpackb(payload)
+    if codec == CODEC_RECORDS:
+        return decode_records(payload)
+    raise FrameError(f"Unknown codec {codec}")
+
+
+def recv_exactly(sock, size):
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            if buffer:
+                raise FrameError("Connection closed in the middle of a frame")
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def read_frame(sock):
+    """
+    Reads one frame and returns (codec, payload), or None once the peer closes
+    the connection cleanly between frames.
+    """
+    header = recv_exactly(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    length, codec = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+    payload = recv_exactly(sock, length) if length else b""
+    if payload is None:
+        raise FrameError("Connection closed in the middle of a frame")
+    return codec, payload
+
+
+def is_closed_by_peer(sock):
+    """
+    True when an idle pooled connection has been closed from the other side, so it
+    is replaced before a frame is lost writing into it.
+    """
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b""
+    except OSError:
+        return True
+
+
+class PriorityClient:
+    """
+    Long-lived client for the scheduler's priority socket. Connections are kept in
+    a small pool and reused across updates; a broken connection is dropped and
+    re-established with exponential backoff. Updates can be sent immediately with
+    send() or accumulated with queue() and shipped together in one frame.
+    """
+    def __init__(self, host=HOST, port=PORT, codec="json", pool_size=1, batch_size=1024,
+                 connect_timeout=5.0, reply_timeout=10.0, retries=5, backoff=0.05, max_backoff=2.0):
+        self.host = host
+        self.port = port
+        self.codec = CODECS[codec]
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.connect_timeout = connect_timeout
+        self.reply_timeout = reply_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle = LifoQueue()
+        self.slots = threading.BoundedSemaphore(pool_size)
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    def connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(None)
+        return sock
+
+    def acquire(self):
+        self.slots.acquire()
+        while True:
+            try:
+                sock = self.idle.get_nowait()
+            except Empty:
+                break
+            if not is_closed_by_peer(sock):
+                return sock
+            sock.close()
+        try:
+            return self.connect()
+        except OSError:
+            self.slots.release()
+            raise
+
+    def release(self, sock, broken=False):
+        if broken:
+            sock.close()
+        else:
+            self.idle.put(sock)
+        self.slots.release()
+
+    def send_frame(self, frame, expect_reply=False):
+        """
+        Writes one frame, retrying on a fresh connection if the write fails. With
+        expect_reply the receiver's reply frame is read from the same connection
+        and returned decoded.
+        """
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                sock = self.acquire()
+            except OSError as e:
+                error = e
+            else:
+                try:
+                    sock.sendall(frame)
+                    reply = None
+                    if expect_reply:
+                        sock.settimeout(self.reply_timeout)
+                        reply = read_frame(sock)
+                        sock.settimeout(None)
+                        if reply is None:
+                            raise FrameError("Connection closed before the receiver replied")
+                        reply = decode_frame(*reply)
+                except (OSError, FrameError, ValueError) as e:
+                    self.release(sock, broken=True)
+                    error = e
+                else:
+                    self.release(sock)
+                    self.frames_sent += 1
+                    self.bytes_sent += len(frame)
+                    return reply
+            if attempt < self.retries:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+        raise ConnectionError(f"Could not deliver priorities to {self.host}:{self.port}: {error}")
+
+    def request(self, message):
+        """
+        Sends one protocol message (not a priority map) and returns the reply.
+        """
+        codec = CODEC_JSON if self.codec == CODEC_RECORDS else self.codec
+        return self.send_frame(encode_frame(message, codec), expect_reply=True)
+
+    def send(self, priorities):
+        """
+        Sends one priority map (plus anything queued) as a single frame.
+        """
+        self.queue(priorities, flush=False)
+        self.flush()
+
+    def queue(self, priorities, flush=True):
+        """
+        Adds updates to the pending batch; later values for a task replace earlier
+        ones. The batch is flushed automatically once it reaches batch_size.
+        """
+        with self.pending_lock:
+            self.pending.update(normalize_priorities(priorities))
+            full = len(self.pending) >= self.batch_size
+        if flush and full:
+            self.flush()
+
+    def flush(self):
+        with self.pending_lock:
+            batch, self.pending = self.pending, {}
+        if not batch:
+            return
+        try:
+            self.send_frame(encode_frame(batch, self.codec))
+        except ConnectionError:
+            # Keep undelivered updates for the next flush; newer values still win
+            with self.pending_lock:
+                batch.update(self.pending)
+                self.pending = batch
+            raise
+
+    def close(self):
+        self.flush()
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except Empty:
+                break
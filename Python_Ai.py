@@ -1,5 +1,12 @@
-import json
-import socket
+import sys
+
+from AnalysisWorker import handle_request, serve_pipe
+from PrioritySync import DeltaPublisher
+from PriorityTransport import PriorityClient
+
+# Shared by every call so repeated updates reuse one connection and only send changes
+priority_client = PriorityClient('127.0.0.1', 65432)
+priority_publisher = DeltaPublisher(priority_client)
 
 # AI-related functions (from previous Python code)
 def analyze_repository():
@@ -9,17 +16,21 @@ def analyze_repository():
     return priorities
 
 def send_task_priority(priorities):
-    host = '127.0.0.1'
-    port = 65432
-
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.connect((host, port))
-        data = json.dumps(priorities)
-        s.sendall(data.encode())
+    priority_publisher.publish(priorities)
 
 def analyze_and_send():
     priorities = analyze_repository()
     send_task_priority(priorities)
 
+# Run modes:
+#   python Python_Ai.py                    send the sample priorities once
+#   python Python_Ai.py --worker           persistent worker answering JSON lines on stdin/stdout
+#   python Python_Ai.py --request '<json>' answer one request and exit (a cold call)
+# Embedding hosts import this module once and call handle_request(json) instead.
 if __name__ == "__main__":
-    analyze_and_send()
+    if "--worker" in sys.argv:
+        serve_pipe()
+    elif "--request" in sys.argv:
+        print(handle_request(sys.argv[sys.argv.index("--request") + 1]))
+    else:
+        analyze_and_send()
@@ -0,0 +1,97 @@
+import numpy as np
+import tensorflow as tf
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity experience replay stored in preallocated NumPy ring arrays.
+    Once full, the oldest transitions are overwritten.
+    """
+    def __init__(self, capacity, state_size, seed=None):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state):
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states):
+        """
+        Adds one transition per row, e.g. a step of a vectorized environment.
+        """
+        count = len(actions)
+        rows = (self.position + np.arange(count)) % self.capacity
+        self.states[rows] = states
+        self.actions[rows] = actions
+        self.rewards[rows] = rewards
+        self.next_states[rows] = next_states
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample(self, batch_size):
+        rows = self.rng.integers(0, self.size, batch_size)
+        return self.states[rows], self.actions[rows], self.rewards[rows], self.next_states[rows]
+
+
+class DQNTrainer:
+    """
+    Minibatch Q-learning for a Keras Q-network. Targets come from a separate
+    target network that is synced every target_update_interval updates, so a
+    whole batch of next-state Q-values is computed in one call. The update and
+    the greedy action selection are compiled with tf.function.
+    """
+    def __init__(self, model, target_model, optimizer, loss_fn, state_size, gamma=0.99,
+                 target_update_interval=250):
+        self.model = model
+        self.target_model = target_model
+        self.optimizer = optimizer
+        self.loss_fn = loss_fn
+        self.gamma = gamma
+        self.target_update_interval = target_update_interval
+        self.updates = 0
+
+        # Build both networks so their weights exist before the first sync
+        dummy = tf.zeros((1, state_size), dtype=tf.float32)
+        model(dummy)
+        target_model(dummy)
+        self.sync_target()
+
+    def sync_target(self):
+        self.target_model.set_weights(self.model.get_weights())
+
+    @tf.function
+    def train_step(self, states, actions, rewards, next_states):
+        next_q_values = self.target_model(next_states, training=False)
+        targets = rewards + self.gamma * tf.reduce_max(next_q_values, axis=1)
+        with tf.GradientTape() as tape:
+            q_values = self.model(states, training=True)
+            q_value = tf.gather(q_values, actions, axis=1, batch_dims=1)
+            loss = self.loss_fn(targets, q_value)
+        grads = tape.gradient(loss, self.model.trainable_variables)
+        self.optimizer.apply_gradients(zip(grads, self.model.trainable_variables))
+        return loss
+
+    @tf.function
+    def greedy_actions(self, states):
+        return tf.argmax(self.model(states, training=False), axis=1, output_type=tf.int32)
+
+    def update(self, batch):
+        loss = self.train_step(*(tf.convert_to_tensor(array) for array in batch))
+        self.updates += 1
+        if self.updates % self.target_update_interval == 0:
+            self.sync_target()
+        return loss
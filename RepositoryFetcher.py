@@ -0,0 +1,136 @@
+"""
+Repository acquisition for the analyzer. New checkouts are shallow (only the
+latest commit), partial (blobs are fetched on demand, so files outside the
+checkout are never downloaded by servers that allow filters) and sparse (only
+files with the extensions the analyzer scans are written to the working tree).
+Existing checkouts are updated with a fetch and a hard reset to the upstream
+branch instead of a pull, and the paths that changed between the two commits
+are reported. The checkouts belong to the analyzer: local edits are discarded.
+
+Local paths and bare repositories work as remotes; they are cloned through a
+file:// URL so depth and filters apply as they would over the network.
+acquire_all() fetches many repositories at once on a bounded thread pool.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from FileAnalysis import SOURCE_EXTENSIONS
+
+
+class FetchResult:
+    __slots__ = ("url", "path", "cloned", "previous_head", "head", "changed", "deleted", "error", "seconds")
+
+    def __init__(self, url, path):
+        self.url = url
+        self.path = path
+        self.cloned = False
+        self.previous_head = None
+        self.head = None
+        self.changed = []  # Paths with a scanned extension added or modified since previous_head
+        self.deleted = []
+        self.error = None
+        self.seconds = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def updated(self):
+        return self.ok and self.head != self.previous_head
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RepositoryFetcher:
+    """
+    depth=None makes full clones; filter=None disables partial clone;
+    sparse=False checks out every file. workers bounds acquire_all().
+    """
+    def __init__(self, extensions=SOURCE_EXTENSIONS, depth=1, filter="blob:none", sparse=True, workers=4):
+        self.extensions = tuple(extensions)
+        self.depth = depth
+        self.filter = filter
+        self.sparse = sparse
+        self.workers = workers
+
+    def remote_url(self, repo_url):
+        if os.path.isdir(repo_url):
+            # Local clones ignore --depth and --filter unless they go through file://
+            return "file://" + os.path.abspath(repo_url).replace(os.sep, "/")
+        return repo_url
+
+    def sparse_patterns(self):
+        return [f"*{extension}" for extension in self.extensions]
+
+    def acquire(self, repo_url, repo_path):
+        """
+        Clones repo_url into repo_path, or brings an existing checkout up to
+        date. Never raises for git failures; they are reported in result.error.
+        """
+        import git
+        result = FetchResult(repo_url, repo_path)
+        start = time.perf_counter()
+        try:
+            if not os.path.exists(repo_path):
+                print(f"Cloning {repo_url}...")
+                self.clone(repo_url, repo_path, result)
+            else:
+                print(f"Fetching updates for {repo_url}...")
+                self.update(repo_path, result)
+        except (git.GitCommandError, git.InvalidGitRepositoryError, git.NoSuchPathError, ValueError) as e:
+            print(f"[GIT ERROR] {repo_url}: {e}")
+            result.error = str(e)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def clone(self, repo_url, repo_path, result):
+        import git
+        options = ["--no-checkout", "--single-branch"]
+        if self.depth:
+            options.append(f"--depth={self.depth}")
+        if self.filter:
+            options.append(f"--filter={self.filter}")
+        git.Git().clone(*options, "--", self.remote_url(repo_url), repo_path)
+        repo = git.Repo(repo_path)
+        if self.sparse:
+            repo.git.sparse_checkout("set", "--no-cone", *self.sparse_patterns())
+        repo.git.checkout()  # Populates the (sparse) working tree from HEAD
+        result.cloned = True
+        result.head = repo.head.commit.hexsha
+        result.changed = [path for path in repo.git.ls_files("-z").split("\0") if path.endswith(self.extensions)]
+
+    def update(self, repo_path, result):
+        import git
+        repo = git.Repo(repo_path)
+        result.previous_head = repo.head.commit.hexsha
+        options = [f"--depth={self.depth}"] if self.depth else []
+        repo.git.fetch(*options, "origin")
+        target = repo.git.rev_parse("@{upstream}")
+        if target != result.previous_head:
+            result.changed, result.deleted = self.changed_paths(repo, result.previous_head, target)
+            repo.git.reset("--hard", target)
+        result.head = target
+
+    def changed_paths(self, repo, old_head, new_head):
+        # Only trees are compared, so no blobs are fetched for this
+        output = repo.git.diff("--name-status", "--no-renames", "-z", old_head, new_head)
+        fields = output.split("\0")
+        changed, deleted = [], []
+        for status, path in zip(fields[0::2], fields[1::2]):
+            if path.endswith(self.extensions):
+                (deleted if status == "D" else changed).append(path)
+        return changed, deleted
+
+    def acquire_all(self, repositories):
+        """
+        Acquires (repo_url, repo_path) pairs concurrently, at most `workers` at
+        a time. Returns the results in the order given.
+        """
+        repositories = list(repositories)
+        if self.workers <= 1 or len(repositories) <= 1:
+            return [self.acquire(url, path) for url, path in repositories]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch") as pool:
+            return list(pool.map(lambda item: self.acquire(*item), repositories))
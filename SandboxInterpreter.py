@@ -0,0 +1,472 @@
+import asyncio
+import hashlib
+import threading
+from collections import ChainMap, OrderedDict
+from contextlib import contextmanager, nullcontext
+
+from CompileJobs import COMPILER_COMMAND, CompileJobPool
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; compile memory limits are skipped there
+    resource = None
+
+# Opcodes; each compiled instruction is (opcode, args), run via Interpreter.dispatch[opcode]
+OP_PRINT = 0
+OP_SET = 1
+OP_FUNCTION = 2
+OP_IF = 3
+OP_TRY = 4
+OP_ASYNC = 5
+OP_AWAIT = 6
+OP_COMPILE = 7
+OP_CALL = 8
+
+KEYWORDS = {
+    "print": OP_PRINT,
+    "set": OP_SET,
+    "function": OP_FUNCTION,
+    "if": OP_IF,
+    "try": OP_TRY,
+    "async": OP_ASYNC,
+    "await": OP_AWAIT,
+    "compile": OP_COMPILE,
+}
+# Tokens the sandbox refuses to compile
+BLOCKED_TOKENS = ("read_file", "write_file", "dangerous_op")
+FALSE_VALUES = ("", "0", "false", "False", "None")
+MISSING = object()
+# Instructions a script runs before yielding to other scripts on the event loop
+YIELD_EVERY = 64
+
+
+# Further sandboxed execution system with logic to prevent dangerous operations
+class SandboxedExecutionError(Exception):
+    pass
+
+
+class ScriptLimitError(Exception):
+    pass
+
+
+class CompileError(Exception):
+    pass
+
+
+class ScriptContext:
+    """
+    Bookkeeping for one script run on the event loop: its own variables, state
+    and functions (see Interpreter.scope), the tasks it started with `async`,
+    the compile processes it owns, and how much of its memory budget the values
+    its variables currently hold use.
+    """
+    def __init__(self, script_id=None, memory_limit=None, compile_slots=None, compile_memory_limit=None):
+        self.script_id = script_id
+        self.memory_limit = memory_limit  # Bytes of live script values (len(str(value)) each)
+        self.compile_memory_limit = compile_memory_limit  # Address space (RLIMIT_AS) of each compile process
+        self.memory_used = 0
+        self.sizes = {}  # variable -> bytes charged for its current value
+        self.scope = None  # (variables, state, functions), layered over the interpreter's on first use
+        self.compile_slots = compile_slots  # asyncio.Semaphore shared by scripts to bound compiles, if any
+        self.pending = []  # (name, asyncio.Task) started with async and not yet awaited
+        self.processes = set()  # Running compiler processes (subprocess.Popen)
+        self.compile_results = []  # CompileResult of every compile, with its queue/startup/run timings
+        self.status = "pending"
+        self.error = None
+
+    def account(self, name, value):
+        """
+        Charges the value `name` now holds; the value it replaces is released.
+        """
+        size = len(str(value))
+        used = self.memory_used - self.sizes.get(name, 0) + size
+        if self.memory_limit is not None and used > self.memory_limit:
+            raise ScriptLimitError(f"Script exceeded its memory limit of {self.memory_limit} bytes")
+        self.sizes[name] = size
+        self.memory_used = used
+
+    async def cleanup(self):
+        """
+        Cancels unawaited tasks and kills compile processes left behind by a
+        script that failed, timed out or was cancelled.
+        """
+        for _, task in self.pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in self.pending), return_exceptions=True)
+        self.pending = []
+        for process in list(self.processes):
+            if process.poll() is None:
+                process.kill()
+                await asyncio.to_thread(process.wait)
+        self.processes.clear()
+
+
+class Interpreter:
+    """
+    Line-oriented sandboxed scripting language. Each line (or ';'-separated
+    statement) is a keyword or function name followed by whitespace-separated
+    arguments:
+
+        set name value            function name p1,p2 body...
+        print tokens...           name args...        (call a defined function)
+        if cond statement...      try statement...
+        async name args...        await
+        compile file
+
+    Tokens that name a variable evaluate to its value. Source is compiled once
+    into a list of (opcode, args) instructions and cached by source hash;
+    execution walks the list through a dispatch table indexed by opcode.
+    Function results are memoized on (function, argument values) in an LRU cache.
+    """
+    def __init__(self, program_cache_size=256, memo_size=1024):
+        self.variables = {}
+        self.functions = {}
+        self.events = {}
+        self.error_handler = self.default_error_handler
+        self.on_sandbox_error = None  # Called with the error when the sandbox blocks a script
+        self.execution_stack = []
+        self.event_listeners = {}
+        self.sandboxed = True
+        self.state = {}
+        self.pending = []  # Calls started with async and not yet awaited
+        self.context = None  # ScriptContext of the script running on the event loop, if any
+        self.compiler_command = list(COMPILER_COMMAND)
+        self.compile_jobs = None  # CompileJobPool for compiler_command, made on first compile
+        self.compile_workers = 4  # Compiler processes the pool runs at once
+        self.on_compile_output = None  # Called with (stream, line) as the compiler writes output
+        self.programs = OrderedDict()  # source hash -> compiled instructions
+        self.program_cache_size = program_cache_size
+        self.cache = OrderedDict()  # (function, definition, args) -> result
+        self.memo_size = memo_size
+        self.definition_ids = {}  # (params, body) -> id used in memoization keys
+        self.dispatch = [
+            self.execute_print, self.execute_set, self.execute_function, self.execute_if,
+            self.execute_try, self.execute_async, self.execute_await, self.execute_compile_op,
+            self.execute_call,
+        ]
+
+    def default_error_handler(self, error_message):
+        print(f"Runtime Error: {error_message}")
+
+    def parse(self, code):
+        """
+        Splits source into statements, each a list of tokens.
+        """
+        statements = []
+        for line in code.splitlines():
+            for statement in line.split(";"):
+                tokens = statement.split()
+                if tokens:
+                    statements.append(tokens)
+        return statements
+
+    def compile_statement(self, tokens):
+        if self.sandboxed:
+            for token in tokens:
+                if any(blocked in token for blocked in BLOCKED_TOKENS):
+                    raise SandboxedExecutionError(f"Operation blocked by sandbox: {token}")
+        opcode = KEYWORDS.get(tokens[0], OP_CALL)
+        if opcode == OP_CALL:
+            return OP_CALL, (tokens[0], tuple(tokens[1:]))
+        args = tokens[1:]
+        if opcode in (OP_IF, OP_TRY):
+            # Conditions and guarded statements carry their nested instruction
+            if opcode == OP_IF:
+                if len(args) < 2:
+                    raise SyntaxError("if needs a condition and a statement")
+                return OP_IF, (args[0], self.compile_statement(args[1:]))
+            if not args:
+                raise SyntaxError("try needs a statement")
+            return OP_TRY, (self.compile_statement(args),)
+        if opcode == OP_FUNCTION:
+            if len(args) < 2:
+                raise SyntaxError("function needs a name and a parameter list")
+            params = tuple(param for param in args[1].split(",") if param)
+            body = tuple(args[2:])
+            # Identical definitions share an id, so re-running a script keeps its memoized results
+            definition = self.definition_ids.setdefault((params, body), len(self.definition_ids))
+            return OP_FUNCTION, (args[0], params, body, definition)
+        if opcode == OP_SET:
+            if len(args) < 2:
+                raise SyntaxError("set needs a name and a value")
+            return OP_SET, (args[0], " ".join(args[1:]))
+        if opcode == OP_ASYNC and not args:
+            raise SyntaxError("async needs a function call")
+        return opcode, tuple(args)
+
+    def compile(self, code):
+        """
+        Returns the instruction list for code, compiling it on first use.
+        """
+        key = hashlib.sha1(code.encode("utf-8")).digest()
+        program = self.programs.get(key)
+        if program is not None:
+            self.programs.move_to_end(key)
+            return program
+        program = [self.compile_statement(tokens) for tokens in self.parse(code)]
+        self.programs[key] = program
+        if len(self.programs) > self.program_cache_size:
+            self.programs.popitem(last=False)
+        return program
+
+    def execute(self, code):
+        try:
+            program = self.compile(code)
+        except SandboxedExecutionError as e:
+            print(f"Sandbox Error: {e}")
+            if self.on_sandbox_error is not None:
+                self.on_sandbox_error(e)
+            return
+        except SyntaxError as e:
+            self.error_handler(f"Error during compilation: {e}")
+            return
+        self.run(program)
+
+    def run(self, program):
+        dispatch = self.dispatch
+        for opcode, args in program:
+            try:
+                dispatch[opcode](args)
+            except Exception as e:
+                self.error_handler(f"Error during execution: {str(e)}")
+
+    def run_instruction(self, instruction):
+        opcode, args = instruction
+        return self.dispatch[opcode](args)
+
+    @contextmanager
+    def scope(self, context):
+        """
+        Runs synchronous work with the script's own variables, state and functions
+        in place of the interpreter's, so concurrent scripts never see each
+        other's values. Reads fall back to the interpreter's; writes stay with
+        the script. Must not span an await.
+        """
+        if context.scope is None:
+            context.scope = (ChainMap({}, self.variables), ChainMap({}, self.state), ChainMap({}, self.functions))
+        saved = self.context, self.variables, self.state, self.functions
+        self.context = context
+        self.variables, self.state, self.functions = context.scope
+        try:
+            yield
+        finally:
+            self.context, self.variables, self.state, self.functions = saved
+
+    async def run_async(self, program, context):
+        """
+        Runs a compiled program as a coroutine so many scripts can share one event
+        loop. `async` starts a task, `await` waits for this script's tasks, and
+        compiles run as asynchronous subprocesses. Yields to other scripts every
+        YIELD_EVERY instructions.
+        """
+        for index, instruction in enumerate(program, 1):
+            try:
+                await self.run_instruction_async(instruction, context)
+            except (ScriptLimitError, CompileError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                self.error_handler(f"Error during execution: {str(e)}")
+            if index % YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+
+    async def run_instruction_async(self, instruction, context):
+        opcode, args = instruction
+        if opcode == OP_ASYNC:
+            context.pending.append((args[0], asyncio.ensure_future(self.call_async(args[0], args[1:], context))))
+        elif opcode == OP_AWAIT:
+            await self.await_pending(args, context)
+        elif opcode == OP_COMPILE:
+            for code_file in args:
+                await self.compile_async(code_file, context)
+        elif opcode == OP_IF:
+            condition, statement = args
+            with self.scope(context):
+                value = self.evaluate_expression(condition)
+            if str(value) not in FALSE_VALUES:
+                await self.run_instruction_async(statement, context)
+        elif opcode == OP_TRY:
+            try:
+                await self.run_instruction_async(args[0], context)
+            except (ScriptLimitError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                self.error_handler(f"Handled error: {str(e)}")
+        else:
+            # Synchronous instructions never yield, so the scope cannot change under them
+            with self.scope(context):
+                self.dispatch[opcode](args)
+
+    async def call_async(self, func_name, params, context):
+        if func_name == "compile":
+            return [await self.compile_async(code_file, context) for code_file in params]
+        with self.scope(context):
+            if func_name not in self.functions:
+                raise NameError(f"Unrecognized operation: {func_name}")
+            return self.execute_function_call(func_name, tuple(params))
+
+    async def await_pending(self, names, context):
+        """
+        Waits for every pending task of the script, or only those started for the
+        named functions, concurrently. The last result becomes `result`.
+        """
+        waiting = [(name, task) for name, task in context.pending if not names or name in names]
+        context.pending = [(name, task) for name, task in context.pending if names and name not in names]
+        results = await asyncio.gather(*(task for _, task in waiting), return_exceptions=True)
+        with self.scope(context):
+            for (name, _), result in zip(waiting, results):
+                if isinstance(result, (ScriptLimitError, CompileError, asyncio.CancelledError)):
+                    raise result
+                if isinstance(result, Exception):
+                    self.error_handler(f"Error in async {name}: {str(result)}")
+                    continue
+                context.account("result", result)
+                self.store_result(result)
+
+    def compile_pool(self):
+        jobs = self.compile_jobs
+        if jobs is None or jobs.command != self.compiler_command or jobs.workers != self.compile_workers:
+            if jobs is not None:
+                jobs.shutdown(wait=False)
+            self.compile_jobs = CompileJobPool(self.compiler_command, workers=self.compile_workers)
+        return self.compile_jobs
+
+    def report_compile(self, result):
+        if not result.ok:
+            self.default_error_handler(f"Compiler Error: {result.stderr}")
+            return None
+        print("Compiler Output:", result.stdout)
+        return result.stdout
+
+    async def compile_async(self, code_file, context):
+        async with context.compile_slots or nullcontext():
+            return await self.run_compile_async(code_file, context)
+
+    async def run_compile_async(self, code_file, context):
+        """
+        Runs the compile on the CompileJobPool, like the synchronous path: output
+        lines stream to on_compile_output, unchanged inputs come from the cache
+        and the result carries its timings. The compiler process belongs to the
+        script's context and is killed if the script is cancelled. A failed
+        compile raises CompileError, which ends the script unless it ran under
+        `try`.
+        """
+        limit = context.compile_memory_limit if resource is not None else None
+        preexec_fn = (lambda: resource.setrlimit(resource.RLIMIT_AS, (limit, limit))) if limit else None
+        lock = threading.Lock()
+        started = []
+        cancelled = False
+
+        def on_start(process):
+            # Runs on the pool's thread; a compile cancelled before it launched is killed here
+            with lock:
+                started.append(process)
+                context.processes.add(process)
+                if cancelled:
+                    process.kill()
+
+        future = self.compile_pool().submit(code_file, self.on_compile_output, preexec_fn, on_start)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            with lock:
+                cancelled = True
+                for process in started:
+                    process.kill()
+            raise
+        finally:
+            with lock:
+                context.processes.difference_update(started)
+        context.compile_results.append(result)
+        output = self.report_compile(result)
+        if not result.ok:
+            raise CompileError(f"Compile of {code_file} failed with exit code {result.returncode}: "
+                               f"{result.stderr.strip()}")
+        return output
+
+    def execute_print(self, args):
+        print(" ".join(str(self.evaluate_expression(token)) for token in args))
+
+    def execute_set(self, args):
+        variable_name, expression = args
+        value = self.evaluate_expression(expression)
+        if self.context is not None:
+            self.context.account(variable_name, value)
+        self.state[variable_name] = value
+        self.variables[variable_name] = value
+
+    def execute_function(self, args):
+        func_name, params, body, definition = args
+        self.functions[func_name] = {'params': params, 'body': body, 'definition': definition}
+
+    def execute_if(self, args):
+        condition, statement = args
+        if str(self.evaluate_expression(condition)) not in FALSE_VALUES:
+            self.run_instruction(statement)
+
+    def execute_try(self, args):
+        try:
+            self.run_instruction(args[0])
+        except Exception as e:
+            self.error_handler(f"Handled error: {str(e)}")
+
+    def execute_async(self, args):
+        self.pending.append((args[0], tuple(args[1:])))
+
+    def execute_await(self, args):
+        pending, self.pending = self.pending, []
+        for func_name, params in pending:
+            if func_name == "compile":
+                self.execute_compile_op(params)
+            else:
+                self.store_result(self.execute_function_call(func_name, params))
+
+    def execute_compile_op(self, args):
+        for code_file in args:
+            self.execute_compile(code_file)
+
+    def execute_call(self, args):
+        func_name, params = args
+        if func_name not in self.functions:
+            self.error_handler(f"Unrecognized operation: {func_name}")
+            return
+        result = self.execute_function_call(func_name, params)
+        if self.context is not None:
+            self.context.account("result", result)
+        self.store_result(result)
+
+    def store_result(self, result):
+        # The last call's result is readable from scripts as `result`
+        self.state["result"] = result
+        self.variables["result"] = result
+
+    def execute_function_call(self, func_name, params):
+        func = self.functions[func_name]
+        if len(params) != len(func['params']):
+            self.error_handler(f"Function '{func_name}' called with incorrect number of arguments.")
+            return
+
+        variables = self.variables
+        values = tuple([variables.get(val, val) for val in params])
+        key = (func_name, func['definition'], values)
+        result = self.cache.get(key, MISSING)
+        if result is not MISSING:
+            self.cache.move_to_end(key)
+            return result
+
+        local_vars = dict(zip(func['params'], values))
+        self.state.update(local_vars)
+        # The body is a template: parameter names are replaced by their values
+        result = " ".join(str(local_vars.get(token, token)) for token in func['body'])
+        self.cache[key] = result
+        if len(self.cache) > self.memo_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def evaluate_expression(self, expression):
+        if isinstance(expression, str):
+            return self.variables.get(expression, expression)
+        return expression
+
+    def execute_compile(self, code_file):
+        return self.report_compile(self.compile_pool().compile(code_file, self.on_compile_output))
@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+from collections import OrderedDict
+
+from SandboxInterpreter import CompileError, Interpreter, SandboxedExecutionError, ScriptContext, ScriptLimitError
+
+
+class ScriptScheduler:
+    """
+    Cooperative scheduler for sandboxed scripts on one asyncio event loop. Each
+    script runs as its own task with its own ScriptContext, so `async`/`await`
+    calls and compile subprocesses from many scripts overlap while one
+    interpreter process drives them, each with its own variable scope. At most
+    `max_scripts` scripts and `max_compiles` compiles run at once; each script
+    can be given a time limit (seconds) and a memory limit (bytes of values its
+    variables hold at once), and can be cancelled by id. `compile_memory_limit`
+    (bytes of address space per compiler process) is off unless given, as a
+    compiler needs far more than any script value budget. The contexts of the
+    last `keep_finished` scripts to end stay available to wait().
+    """
+    def __init__(self, interpreter=None, max_scripts=8, max_compiles=4, time_limit=None, memory_limit=None,
+                 keep_finished=256, compile_memory_limit=None):
+        self.interpreter = interpreter or Interpreter()
+        # Enough compiler processes for every compile the semaphore lets through
+        self.interpreter.compile_workers = max(self.interpreter.compile_workers, max_compiles)
+        self.max_scripts = max_scripts
+        self.max_compiles = max_compiles
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.compile_memory_limit = compile_memory_limit
+        self.keep_finished = keep_finished
+        self.script_ids = itertools.count(1)
+        self.tasks = {}  # script_id -> asyncio.Task
+        self.contexts = {}  # script_id -> ScriptContext of a queued or running script
+        self.finished = OrderedDict()  # script_id -> ScriptContext, oldest first
+        self.script_slots = None
+        self.compile_slots = None
+
+    def start(self):
+        # Semaphores belong to the running loop, so they are made on first use; the
+        # compile semaphore reaches the interpreter through each ScriptContext
+        if self.script_slots is None:
+            self.script_slots = asyncio.Semaphore(self.max_scripts)
+            self.compile_slots = asyncio.Semaphore(self.max_compiles)
+
+    async def run(self, code, time_limit=None, memory_limit=None, script_id=None):
+        """
+        Compiles and runs one script, returning its ScriptContext. The status is
+        "done", "timeout", "limit", "sandbox", "compile", "cancelled" or "error".
+        """
+        self.start()
+        script_id = script_id or next(self.script_ids)
+        time_limit = time_limit if time_limit is not None else self.time_limit
+        context = self.contexts.get(script_id) or self.new_context(script_id, memory_limit)
+        try:
+            async with self.script_slots:
+                context.status = "running"
+                try:
+                    program = self.interpreter.compile(code)
+                    await asyncio.wait_for(self.run_program(program, context), time_limit)
+                    context.status = "done"
+                except asyncio.TimeoutError:
+                    context.status = "timeout"
+                    context.error = f"Script {script_id} exceeded its time limit of {time_limit}s"
+                except ScriptLimitError as e:
+                    context.status, context.error = "limit", str(e)
+                except CompileError as e:
+                    context.status, context.error = "compile", str(e)
+                except SandboxedExecutionError as e:
+                    context.status, context.error = "sandbox", str(e)
+                    print(f"Sandbox Error: {e}")
+                except Exception as e:
+                    context.status, context.error = "error", str(e)
+                finally:
+                    await context.cleanup()
+        except asyncio.CancelledError:
+            context.status = "cancelled"  # Also while still queued for a script slot
+            raise
+        finally:
+            self.tasks.pop(script_id, None)
+            self.retire(context)
+        return context
+
+    def new_context(self, script_id, memory_limit):
+        self.start()
+        context = self.contexts[script_id] = ScriptContext(
+            script_id, memory_limit if memory_limit is not None else self.memory_limit, self.compile_slots,
+            self.compile_memory_limit)
+        return context
+
+    def retire(self, context):
+        self.contexts.pop(context.script_id, None)
+        self.finished[context.script_id] = context
+        while len(self.finished) > self.keep_finished:
+            self.finished.popitem(last=False)
+
+    def context(self, script_id):
+        return self.contexts.get(script_id) or self.finished.get(script_id)
+
+    async def run_program(self, program, context):
+        await self.interpreter.run_async(program, context)
+        # Tasks a script started but never awaited still finish before it does
+        if context.pending:
+            await self.interpreter.await_pending((), context)
+
+    def submit(self, code, time_limit=None, memory_limit=None):
+        """
+        Schedules a script on the running loop and returns its id.
+        """
+        script_id = next(self.script_ids)
+        self.new_context(script_id, memory_limit)  # Visible to wait() before the task first runs
+        self.tasks[script_id] = asyncio.ensure_future(self.run(code, time_limit, memory_limit, script_id))
+        return script_id
+
+    def cancel(self, script_id):
+        task = self.tasks.get(script_id)
+        if task is None or task.done():
+            return False
+        return task.cancel()
+
+    async def wait(self, script_id):
+        context = self.context(script_id)  # Taken first: it may be pruned from `finished` meanwhile
+        task = self.tasks.get(script_id)
+        if task is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        return context
+
+    async def run_all(self, codes, time_limit=None, memory_limit=None):
+        """
+        Runs scripts concurrently and returns their contexts in order.
+        """
+        script_ids = [self.submit(code, time_limit, memory_limit) for code in codes]
+        return [await self.wait(script_id) for script_id in script_ids]
+
+
+def run_scripts(codes, **kwargs):
+    """
+    Runs scripts to completion on a new event loop; see ScriptScheduler.
+    """
+    time_limit = kwargs.pop("time_limit", None)
+    memory_limit = kwargs.pop("memory_limit", None)
+
+    async def main():
+        return await ScriptScheduler(**kwargs).run_all(codes, time_limit, memory_limit)
+    return asyncio.run(main())
@@ -0,0 +1,134 @@
+// Reader for the shared-memory priority channel written by SharedPriorityRing.py.
+// Records are fixed-size and read in place from the mapping; see the Python
+// module for the layout, protocol and memory-ordering notes. Little-endian x86 hosts
+// only, like the writer: writeSeq is published without a fence (TSO is assumed).
+#pragma once
+
+#include <cstdint>
+#include <string>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+const uint32_t RING_MAGIC = 0x42525041;  // "APRB"
+const uint32_t RING_LAYOUT_VERSION = 1;
+const size_t RING_ID_SIZE = 104;
+
+const uint32_t RING_FLAG_COMMIT = 1u << 31;
+const uint32_t RING_FLAG_RESET = 1u << 30;
+const uint32_t RING_FLAG_REMOVED = 1u << 29;
+const uint32_t RING_FLAG_ID_HASHED = 1u << 28;
+const uint32_t RING_CHANNEL_FLAGS = RING_FLAG_COMMIT | RING_FLAG_RESET | RING_FLAG_REMOVED | RING_FLAG_ID_HASHED;
+
+struct RingHeader {
+    uint32_t magic;
+    uint32_t layoutVersion;
+    uint32_t capacity;
+    uint32_t recordSize;
+    uint64_t writeSeq;  // Records published by the writer
+    uint64_t readSeq;   // Records consumed by the reader
+    uint8_t reserved[32];
+};
+
+struct RingRecord {
+    uint64_t seq;  // Sequence number of this record, starting at 1
+    int32_t priority;
+    int32_t executionTime;
+    uint32_t flags;
+    uint16_t idLength;
+    uint16_t reserved;
+    char id[RING_ID_SIZE];
+};
+
+static_assert(sizeof(RingHeader) == 64, "RingHeader must match SharedPriorityRing.HEADER_SIZE");
+static_assert(sizeof(RingRecord) == 128, "RingRecord must match SharedPriorityRing.RECORD_SIZE");
+
+class SharedPriorityReader {
+public:
+    ~SharedPriorityReader() {
+        if (base != nullptr) {
+            munmap(base, mappedSize);
+        }
+    }
+
+    // Maps the segment created by the Python writer (name without the leading slash)
+    bool open(const std::string& name, std::string& error) {
+        if (base != nullptr) {
+            munmap(base, mappedSize);
+            base = nullptr;
+        }
+        int fd = shm_open(("/" + name).c_str(), O_RDWR, 0);
+        if (fd < 0) {
+            error = "No priority channel named " + name;
+            return false;
+        }
+        struct stat info;
+        if (fstat(fd, &info) != 0 || size_t(info.st_size) < sizeof(RingHeader)) {
+            close(fd);
+            error = "Priority channel " + name + " is too small";
+            return false;
+        }
+        mappedSize = info.st_size;
+        inode = info.st_ino;
+        void* mapping = mmap(nullptr, mappedSize, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        close(fd);
+        if (mapping == MAP_FAILED) {
+            error = "Could not map priority channel " + name;
+            return false;
+        }
+        base = mapping;
+        header = static_cast<RingHeader*>(base);
+        records = reinterpret_cast<const RingRecord*>(static_cast<char*>(base) + sizeof(RingHeader));
+        if (header->magic != RING_MAGIC || header->layoutVersion != RING_LAYOUT_VERSION ||
+            header->recordSize != sizeof(RingRecord) ||
+            sizeof(RingHeader) + size_t(header->capacity) * sizeof(RingRecord) > mappedSize) {
+            error = "Shared memory " + name + " is not a compatible priority channel";
+            return false;
+        }
+        return true;
+    }
+
+    // Calls onRecord(record) for every record published since the last poll, in
+    // order, as a reference into the shared mapping, then marks them consumed so
+    // the writer can reuse their slots. Returns the number of records, or -1 if
+    // a slot does not hold the record expected (the channel was reset under us).
+    template <typename Callback>
+    long poll(Callback onRecord) {
+        uint64_t readSeq = __atomic_load_n(&header->readSeq, __ATOMIC_RELAXED);
+        uint64_t writeSeq = __atomic_load_n(&header->writeSeq, __ATOMIC_ACQUIRE);
+        long count = 0;
+        for (; readSeq < writeSeq; ++readSeq, ++count) {
+            const RingRecord& record = records[readSeq % header->capacity];
+            if (record.seq != readSeq + 1) {
+                return -1;
+            }
+            onRecord(record);
+        }
+        __atomic_store_n(&header->readSeq, readSeq, __ATOMIC_RELEASE);
+        return count;
+    }
+
+    // True once the writer has replaced the segment (e.g. after a restart)
+    bool stale(const std::string& name) const {
+        int fd = shm_open(("/" + name).c_str(), O_RDONLY, 0);
+        if (fd < 0) {
+            return true;
+        }
+        struct stat info;
+        bool replaced = fstat(fd, &info) != 0 || info.st_ino != inode;
+        close(fd);
+        return replaced;
+    }
+
+    static std::string recordId(const RingRecord& record) {
+        return std::string(record.id, record.idLength < RING_ID_SIZE ? record.idLength : RING_ID_SIZE);
+    }
+
+private:
+    void* base = nullptr;
+    size_t mappedSize = 0;
+    ino_t inode = 0;
+    RingHeader* header = nullptr;
+    const RingRecord* records = nullptr;
+};
@@ -0,0 +1,303 @@
+"""
+Shared-memory priority channel for a Python analyzer and a C++ scheduler on the
+same host. Updates are written as fixed-size records into a ring buffer in a
+named shared-memory segment; the reader (SocketServer.cpp --shm, or
+SharedPriorityReader here) reads the fields in place, with no text encoding or
+parsing on either side. Layout, little-endian, shared with SharedPriorityRing.h:
+
+    header (64 bytes): magic, layout version, capacity, record size,
+                       write_seq (records published), read_seq (records consumed)
+    records (128 bytes each): seq, priority, executionTime, flags, id length, id
+
+write_seq and read_seq only grow; record n lives in slot n % capacity and
+carries seq n + 1 so a reader can check it is looking at the record it expects.
+The writer never overwrites a record the reader has not consumed, and only
+advances write_seq after the records before it are fully written. Each update
+ends with a record flagged COMMIT; a full snapshot starts with a RESET record.
+
+Memory ordering: records and write_seq are written with plain stores and no
+fence (Python has none to offer), so the reader seeing write_seq only implies
+the records are visible on CPUs that keep stores in program order, i.e. x86 and
+x86-64 (TSO). On weakly ordered CPUs (ARM, POWER) the reader could see
+write_seq before a record's fields; the per-record seq check catches a stale
+slot but not a half-visible one, so the channel is only supported on x86:
+creating or attaching a ring raises ChannelError on any other machine.
+
+Status: experimental, and not a transport AnalysisService offers. With both
+ends in Python (BenchmarkSharedPriority.py) it is slower than the framed socket
+path in latency and snapshot throughput, because polling and per-record packing
+cost more than the loopback socket saves. It is kept for work on a native
+reader (SocketServer.cpp --shm), where that trade may change.
+
+A writer that times out waiting for space abandons its update mid-way; the
+records it did write are followed by the next update, which is a full snapshot.
+Readers therefore treat a RESET anywhere in an update as dropping everything
+before it, not only at its start.
+"""
+import functools
+import hashlib
+import platform
+import struct
+import time
+from multiprocessing import shared_memory
+
+from PrioritySync import diff_priorities
+from PriorityTransport import normalize_priorities
+
+CHANNEL_NAME = "aicompilerplus_priorities"
+MAGIC = 0x42525041  # "APRB"
+LAYOUT_VERSION = 1
+# platform.machine() of CPUs with in-order store visibility (TSO); see "Memory ordering" above
+TSO_MACHINES = ("x86_64", "amd64", "i386", "i486", "i586", "i686", "x86")
+DEFAULT_CAPACITY = 1 << 16
+HEADER_SIZE = 64
+RECORD_SIZE = 128
+ID_SIZE = 104
+
+HEADER_FIELDS = struct.Struct("<IIII")  # magic, layout version, capacity, record size
+# write_seq and read_seq as uint64 word offsets, each updated with one aligned store
+H_WRITE_SEQ, H_READ_SEQ = 2, 3
+
+# Channel flags live in the high bits; the low bits carry the task's own flags
+FLAG_COMMIT = 1 << 31  # Last record of an update
+FLAG_RESET = 1 << 30  # Full snapshot follows: drop every task held
+FLAG_REMOVED = 1 << 29  # Task removed
+FLAG_ID_HASHED = 1 << 28  # Id was longer than ID_SIZE bytes and has been shortened
+CHANNEL_FLAGS = FLAG_COMMIT | FLAG_RESET | FLAG_REMOVED | FLAG_ID_HASHED
+
+# seq, priority, executionTime, flags, id length, reserved, id
+RECORD = struct.Struct(f"<QiiIHH{ID_SIZE}s")
+assert RECORD.size == RECORD_SIZE
+
+
+# Segments this process created, so attaching to one here keeps it tracked
+created_names = set()
+
+
+class ChannelError(ConnectionError):
+    pass
+
+
+@functools.lru_cache(maxsize=1 << 16)  # The same task ids are published over and over
+def encode_id(task_id):
+    """
+    UTF-8 id that fits a record. Longer ids keep a prefix and gain a hash of the
+    whole id, so they stay unique and identical on every publish.
+    """
+    encoded = task_id.encode("utf-8")
+    if len(encoded) <= ID_SIZE:
+        return encoded, 0
+    digest = hashlib.sha1(encoded).hexdigest()[:16].encode()
+    prefix = encoded[:ID_SIZE - len(digest) - 1].decode("utf-8", errors="ignore").encode("utf-8")  # Whole characters
+    return prefix + b"~" + digest, FLAG_ID_HASHED
+
+
+def check_memory_order():
+    machine = platform.machine()
+    if machine.lower() not in TSO_MACHINES:
+        raise ChannelError(f"The shared-memory priority channel needs an x86 CPU (store order); "
+                           f"this machine is {machine or 'unknown'}")
+
+
+class SharedPriorityRing:
+    """
+    One mapping of the channel segment. The writer creates it; readers attach.
+    """
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        magic, layout, capacity, record_size = HEADER_FIELDS.unpack_from(shm.buf)
+        if magic != MAGIC or layout != LAYOUT_VERSION:
+            raise ChannelError(f"Shared memory {shm.name} is not a version {LAYOUT_VERSION} priority channel")
+        if record_size != RECORD_SIZE:
+            raise ChannelError(f"Shared memory {shm.name} uses {record_size}-byte records")
+        self.capacity = capacity
+        self.words = shm.buf[:HEADER_SIZE].cast("Q")
+        self.buffer = shm.buf
+
+    @classmethod
+    def create(cls, name=CHANNEL_NAME, capacity=DEFAULT_CAPACITY):
+        check_memory_order()
+        size = HEADER_SIZE + capacity * RECORD_SIZE
+        try:
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a writer that did not shut down; start it over
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        HEADER_FIELDS.pack_into(shm.buf, 0, MAGIC, LAYOUT_VERSION, capacity, RECORD_SIZE)
+        created_names.add(name)
+        return cls(shm, owner=True)
+
+    def offset(self, seq):
+        return HEADER_SIZE + (seq % self.capacity) * RECORD_SIZE
+
+    @classmethod
+    def attach(cls, name=CHANNEL_NAME):
+        check_memory_order()
+        try:
+            shm = shared_memory.SharedMemory(name)
+        except FileNotFoundError:
+            raise ChannelError(f"No priority channel named {name}") from None
+        # Readers do not own the segment; stop the resource tracker removing it
+        # when this process exits
+        if name not in created_names:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def write_seq(self):
+        return self.words[H_WRITE_SEQ]
+
+    @property
+    def read_seq(self):
+        return self.words[H_READ_SEQ]
+
+    def close(self):
+        self.words.release()
+        self.words = self.buffer = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+            created_names.discard(self.shm.name.lstrip("/"))
+
+
+class SharedPriorityPublisher:
+    """
+    Writer side, with the same publish() as DeltaPublisher: the first publish
+    (and any after reset()) is a full snapshot, later ones carry only changed and
+    removed tasks, and an unchanged map writes nothing. When the ring is full the
+    writer waits up to `timeout` seconds for the reader to catch up.
+    """
+    def __init__(self, ring, timeout=5.0):
+        self.ring = ring
+        self.timeout = timeout
+        self.published = None
+        self.full_sends = 0
+        self.delta_sends = 0
+        self.records_sent = 0
+
+    def publish(self, priorities):
+        tasks = normalize_priorities(priorities)
+        if self.published is None:
+            self.write_update(tasks, [], reset=True)
+            self.full_sends += 1
+        else:
+            upserts, removals = diff_priorities(self.published, tasks)
+            if not upserts and not removals:
+                return
+            self.write_update(upserts, removals, reset=False)
+            self.delta_sends += 1
+        self.published = tasks
+
+    def reset(self):
+        self.published = None
+
+    def build_records(self, upserts, removals, reset):
+        """
+        (priority, executionTime, flags, encoded id) for every record of an update.
+        """
+        records = [(0, 0, FLAG_RESET, b"")] if reset else []
+        for task_id, task in upserts.items():
+            encoded, id_flags = encode_id(task_id)
+            records.append((task["priority"], task["executionTime"],
+                            (task.get("flags", 0) & ~CHANNEL_FLAGS) | id_flags, encoded))
+        for task_id in removals:
+            encoded, id_flags = encode_id(task_id)
+            records.append((0, 0, FLAG_REMOVED | id_flags, encoded))
+        priority, execution_time, flags, encoded = records[-1]
+        records[-1] = (priority, execution_time, flags | FLAG_COMMIT, encoded)
+        return records
+
+    def write_update(self, upserts, removals, reset):
+        ring = self.ring
+        buffer, pack_into = ring.buffer, RECORD.pack_into
+        seq = start = ring.write_seq
+        free = 0
+        for priority, execution_time, flags, encoded in self.build_records(upserts, removals, reset):
+            if not free:
+                if seq > start:
+                    ring.words[H_WRITE_SEQ] = seq  # Let the reader drain a long update
+                free = self.wait_for_space(seq)
+            pack_into(buffer, ring.offset(seq), seq + 1, priority, execution_time, flags, len(encoded), 0, encoded)
+            seq += 1
+            free -= 1
+        ring.words[H_WRITE_SEQ] = seq
+        self.records_sent += seq - start
+
+    def wait_for_space(self, position):
+        deadline = time.monotonic() + self.timeout
+        delay = 0.00005
+        while True:
+            free = self.ring.capacity - (position - self.ring.read_seq)
+            if free > 0:
+                return free
+            if time.monotonic() > deadline:
+                self.published = None  # The reader may have missed part of this update
+                raise ChannelError(f"Priority channel reader has not consumed anything for {self.timeout}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+
+    def wait_consumed(self, timeout=None):
+        """
+        Waits until the reader has consumed everything written. Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.ring.read_seq < self.ring.write_seq:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0)
+        return True
+
+
+class SharedPriorityReader:
+    """
+    Python reader with the same semantics as the C++ one: poll() applies every
+    committed update to `tasks` and returns the (upserts, removals) of each.
+    """
+    def __init__(self, ring):
+        self.ring = ring
+        self.tasks = {}
+        self.pending = []  # Records of an update whose COMMIT has not arrived yet
+
+    def poll(self):
+        ring = self.ring
+        read_seq, write_seq = ring.read_seq, ring.write_seq
+        updates = []
+        unpack_from = RECORD.unpack_from
+        while read_seq < write_seq:
+            seq, priority, execution_time, flags, id_length, _, encoded = unpack_from(ring.buffer, ring.offset(read_seq))
+            if seq != read_seq + 1:
+                raise ChannelError(f"Priority channel is inconsistent at record {read_seq + 1}")
+            self.pending.append((priority, execution_time, flags, encoded[:id_length]))
+            read_seq += 1
+            if flags & FLAG_COMMIT:
+                updates.append(self.apply(self.pending))
+                self.pending = []
+        ring.words[H_READ_SEQ] = read_seq
+        return updates
+
+    def apply(self, records):
+        # Records before the last RESET belong to an abandoned update or the old snapshot
+        for index in range(len(records) - 1, -1, -1):
+            if records[index][2] & FLAG_RESET:
+                self.tasks = {}
+                records = records[index + 1:]
+                break
+        upserts, removals = {}, []
+        for priority, execution_time, flags, encoded in records:
+            task_id = encoded.decode("utf-8", errors="replace")
+            if flags & FLAG_REMOVED:
+                self.tasks.pop(task_id, None)
+                removals.append(task_id)
+            else:
+                task = {"priority": priority, "executionTime": execution_time, "flags": flags & ~CHANNEL_FLAGS}
+                self.tasks[task_id] = upserts[task_id] = task
+        return upserts, removals
+
+    def close(self):
+        self.ring.close()
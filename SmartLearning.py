@@ -1,12 +1,14 @@
-import numpy as np
 import random
-import tensorflow as tf
-from tensorflow.keras import layers
-import threading
-import time
-import os
-import json
-import gc
+
+from DecisionTelemetry import DecisionTelemetry
+from SandboxInterpreter import Interpreter, SandboxedExecutionError
+
+# The Q-networks, optimizer and training loops live in SmartTraining, which
+# imports TensorFlow. They are still reachable as SmartLearning.<name> but are
+# only loaded on first access, so the environment, decision engine and
+# interpreter import in a fraction of a second.
+TRAINING_NAMES = ("QNetwork", "EnhancedQNetwork", "model", "target_model", "optimizer", "loss_fn",
+                  "train", "train_vectorized", "evaluate")
 
 # Define the environment and state space for problem-solving logic
 class LearningEnvironment:
@@ -38,12 +40,29 @@ class LearningEnvironment:
 
 # Define a decision-making and problem-solving engine with critical thinking
 class DecisionMakingEngine:
-    def __init__(self):
-        self.history = []  # Store decision-making history for analysis
-        self.performance_metrics = {}  # Metrics to evaluate decision quality
+    def __init__(self, history_size=1024, success_window=256):
+        # Bounded decision history plus running counters and success rates
+        self.telemetry = DecisionTelemetry(capacity=history_size, window=success_window)
+        self.performance_metrics = {}  # Success rate per decision, filled in by record_outcome
         self.threshold = 0.8  # Minimum threshold for successful decisions
         self.dynamic_reaction_time = 0.1  # Simulated reaction time for decisions
 
+    @property
+    def history(self):
+        """
+        The most recent decisions, oldest first (at most history_size).
+        """
+        return self.telemetry.recent_decisions()
+
+    def record_outcome(self, success, decision=None):
+        """
+        Feeds back whether the latest decision (or `decision`) paid off.
+        """
+        decision = decision or self.telemetry.last_decision()
+        rate = self.telemetry.record_outcome(success, decision)
+        if rate is not None:
+            self.performance_metrics[decision] = rate
+
     def evaluate_situation(self, state, context):
         """
         Evaluate a situation based on current state and context to make a decision.
@@ -61,7 +80,23 @@ class DecisionMakingEngine:
         else:  # Default decision is to debug code
             decision = "debug_code"
 
-        self.history.append(decision)
+        self.telemetry.record(decision, context)
+        return decision
+
+    def enhanced_evaluate_situation(self, state, context):
+        from scipy.stats import norm  # scipy is only loaded by callers of this method
+        # Use Gaussian distribution to evaluate risk-reward
+        reward_probability = norm.cdf(state[1])  # Based on clarity level
+        if reward_probability < 0.3:
+            decision = "read_documentation"
+        elif reward_probability < 0.6:
+            decision = "solve_problem"
+        elif context == "high_risk":
+            decision = "test_code"
+        else:
+            decision = "debug_code"
+        
+        self.telemetry.record(decision, context)
         return decision
 
     def make_critical_decision(self, state, context):
@@ -78,226 +113,16 @@ class DecisionMakingEngine:
 
         return decision
 
-# Define the Q-Network for problem-solving (still includes some parts of the neural network)
-class QNetwork(tf.keras.Model):
-    def __init__(self, action_space):
-        super(QNetwork, self).__init__()
-        self.dense1 = layers.Dense(64, activation='relu')
-        self.dense2 = layers.Dense(64, activation='relu')
-        self.output_layer = layers.Dense(action_space, activation='linear')
-
-    def call(self, state):
-        x = self.dense1(state)
-        x = self.dense2(x)
-        return self.output_layer(x)
-
 # Define parameters
 action_space = 5  # Five actions: solve_problem, read_documentation, test_code, debug_code, peer_review
+ACTIONS = ["solve_problem", "read_documentation", "test_code", "debug_code", "peer_review"]  # Q-network output order
+state_size = 4
 env = LearningEnvironment()
-model = QNetwork(action_space)
 engine = DecisionMakingEngine()
 
-# Define optimizer and loss function
-optimizer = tf.keras.optimizers.Adam(learning_rate=0.001)
-loss_fn = tf.keras.losses.MeanSquaredError()
-
-# Enhanced training loop with decision-making prowess
-def train():
-    num_episodes = 1000
-    epsilon = 0.1
-    
-    for episode in range(num_episodes):
-        state = np.array(env.reset())
-        done = False
-        
-        while not done:
-            # Utilize critical decision-making to select actions
-            context = 'normal'  # Placeholder context (could change dynamically based on environment)
-            action = engine.make_critical_decision(state, context)
-            
-            if random.random() < epsilon:
-                action = random.choice(["solve_problem", "read_documentation", "test_code", "debug_code", "peer_review"])
-            else:
-                q_values = model(tf.convert_to_tensor(state, dtype=tf.float32))  # Get Q-values
-                action = np.argmax(q_values.numpy())  # Select action with highest value
-            
-            # Take action and get next state and reward
-            next_state, reward = env.step(action)
-            next_state = np.array(next_state)
-            
-            # Apply decision-making logic (e.g., using neural network)
-            with tf.GradientTape() as tape:
-                q_values = model(tf.convert_to_tensor(state, dtype=tf.float32))
-                next_q_values = model(tf.convert_to_tensor(next_state, dtype=tf.float32))
-                q_value = q_values[0, action]
-                target = reward + 0.99 * np.max(next_q_values.numpy())
-                loss = loss_fn(q_value, target)
-            
-            grads = tape.gradient(loss, model.trainable_variables)
-            optimizer.apply_gradients(zip(grads, model.trainable_variables))
-            
-            state = next_state
-        
-        # Evaluate training progress at certain intervals
-        if episode % 100 == 0:
-            print(f"Episode {episode + 1}/{num_episodes} completed.")
-
-# Evaluate the AI model after training with decision-making
-def evaluate():
-    state = np.array(env.reset())
-    done = False
-    total_reward = 0
-    
-    while not done:
-        context = 'normal'  # Placeholder context for evaluation
-        action = engine.make_critical_decision(state, context)
-        
-        q_values = model(tf.convert_to_tensor(state, dtype=tf.float32))  # Get Q-values
-        action = np.argmax(q_values.numpy())
-        
-        next_state, reward = env.step(action)
-        total_reward += reward
-        state = next_state
-        
-        if np.random.random() < 0.1:
-            done = True
-    
-    print(f"Total Reward: {total_reward}")
-
-# Start training the AI model with advanced decision-making
-train()
-
-# Evaluate the model's performance with real decision-making applied
-evaluate()
-
-# Further sandboxed execution system with logic to prevent dangerous operations
-class SandboxedExecutionError(Exception):
-    pass
-
-class Interpreter:
-    def __init__(self):
-        self.variables = {}
-        self.functions = {}
-        self.events = {}
-        self.error_handler = self.default_error_handler
-        self.execution_stack = []
-        self.event_listeners = {}
-        self.sandboxed = True
-        self.state = {}
-        self.cache = {}
-
-    def default_error_handler(self, error_message):
-        print(f"Runtime Error: {error_message}")
-
-    def parse(self, code):
-        operations = code.split()
-        return operations
-
-    def execute(self, code):
-        operations = self.parse(code)
-        for op in operations:
-            try:
-                if self.sandboxed and 'read_file' in op or 'write_file' in op:
-                    raise SandboxedExecutionError("Sandboxing prevents file access.")
-                if op == 'print':
-                    self.execute_print(operations)
-                elif op == 'set':
-                    self.execute_set(operations)
-                elif op == 'function':
-                    self.execute_function(operations)
-                elif op == 'if':
-                    self.execute_if(operations)
-                elif op == 'try':
-                    self.execute_try(operations)
-                elif op == 'async':
-                    self.execute_async(operations)
-                elif op == 'await':
-                    self.execute_await(operations)
-                elif op in self.functions:
-                    self.execute_function_call(op, operations)
-                else:
-                    self.error_handler(f"Unrecognized operation: {op}")
-            except Exception as e:
-                self.error_handler(f"Error during execution: {str(e)}")
-
-    def execute_print(self, operations):
-        value = operations[1]
-        print(value)
-
-    def execute_set(self, operations):
-        variable_name = operations[1]
-        value = self.evaluate_expression(operations[2])
-        self.state[variable_name] = value
-        self.variables[variable_name] = value
-
-    def execute_function(self, operations):
-        func_name = operations[1]
-        params = operations[2].split(',')
-        body = operations[3:]
-        self.functions[func_name] = {'params': params, 'body': body}
-
-    def execute_function_call(self, func_name, operations):
-        if func_name in self.cache:
-            return self.cache[func_name]
-
-        func = self.functions[func_name]
-        params = operations[1:]
-        if len(params) != len(func['params']):
-            self.error_handler(f"Function '{func_name}' called with incorrect number of arguments.")
-            return
-
-        local_vars = {param: self.evaluate_expression(val) for param, val in zip(func['params'], params)}
-        self.state.update(local_vars)
-        result = self.evaluate_expression(func['body'])
-        self.cache[func_name] = result
-        return result
-
-    def evaluate_expression(self, expression):
-        if isinstance(expression, str):
-            return expression
-        return expression
-
 # Execute code within a sandboxed environment for safety
 interpreter = Interpreter()
-interpreter.execute('print Hello, World!')
-
-class EnhancedQNetwork(tf.keras.Model):
-    def __init__(self, action_space):
-        super(EnhancedQNetwork, self).__init__()
-        self.dense1 = layers.Dense(128, activation='relu')  # Increased size
-        self.dropout1 = layers.Dropout(0.2)  # Prevent overfitting
-        self.dense2 = layers.Dense(64, activation='relu')
-        self.dropout2 = layers.Dropout(0.2)
-        self.dense3 = layers.Dense(32, activation='relu')
-        self.output_layer = layers.Dense(action_space, activation='linear')  # Action space output
-
-    def call(self, state):
-        x = self.dense1(state)
-        x = self.dropout1(x)
-        x = self.dense2(x)
-        x = self.dropout2(x)
-        x = self.dense3(x)
-        return self.output_layer(x)
-
-from scipy.stats import norm
-
-class DecisionMakingEngine:
-    # Existing methods ...
-
-    def enhanced_evaluate_situation(self, state, context):
-        # Use Gaussian distribution to evaluate risk-reward
-        reward_probability = norm.cdf(state[1])  # Based on clarity level
-        if reward_probability < 0.3:
-            decision = "read_documentation"
-        elif reward_probability < 0.6:
-            decision = "solve_problem"
-        elif context == "high_risk":
-            decision = "test_code"
-        else:
-            decision = "debug_code"
-        
-        self.history.append(decision)
-        return decision
+interpreter.on_sandbox_error = lambda error: env.step("debug_code")  # Guide agent to debug when errors occur
 
 class LearningEnvironment:
     # Existing methods ...
@@ -318,66 +143,13 @@ class LearningEnvironment:
         self.state[3] = reward  # Update feedback
         return self.state, reward
 
-import subprocess
-
-class Interpreter:
-    # Existing methods ...
-
-    def execute_compile(self, code_file):
-        try:
-            result = subprocess.run(
-                ["python", "path_to_AICompilerPlus/AIEngine.py", code_file],
-                capture_output=True, text=True, check=True
-            )
-            print("Compiler Output:", result.stdout)
-        except subprocess.CalledProcessError as e:
-            self.default_error_handler(f"Compiler Error: {e.stderr}")
-
-def train():
-    num_episodes = 1000
-    epsilon = 0.1
-    
-    for episode in range(num_episodes):
-        state = np.array(env.reset())
-        
-        while True:
-            # Decision-making logic
-            context = 'normal'
-            action = engine.make_critical_decision(state, context)
-            if random.random() < epsilon:
-                action = random.choice(range(action_space))
-            else:
-                q_values = model(tf.convert_to_tensor([state], dtype=tf.float32))
-                action = np.argmax(q_values.numpy())
-            
-            # Take action
-            next_state, reward = env.step(action)
-            next_state = np.array(next_state)
-            
-            with tf.GradientTape() as tape:
-                q_values = model(tf.convert_to_tensor([state], dtype=tf.float32))
-                next_q_values = model(tf.convert_to_tensor([next_state], dtype=tf.float32))
-                q_value = q_values[0, action]
-                target = reward + 0.99 * np.max(next_q_values.numpy())
-                loss = loss_fn(q_value, target)
-            
-            grads = tape.gradient(loss, model.trainable_variables)
-            optimizer.apply_gradients(zip(grads, model.trainable_variables))
-            
-            state = next_state
-            if np.random.random() < 0.1:  # End early for training efficiency
-                break
-
-class Interpreter:
-    # Existing methods ...
+def __getattr__(name):
+    if name in TRAINING_NAMES:
+        import SmartTraining
+        return getattr(SmartTraining, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def execute(self, code):
-        try:
-            operations = self.parse(code)
-            for op in operations:
-                if "dangerous_op" in op:
-                    raise SandboxedExecutionError("Operation blocked by sandbox.")
-                self.execute_operation(op)
-        except SandboxedExecutionError as e:
-            print(f"Sandbox Error: {e}")
-            env.step("debug_code")  # Guide agent to debug when errors occur
+if __name__ == "__main__":
+    # Training entry point (see SmartTraining.main)
+    from SmartTraining import main
+    main()
@@ -0,0 +1,149 @@
+"""
+TensorFlow side of SmartLearning: the Q-networks, the shared model, optimizer
+and loss, and the training and evaluation loops. Importing this module loads
+TensorFlow; run it (or SmartLearning) as a script to train and evaluate.
+"""
+import random
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+
+from ReplayTraining import DQNTrainer, ReplayBuffer
+from SmartLearning import ACTIONS, action_space, engine, env, interpreter, state_size
+from VectorEnvironment import VectorLearningEnvironment
+
+# Define the Q-Network for problem-solving (still includes some parts of the neural network)
+class QNetwork(tf.keras.Model):
+    def __init__(self, action_space):
+        super(QNetwork, self).__init__()
+        self.dense1 = layers.Dense(64, activation='relu')
+        self.dense2 = layers.Dense(64, activation='relu')
+        self.output_layer = layers.Dense(action_space, activation='linear')
+
+    def call(self, state):
+        x = self.dense1(state)
+        x = self.dense2(x)
+        return self.output_layer(x)
+
+model = QNetwork(action_space)
+target_model = QNetwork(action_space)  # Lagging copy of model used for next-state Q-values
+
+# Define optimizer and loss function
+optimizer = tf.keras.optimizers.Adam(learning_rate=0.001)
+loss_fn = tf.keras.losses.MeanSquaredError()
+
+# Evaluate the AI model after training with decision-making
+def evaluate():
+    state = np.array(env.reset())
+    done = False
+    total_reward = 0
+    
+    while not done:
+        q_values = model(tf.convert_to_tensor([state], dtype=tf.float32))  # Get Q-values
+        action = np.argmax(q_values.numpy())
+        
+        next_state, reward = env.step(ACTIONS[action])
+        total_reward += reward
+        state = next_state
+        
+        if np.random.random() < 0.1:
+            done = True
+    
+    print(f"Total Reward: {total_reward}")
+
+class EnhancedQNetwork(tf.keras.Model):
+    def __init__(self, action_space):
+        super(EnhancedQNetwork, self).__init__()
+        self.dense1 = layers.Dense(128, activation='relu')  # Increased size
+        self.dropout1 = layers.Dropout(0.2)  # Prevent overfitting
+        self.dense2 = layers.Dense(64, activation='relu')
+        self.dropout2 = layers.Dropout(0.2)
+        self.dense3 = layers.Dense(32, activation='relu')
+        self.output_layer = layers.Dense(action_space, activation='linear')  # Action space output
+
+    def call(self, state):
+        x = self.dense1(state)
+        x = self.dropout1(x)
+        x = self.dense2(x)
+        x = self.dropout2(x)
+        x = self.dense3(x)
+        return self.output_layer(x)
+
+def train(num_episodes=1000, epsilon=0.1, batch_size=64, buffer_capacity=50000, train_every=1):
+    """
+    Transitions go into a replay buffer and the model learns from random
+    minibatches of them, with next-state values from the target network.
+    Returns the number of environment steps taken.
+    """
+    replay = ReplayBuffer(buffer_capacity, state_size)
+    trainer = DQNTrainer(model, target_model, optimizer, loss_fn, state_size)
+    steps = 0
+    
+    for episode in range(num_episodes):
+        state = np.array(env.reset(), dtype=np.float32)
+        
+        while True:
+            # Epsilon-greedy on the Q-network; the rule engine only tracks what was taken
+            if random.random() < epsilon:
+                action = random.choice(range(action_space))
+            else:
+                action = int(trainer.greedy_actions(tf.convert_to_tensor([state]))[0])
+            
+            # Take action
+            next_state, reward = env.step(ACTIONS[action])
+            next_state = np.array(next_state, dtype=np.float32)
+            engine.telemetry.record(ACTIONS[action], 'normal')
+            engine.record_outcome(reward > 0, ACTIONS[action])
+            replay.add(state, action, reward, next_state)
+            steps += 1
+            
+            if len(replay) >= batch_size and steps % train_every == 0:
+                trainer.update(replay.sample(batch_size))
+            
+            state = next_state
+            if np.random.random() < 0.1:  # End early for training efficiency
+                break
+        
+        if episode % 100 == 0:
+            print(f"Episode {episode + 1}/{num_episodes} completed.")
+    return steps
+
+def train_vectorized(num_envs=64, num_steps=2000, epsilon=0.1, batch_size=64, buffer_capacity=50000,
+                     train_every=1, reward_mode="base"):
+    """
+    Same learning rule as train(), but experience comes from num_envs environments
+    stepped together (see VectorEnvironment); the model scores all of their states
+    in one call per step. Each environment ends its episode with the same 10%
+    chance per step. Returns the number of transitions collected.
+    """
+    vector_env = VectorLearningEnvironment(num_envs, reward_mode)
+    replay = ReplayBuffer(buffer_capacity, state_size)
+    trainer = DQNTrainer(model, target_model, optimizer, loss_fn, state_size)
+    states = vector_env.reset()
+    
+    for step in range(1, num_steps + 1):
+        actions = trainer.greedy_actions(tf.convert_to_tensor(states, dtype=tf.float32)).numpy()
+        explore = np.random.random(num_envs) < epsilon
+        actions[explore] = np.random.randint(action_space, size=int(explore.sum()))
+        
+        next_states, rewards = vector_env.step(actions)
+        replay.add_batch(states, actions, rewards, next_states)
+        if len(replay) >= batch_size and step % train_every == 0:
+            trainer.update(replay.sample(batch_size))
+        
+        states = vector_env.reset(np.random.random(num_envs) < 0.1)  # End early for training efficiency
+    return num_envs * num_steps
+
+def main():
+    # Execute code within a sandboxed environment for safety
+    interpreter.execute('print Hello, World!')
+
+    # Start training the AI model with advanced decision-making
+    train()
+
+    # Evaluate the model's performance with real decision-making applied
+    evaluate()
+
+if __name__ == "__main__":
+    main()
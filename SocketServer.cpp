@@ -1,15 +1,21 @@
 #include <iostream>
 #include <fstream>
 #include <queue>
+#include <map>
 #include <string>
 #include <thread>
 #include <chrono>
 #include <iomanip>
+#include <sstream>
+#include <vector>
+#include <cstdint>
 #include <arpa/inet.h>
 #include <sys/socket.h>
 #include <unistd.h>
 #include <json/json.h>
 
+#include "SharedPriorityRing.h"
+
 using namespace std;
 
 struct Task {
@@ -21,17 +27,105 @@ struct Task {
 
 queue<Task> taskQueue;
 
+// Versioned priority snapshot kept in sync by PrioritySync.DeltaPublisher
+map<string, Task> currentTasks;
+Json::Int64 currentVersion = 0;
+
 void executeTask(const Task& task) {
     cout << "Executing Task: " << task.taskId << " with Priority: " << task.priority << endl;
     this_thread::sleep_for(chrono::milliseconds(task.executionTime));
     cout << "Task " << task.taskId << " completed." << endl;
 }
 
-void processIncomingData(int clientSocket) {
-    char buffer[1024] = {0};
-    read(clientSocket, buffer, sizeof(buffer));
-    string jsonData(buffer);
+// Frames from PriorityTransport.py: 4-byte big-endian payload length, 1-byte codec, payload
+const uint32_t MAX_FRAME_SIZE = 64 * 1024 * 1024;
+const uint8_t CODEC_JSON = 0;
+const uint8_t CODEC_MSGPACK = 1;
+const uint8_t CODEC_RECORDS = 2;
+
+bool readExactly(int clientSocket, char* buffer, size_t size) {
+    size_t received = 0;
+    while (received < size) {
+        ssize_t n = read(clientSocket, buffer + received, size - received);
+        if (n <= 0) {
+            return false;
+        }
+        received += n;
+    }
+    return true;
+}
+
+uint32_t readUint32(const string& data, size_t offset) {
+    return (uint32_t(uint8_t(data[offset])) << 24) | (uint32_t(uint8_t(data[offset + 1])) << 16) |
+           (uint32_t(uint8_t(data[offset + 2])) << 8) | uint32_t(uint8_t(data[offset + 3]));
+}
 
+Task taskFromJson(const string& taskId, const Json::Value& value) {
+    Task task;
+    task.taskId = taskId;
+    task.priority = value["priority"].asInt();
+    task.executionTime = value["executionTime"].asInt();
+    task.completed = false;
+    return task;
+}
+
+// Applies a "full" or "delta" snapshot message and returns the ack/resync reply.
+// Only tasks that changed are queued, so an unchanged map costs no scheduler work.
+Json::Value applySnapshot(const Json::Value& root) {
+    Json::Value reply;
+    string type = root["type"].asString();
+    if (type == "delta" && root["base"].asInt64() != currentVersion) {
+        reply["type"] = "resync";
+        reply["version"] = currentVersion;
+        return reply;
+    }
+
+    const Json::Value& upserts = (type == "full") ? root["tasks"] : root["upserts"];
+    if (type == "full") {
+        currentTasks.clear();
+    } else {
+        for (const auto& taskId : root["removals"]) {
+            currentTasks.erase(taskId.asString());
+        }
+    }
+    for (const auto& key : upserts.getMemberNames()) {
+        Task task = taskFromJson(key, upserts[key]);
+        currentTasks[key] = task;
+        taskQueue.push(task);
+    }
+
+    currentVersion = root["version"].asInt64();
+    reply["type"] = "ack";
+    reply["version"] = currentVersion;
+    return reply;
+}
+
+bool sendJsonFrame(int clientSocket, const Json::Value& message) {
+    Json::StreamWriterBuilder writer;
+    writer["indentation"] = "";
+    string payload = Json::writeString(writer, message);
+    uint32_t length = payload.size();
+    string frame;
+    frame.push_back(char((length >> 24) & 0xFF));
+    frame.push_back(char((length >> 16) & 0xFF));
+    frame.push_back(char((length >> 8) & 0xFF));
+    frame.push_back(char(length & 0xFF));
+    frame.push_back(char(CODEC_JSON));
+    frame += payload;
+
+    size_t written = 0;
+    while (written < frame.size()) {
+        ssize_t n = write(clientSocket, frame.data() + written, frame.size() - written);
+        if (n <= 0) {
+            return false;
+        }
+        written += n;
+    }
+    return true;
+}
+
+// Returns false if a reply was owed but could not be written
+bool queueJsonTasks(int clientSocket, const string& jsonData) {
     // Parse JSON data received from Python
     Json::CharReaderBuilder reader;
     Json::Value root;
@@ -40,23 +134,155 @@ void processIncomingData(int clientSocket) {
 
     if (!Json::parseFromStream(reader, s, &root, &errs)) {
         cerr << "Error parsing JSON: " << errs << endl;
-        return;
+        return true;
     }
 
-    // Create tasks from the received data
+    if (root.isMember("type") && root["type"].isString()) {
+        return sendJsonFrame(clientSocket, applySnapshot(root));
+    }
+
+    // Plain priority map: create tasks from the received data
     for (const auto& key : root.getMemberNames()) {
+        taskQueue.push(taskFromJson(key, root[key]));
+    }
+    return true;
+}
+
+void queueRecordTasks(const string& payload) {
+    // Record count, then per record: uint16 id length, id, int32 priority, int32 executionTime, uint32 flags
+    if (payload.size() < 4) {
+        cerr << "Truncated record frame" << endl;
+        return;
+    }
+    uint32_t count = readUint32(payload, 0);
+    size_t offset = 4;
+    for (uint32_t i = 0; i < count; ++i) {
+        if (offset + 2 > payload.size()) break;
+        size_t idLength = (size_t(uint8_t(payload[offset])) << 8) | uint8_t(payload[offset + 1]);
+        offset += 2;
+        if (offset + idLength + 12 > payload.size()) break;
         Task task;
-        task.taskId = key;
-        task.priority = root[key]["priority"].asInt();
-        task.executionTime = root[key]["executionTime"].asInt();
+        task.taskId = payload.substr(offset, idLength);
+        offset += idLength;
+        task.priority = int32_t(readUint32(payload, offset));
+        task.executionTime = int32_t(readUint32(payload, offset + 4));
+        offset += 12;  // flags are not used by this scheduler
         task.completed = false;
         taskQueue.push(task);
     }
-    
-    close(clientSocket);
 }
 
-int main() {
+// Reads one frame and queues its tasks. Returns false once the client disconnects.
+bool processIncomingData(int clientSocket) {
+    char header[5];
+    if (!readExactly(clientSocket, header, sizeof(header))) {
+        return false;
+    }
+    uint32_t length = readUint32(string(header, 4), 0);
+    uint8_t codec = uint8_t(header[4]);
+    if (length > MAX_FRAME_SIZE) {
+        cerr << "Frame of " << length << " bytes exceeds limit, dropping connection" << endl;
+        return false;
+    }
+
+    string payload(length, '\0');
+    if (length > 0 && !readExactly(clientSocket, &payload[0], length)) {
+        cerr << "Connection closed in the middle of a frame" << endl;
+        return false;
+    }
+
+    if (codec == CODEC_JSON) {
+        return queueJsonTasks(clientSocket, payload);
+    } else if (codec == CODEC_RECORDS) {
+        queueRecordTasks(payload);
+    } else {
+        cerr << "Unsupported frame codec " << int(codec) << ", use json or records" << endl;
+    }
+    return true;
+}
+
+// Shared-memory channel (SharedPriorityRing.py): records are read in place and
+// applied to currentTasks once the record committing their update arrives
+vector<pair<Task, uint32_t>> pendingRecords;
+
+void applyRingRecord(const RingRecord& record) {
+    Task task;
+    task.taskId = SharedPriorityReader::recordId(record);
+    task.priority = record.priority;
+    task.executionTime = record.executionTime;
+    task.completed = false;
+    pendingRecords.push_back({task, record.flags});
+    if (!(record.flags & RING_FLAG_COMMIT)) {
+        return;
+    }
+    // Records before the last RESET belong to an abandoned update or the old
+    // snapshot: none of them is applied or queued, as in SharedPriorityReader.apply
+    size_t first = 0;
+    for (size_t i = pendingRecords.size(); i-- > 0;) {
+        if (pendingRecords[i].second & RING_FLAG_RESET) {
+            currentTasks.clear();
+            first = i + 1;
+            break;
+        }
+    }
+    for (size_t i = first; i < pendingRecords.size(); ++i) {
+        const auto& pending = pendingRecords[i];
+        if (pending.second & RING_FLAG_REMOVED) {
+            currentTasks.erase(pending.first.taskId);
+        } else {
+            currentTasks[pending.first.taskId] = pending.first;
+            taskQueue.push(pending.first);
+        }
+    }
+    pendingRecords.clear();
+}
+
+void serveSharedMemory(const string& name) {
+    SharedPriorityReader reader;
+    string error;
+    auto lastRecord = chrono::steady_clock::now();
+    while (true) {
+        while (!reader.open(name, error)) {
+            cerr << error << ", retrying..." << endl;
+            this_thread::sleep_for(chrono::seconds(1));
+        }
+        cout << "Reading priorities from shared memory " << name << endl;
+        pendingRecords.clear();
+        while (true) {
+            long count = reader.poll(applyRingRecord);
+            if (count < 0) {
+                cerr << "Priority channel was reset, reattaching" << endl;
+                break;
+            }
+            while (!taskQueue.empty()) {
+                Task task = taskQueue.front();
+                taskQueue.pop();
+                executeTask(task);
+            }
+            auto now = chrono::steady_clock::now();
+            if (count > 0) {
+                lastRecord = now;
+            } else if (now - lastRecord > chrono::seconds(1)) {
+                if (reader.stale(name)) {
+                    cerr << "Priority channel was replaced, reattaching" << endl;
+                    break;
+                }
+                lastRecord = now;
+            } else {
+                this_thread::sleep_for(chrono::microseconds(100));
+            }
+        }
+    }
+}
+
+// Usage: SocketServer            receive frames on port 65432
+//        SocketServer --shm NAME read the shared-memory channel NAME instead
+int main(int argc, char* argv[]) {
+    if (argc > 2 && string(argv[1]) == "--shm") {
+        serveSharedMemory(argv[2]);
+        return 0;
+    }
+
     int server_fd, new_socket;
     struct sockaddr_in address;
     int addrlen = sizeof(address);
@@ -87,14 +313,16 @@ int main() {
             exit(EXIT_FAILURE);
         }
 
-        processIncomingData(new_socket);
-
-        // Execute tasks based on received priority
-        while (!taskQueue.empty()) {
-            Task task = taskQueue.front();
-            taskQueue.pop();
-            executeTask(task);
+        // The client keeps its connection open and sends one frame per update
+        while (processIncomingData(new_socket)) {
+            // Execute tasks based on received priority
+            while (!taskQueue.empty()) {
+                Task task = taskQueue.front();
+                taskQueue.pop();
+                executeTask(task);
+            }
         }
+        close(new_socket);
     }
 
     return 0;
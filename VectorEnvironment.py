@@ -0,0 +1,80 @@
+import numpy as np
+
+# Integer action codes, in the order of SmartLearning.ACTIONS and the Q-network outputs
+SOLVE_PROBLEM = 0
+READ_DOCUMENTATION = 1
+TEST_CODE = 2
+DEBUG_CODE = 3
+PEER_REVIEW = 4
+
+# State columns
+EXPOSURE = 0
+CLARITY = 1
+PRACTICE = 2
+FEEDBACK = 3
+
+# "base" is LearningEnvironment.step; "practice" is the later step override whose
+# rewards scale with practice and feedback and which leaves exposure/practice as is
+REWARD_MODES = ("base", "practice")
+
+
+class VectorLearningEnvironment:
+    """
+    N independent LearningEnvironments held in one (N, 4) float array of
+    exposure, clarity, practice and feedback, all stepped at once with integer
+    action codes. Unknown codes get reward 0, as unknown action names did.
+    """
+    def __init__(self, num_envs, reward_mode="base"):
+        if reward_mode not in REWARD_MODES:
+            raise ValueError(f"Unknown reward mode {reward_mode!r}; use one of {', '.join(REWARD_MODES)}")
+        self.num_envs = num_envs
+        self.reward_mode = reward_mode
+        self.states = np.zeros((num_envs, 4))  # float64, like the Python floats of the scalar env
+
+    def reset(self, mask=None):
+        """
+        Resets every environment, or only the rows selected by a boolean mask or
+        index array, and returns a copy of all states.
+        """
+        if mask is None:
+            self.states[:] = 0.0
+        else:
+            self.states[mask] = 0.0
+        return self.states.copy()
+
+    def step(self, actions):
+        """
+        Applies one action code per environment. Returns (states, rewards) where
+        states is a copy of the updated (N, 4) array.
+        """
+        actions = np.asarray(actions)
+        if self.reward_mode == "base":
+            rewards = self.base_rewards(actions)
+        else:
+            rewards = self.practice_rewards(actions)
+        self.states[:, FEEDBACK] = rewards
+        return self.states.copy(), rewards
+
+    def base_rewards(self, actions):
+        states = self.states
+        clarity = states[:, CLARITY]
+        rewards = np.select(
+            [actions == SOLVE_PROBLEM, actions == READ_DOCUMENTATION, actions == TEST_CODE,
+             actions == DEBUG_CODE, actions == PEER_REVIEW],
+            [clarity * 10, 5.0, np.where(clarity < 0.5, -1.0, 10.0), 2.0, 3.0],
+            default=0.0,
+        )
+        states[:, PRACTICE] += actions == SOLVE_PROBLEM
+        states[:, EXPOSURE] += np.where(actions == READ_DOCUMENTATION, 0.1, 0.0)
+        return rewards
+
+    def practice_rewards(self, actions):
+        states = self.states
+        clarity, feedback = states[:, CLARITY], states[:, FEEDBACK]
+        return np.select(
+            [actions == SOLVE_PROBLEM, actions == READ_DOCUMENTATION, actions == TEST_CODE,
+             actions == PEER_REVIEW, actions == DEBUG_CODE],
+            [np.where(states[:, PRACTICE] > 1, clarity * 15, 5.0), 10 - states[:, EXPOSURE],
+             np.where(clarity > 0.7, 20.0, -5.0), 5 + feedback * 2, np.maximum(2.0, feedback - 1)],
+            default=0.0,
+        )